@@ -3,25 +3,73 @@ from collections.abc import AsyncGenerator
 from dishka import Provider
 from dishka import Scope
 from dishka import provide
+from sqlalchemy import URL
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import create_async_engine
 
+from app.api.utils.sqlalchemy.pool import InstrumentedAsyncQueuePool
+from app.api.utils.sqlalchemy.pool import instrument_engine
+from app.api.utils.sqlalchemy.pool import register_pool_metrics
+from app.api.utils.sqlalchemy.queries import instrument_queries
+from app.api.utils.sqlalchemy.replicas import ReplicaRouter
+from app.api.utils.sqlalchemy.statements import instrument_statement_cache
+from app.api.utils.sqlalchemy.statements import register_statement_cache_metrics
 from app.config import config
 
 
+def _create_pg_engine(uri: URL, name: str) -> AsyncEngine:
+    """Создаем AsyncEngine c общими настройками пула.
+
+    Args:
+        uri: URL - PG-URI
+        name: str - метка движка в метриках пула
+    """
+    engine = create_async_engine(
+        uri,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=config.postgres.pool_size,
+        max_overflow=config.postgres.overflow_pool_size,
+        pool_pre_ping=True,
+        isolation_level='AUTOCOMMIT',
+        query_cache_size=config.postgres.query_cache_size,
+        connect_args=config.postgres.connect_args,
+        # echo=True,
+    )
+    instrument_engine(engine, name)
+    instrument_queries(engine)
+    instrument_statement_cache(engine, name)
+    if config.common.prometheus_enabled:
+        register_pool_metrics()
+        register_statement_cache_metrics()
+    return engine
+
+
 class ApplicationProvider(Provider):
     scope = Scope.APP
 
     @provide
     async def pg_engine_scope(self) -> AsyncGenerator[AsyncEngine]:
-        """DI Scope для AsyncEngine."""
-        engine = create_async_engine(
-            config.postgres.database_uri,
-            pool_size=config.postgres.pool_size,
-            max_overflow=config.postgres.overflow_pool_size,
-            pool_pre_ping=True,
-            isolation_level='AUTOCOMMIT',
-            # echo=True,
-        )
+        """DI Scope для AsyncEngine (primary)."""
+        engine = _create_pg_engine(config.postgres.database_uri, 'primary')
         yield engine
         await engine.dispose()
+
+    @provide
+    async def pg_replica_router_scope(
+        self,
+        engine: AsyncEngine,
+    ) -> AsyncGenerator[ReplicaRouter]:
+        """DI Scope для ReplicaRouter.
+
+        Без заданных реплик чтение идет в primary.
+        """
+        replica_engines = [
+            _create_pg_engine(uri, f'replica:{uri.host}:{uri.port}')
+            for uri in config.postgres.replica_database_uris
+        ]
+        yield ReplicaRouter(
+            replica_engines or [engine],
+            balancing=config.postgres.replica_balancing,
+        )
+        for replica_engine in replica_engines:
+            await replica_engine.dispose()
@@ -0,0 +1,77 @@
+from collections.abc import AsyncGenerator
+
+from dishka import Provider
+from dishka import Scope
+from dishka import provide
+
+from app.api.utils.cache.base import CacheBackend
+from app.api.utils.cache.base import NullCache
+from app.api.utils.cache.memory import MemoryCache
+from app.api.utils.cache.metrics import register_cache_metrics
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.cache.tiered import TieredCache
+from app.config import config
+
+
+class CacheProvider(Provider):
+    scope = Scope.APP
+
+    @provide
+    async def cache_scope(self) -> AsyncGenerator[CacheBackend]:
+        """DI Scope для кэша сущностей.
+
+        Уровень в памяти процесса есть всегда, Redis подключается, если задан
+        REDIS__URL.
+        """
+        if not config.cache.enabled:
+            yield NullCache()
+            return
+
+        memory_cache = MemoryCache(
+            max_size=config.cache.memory_max_size,
+            ttl=config.cache.memory_ttl,
+        )
+        if config.redis.url is None:
+            if config.common.prometheus_enabled:
+                register_cache_metrics(memory_cache)
+            yield memory_cache
+            return
+
+        from app.infra.redis.cache import RedisCache
+        from app.infra.redis.client import create_redis_client
+
+        client = create_redis_client(config.redis.url)
+        redis_cache = RedisCache(client, ttl=config.cache.redis_ttl)
+        if config.common.prometheus_enabled:
+            register_cache_metrics(memory_cache, redis_cache)
+        yield TieredCache(memory_cache, redis_cache)
+        await client.aclose()
+
+    @provide
+    async def response_cache_scope(self) -> AsyncGenerator[ResponseCache]:
+        """DI Scope для кэша HTTP ответов (@cache_response).
+
+        Уровень в памяти процесса есть всегда, Redis подключается, если задан
+        REDIS__URL.
+        """
+        memory_cache = MemoryCache(
+            max_size=config.response_cache.memory_max_size,
+            ttl=config.response_cache.memory_ttl,
+        )
+        if config.redis.url is None:
+            response_cache = ResponseCache(memory_cache)
+            if config.common.prometheus_enabled:
+                register_cache_metrics(response_cache)
+            yield response_cache
+            return
+
+        from app.infra.redis.client import create_redis_client
+        from app.infra.redis.response_cache import RedisResponseCache
+
+        client = create_redis_client(config.redis.url)
+        redis_cache = RedisResponseCache(client, ttl=config.response_cache.redis_ttl)
+        response_cache = ResponseCache(memory_cache, redis_cache)
+        if config.common.prometheus_enabled:
+            register_cache_metrics(response_cache, redis_cache)
+        yield response_cache
+        await client.aclose()
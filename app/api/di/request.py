@@ -6,6 +6,9 @@ from dishka import provide
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.sqlalchemy.replicas import ReadAsyncSession
+from app.api.utils.sqlalchemy.replicas import ReplicaRouter
+
 
 class RequestProvider(Provider):
     scope = Scope.REQUEST
@@ -15,6 +18,20 @@ class RequestProvider(Provider):
         self,
         engine: AsyncEngine,
     ) -> AsyncGenerator[AsyncSession]:
-        """DI Scope для AsyncGenerator[AsyncSession, None]."""
-        async with AsyncSession(engine) as session:
+        """DI Scope для AsyncGenerator[AsyncSession, None].
+
+        Сессия берет соединение из пула только на первом запросе. Юзкейс
+        коммитит ее на выходе, поэтому объекты не должны протухать после коммита:
+        их еще сериализуют в ответ.
+        """
+        async with AsyncSession(engine, expire_on_commit=False) as session:
             yield session
+
+    @provide
+    async def pg_read_session_scope(
+        self,
+        router: ReplicaRouter,
+    ) -> AsyncGenerator[ReadAsyncSession]:
+        """DI Scope для сессии на чтение c реплики."""
+        async with AsyncSession(router.get_engine(), expire_on_commit=False) as session:
+            yield ReadAsyncSession(session)
@@ -3,13 +3,27 @@ from dishka import Scope
 from dishka import provide
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.cache.base import CacheBackend
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.sqlalchemy.replicas import ReadAsyncSession
 from app.api.v1.usecases.role.create import CreateRoleUsecase
+from app.api.v1.usecases.role.export import ExportRolesUsecase
 from app.api.v1.usecases.role.get_all import GetAllRolesUsecase
 from app.api.v1.usecases.role.get_by_id import GetRoleByIdUsecase
+from app.api.v1.usecases.role.get_last_modified import GetRoleLastModifiedUsecase
+from app.api.v1.usecases.user.batch_create import BatchCreateUsersUsecase
+from app.api.v1.usecases.user.batch_delete import BatchDeleteUsersUsecase
+from app.api.v1.usecases.user.batch_update import BatchUpdateUsersUsecase
+from app.api.v1.usecases.user.batch_upsert import BatchUpsertUsersUsecase
 from app.api.v1.usecases.user.create import CreateUserUsecase
 from app.api.v1.usecases.user.delete import DeleteUserUsecase
+from app.api.v1.usecases.user.export import ExportUsersUsecase
 from app.api.v1.usecases.user.get_all import GetAllUsersUsecase
+from app.api.v1.usecases.user.get_all_with_roles import GetAllUsersWithRolesUsecase
 from app.api.v1.usecases.user.get_by_id import GetUserByIdUsecase
+from app.api.v1.usecases.user.get_last_modified import GetUserLastModifiedUsecase
+from app.api.v1.usecases.user.import_users import ImportUsersUsecase
+from app.api.v1.usecases.user.update import UpdateUserUsecase
 
 
 class UsecaseProvider(Provider):
@@ -34,39 +48,138 @@ class UsecaseProvider(Provider):
     @provide
     async def get_all_users_usecase_scope(
         self,
-        session: AsyncSession,
+        session: ReadAsyncSession,
     ) -> GetAllUsersUsecase:
         """DI Scope для GetAllUsersUsecase."""
         return GetAllUsersUsecase(session=session)
 
+    @provide
+    async def get_all_users_with_roles_usecase_scope(
+        self,
+        session: ReadAsyncSession,
+    ) -> GetAllUsersWithRolesUsecase:
+        """DI Scope для GetAllUsersWithRolesUsecase."""
+        return GetAllUsersWithRolesUsecase(session=session)
+
+    @provide
+    async def export_users_usecase_scope(
+        self,
+        session: ReadAsyncSession,
+    ) -> ExportUsersUsecase:
+        """DI Scope для ExportUsersUsecase."""
+        return ExportUsersUsecase(session=session)
+
     @provide
     async def get_user_by_id_usecase_scope(
         self,
+        # Валидаторы условного запроса и тело читаем c primary: отстающая
+        # реплика отдала бы 304 на уже измененную запись
         session: AsyncSession,
     ) -> GetUserByIdUsecase:
         """DI Scope для GetUserByIdUsecase."""
         return GetUserByIdUsecase(session=session)
 
+    @provide
+    async def get_user_last_modified_usecase_scope(
+        self,
+        # Как и GetUserByIdUsecase, читаем c primary
+        session: AsyncSession,
+    ) -> GetUserLastModifiedUsecase:
+        """DI Scope для GetUserLastModifiedUsecase."""
+        return GetUserLastModifiedUsecase(session=session)
+
+    @provide
+    async def update_user_usecase_scope(
+        self,
+        session: AsyncSession,
+    ) -> UpdateUserUsecase:
+        """DI Scope для UpdateUserUsecase."""
+        return UpdateUserUsecase(session=session)
+
+    @provide
+    async def batch_create_users_usecase_scope(
+        self,
+        session: AsyncSession,
+    ) -> BatchCreateUsersUsecase:
+        """DI Scope для BatchCreateUsersUsecase."""
+        return BatchCreateUsersUsecase(session=session)
+
+    @provide
+    async def batch_delete_users_usecase_scope(
+        self,
+        session: AsyncSession,
+    ) -> BatchDeleteUsersUsecase:
+        """DI Scope для BatchDeleteUsersUsecase."""
+        return BatchDeleteUsersUsecase(session=session)
+
+    @provide
+    async def batch_update_users_usecase_scope(
+        self,
+        session: AsyncSession,
+    ) -> BatchUpdateUsersUsecase:
+        """DI Scope для BatchUpdateUsersUsecase."""
+        return BatchUpdateUsersUsecase(session=session)
+
+    @provide
+    async def batch_upsert_users_usecase_scope(
+        self,
+        session: AsyncSession,
+    ) -> BatchUpsertUsersUsecase:
+        """DI Scope для BatchUpsertUsersUsecase."""
+        return BatchUpsertUsersUsecase(session=session)
+
+    @provide
+    async def import_users_usecase_scope(
+        self,
+        session: AsyncSession,
+    ) -> ImportUsersUsecase:
+        """DI Scope для ImportUsersUsecase."""
+        return ImportUsersUsecase(session=session)
+
     @provide
     async def create_role_usecase_scope(
         self,
         session: AsyncSession,
+        cache: CacheBackend,
+        response_cache: ResponseCache,
     ) -> CreateRoleUsecase:
         """DI Scope для CreateRoleUsecase."""
-        return CreateRoleUsecase(session=session)
+        return CreateRoleUsecase(
+            session=session, cache=cache, response_cache=response_cache
+        )
 
     @provide
     async def get_all_roles_usecase_scope(
         self,
-        session: AsyncSession,
+        session: ReadAsyncSession,
     ) -> GetAllRolesUsecase:
         """DI Scope для GetAllRolesUsecase."""
         return GetAllRolesUsecase(session=session)
 
+    @provide
+    async def export_roles_usecase_scope(
+        self,
+        session: ReadAsyncSession,
+    ) -> ExportRolesUsecase:
+        """DI Scope для ExportRolesUsecase."""
+        return ExportRolesUsecase(session=session)
+
     @provide
     async def get_role_by_id_usecase_scope(
         self,
+        # Как и GetUserByIdUsecase, читаем c primary
         session: AsyncSession,
+        cache: CacheBackend,
     ) -> GetRoleByIdUsecase:
         """DI Scope для GetRoleByIdUsecase."""
-        return GetRoleByIdUsecase(session=session)
+        return GetRoleByIdUsecase(session=session, cache=cache)
+
+    @provide
+    async def get_role_last_modified_usecase_scope(
+        self,
+        # Как и GetUserByIdUsecase, читаем c primary
+        session: AsyncSession,
+        cache: CacheBackend,
+    ) -> GetRoleLastModifiedUsecase:
+        """DI Scope для GetRoleLastModifiedUsecase."""
+        return GetRoleLastModifiedUsecase(session=session, cache=cache)
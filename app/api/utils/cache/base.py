@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from typing import Any
+from typing import Protocol
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Счетчики кэша для метрик."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class CacheMetricsSource(Protocol):
+    """Кэш, счетчики которого отдаются в /metrics."""
+
+    name: str
+    stats: CacheStats
+
+
+class CacheBackend(CacheMetricsSource, Protocol):
+    """Интерфейс бэкенда кэша.
+
+    Значение - JSON-совместимые данные. None означает промах, поэтому None
+    в кэш не кладем.
+    """
+
+    async def get(self, key: str) -> Any | None:
+        """Получаем значение по ключу или None при промахе."""
+        ...
+
+    async def set(self, key: str, value: Any) -> None:
+        """Кладем значение по ключу."""
+        ...
+
+    async def delete(self, *keys: str) -> None:
+        """Удаляем ключи."""
+        ...
+
+
+class NullCache:
+    """Выключенный кэш: всегда промах, ничего не хранит."""
+
+    name = 'null'
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Any | None:
+        """Всегда промах."""
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """Ничего не кладем."""
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        """Удалять нечего."""
+        pass
@@ -0,0 +1,70 @@
+import time
+
+from collections import OrderedDict
+from typing import Any
+
+from app.api.utils.cache.base import CacheStats
+
+
+class MemoryCache:
+    """Кэш в памяти процесса c TTL и вытеснением давно не читанных записей (LRU).
+
+    Работает без локов: все операции синхронные и выполняются в event loop
+    целиком, между ними нет await.
+    """
+
+    name = 'memory'
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Any | None:
+        """Получаем значение по ключу.
+
+        Протухшая запись удаляется при чтении и считается промахом.
+
+        Args:
+            key: str - ключ
+
+        Returns:
+            Any | None - None при промахе
+        """
+        item = self._data.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.stats.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """Кладем значение, вытесняя самые давние записи сверх max_size.
+
+        Args:
+            key: str - ключ
+            value: Any - значение
+        """
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        """Удаляем ключи, отсутствующие пропускаем."""
+        for key in keys:
+            self._data.pop(key, None)
@@ -0,0 +1,53 @@
+from typing import Any
+
+from app.api.utils.cache.base import CacheMetricsSource
+
+_caches: dict[str, CacheMetricsSource] = {}
+_metrics_registered = False
+
+
+def register_cache_metrics(*caches: CacheMetricsSource) -> None:
+    """Отдаем счетчики кэшей в /metrics.
+
+    Кэш c тем же именем заменяет ранее зарегистрированный, поэтому пересоздание
+    DI контейнера не плодит метрики.
+
+    Args:
+        caches: CacheMetricsSource - кэши, счетчики которых нужно отдавать
+    """
+    global _metrics_registered
+
+    for cache in caches:
+        _caches[cache.name] = cache
+
+    if _metrics_registered:
+        return
+
+    from prometheus_client import REGISTRY
+    from prometheus_client.core import CounterMetricFamily
+    from prometheus_client.registry import Collector
+
+    class CacheCollector(Collector):
+        def collect(self) -> Any:
+            hits = CounterMetricFamily(
+                'cache_hits', 'Попадания в кэш', labels=['cache']
+            )
+            misses = CounterMetricFamily(
+                'cache_misses', 'Промахи кэша', labels=['cache']
+            )
+            evictions = CounterMetricFamily(
+                'cache_evictions',
+                'Записи, вытесненные из кэша из-за лимита размера',
+                labels=['cache'],
+            )
+            for name, cache in _caches.items():
+                hits.add_metric([name], cache.stats.hits)
+                misses.add_metric([name], cache.stats.misses)
+                evictions.add_metric([name], cache.stats.evictions)
+
+            yield hits
+            yield misses
+            yield evictions
+
+    REGISTRY.register(CacheCollector())
+    _metrics_registered = True
@@ -0,0 +1,219 @@
+"""HTTP кэш ответов GET ручек c инвалидацией по тегам."""
+
+from collections.abc import Callable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Protocol
+
+from starlette.routing import BaseRoute
+
+from app.api.utils.cache.base import CacheMetricsSource
+from app.api.utils.cache.base import CacheStats
+from app.api.utils.cache.memory import MemoryCache
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseCachePolicy:
+    """Настройки кэша ответа ручки."""
+
+    # Теги, по которым запись инвалидируется
+    tags: tuple[str, ...]
+    # Заголовки запроса, которые входят в ключ (в нижнем регистре)
+    vary: tuple[bytes, ...] = ()
+
+
+# (модуль, qualname ручки) -> настройки кэша
+_policies: dict[tuple[str, str], ResponseCachePolicy] = {}
+
+
+def cache_response[EndpointT: Callable](
+    *tags: str, vary: Sequence[str] = ()
+) -> Callable[[EndpointT], EndpointT]:
+    """Включаем кэш ответа ручки в ResponseCacheMiddleware.
+
+    Ставится под декоратором роутера:
+
+        @router.get('/{role_id}')
+        @cache_response('roles')
+        async def get_role_by_id(...): ...
+
+    Юзкейсы, которые меняют данные ручки, сбрасывают ее теги через
+    InvalidatesResponseCacheMixin.
+
+    Args:
+        tags: str - теги записи
+        vary: Sequence[str] - заголовки запроса, от которых зависит ответ
+
+    Returns:
+        Callable[[EndpointT], EndpointT]
+    """
+    policy = ResponseCachePolicy(
+        tags=tags, vary=tuple(header.lower().encode('latin-1') for header in vary)
+    )
+
+    def decorator(endpoint: EndpointT) -> EndpointT:
+        # DishkaRoute оборачивает ручку без копирования атрибутов, но сохраняет
+        # ее модуль и qualname
+        _policies[endpoint.__module__, endpoint.__qualname__] = policy
+        return endpoint
+
+    return decorator
+
+
+def get_response_cache_policy(route: BaseRoute) -> ResponseCachePolicy | None:
+    """Настройки кэша GET роута или None, если ответ не кэшируется.
+
+    Args:
+        route: BaseRoute
+
+    Returns:
+        ResponseCachePolicy | None
+    """
+    endpoint = getattr(route, 'endpoint', None)
+    if endpoint is None or 'GET' not in (getattr(route, 'methods', None) or ()):
+        return None
+    return _policies.get((endpoint.__module__, endpoint.__qualname__))
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """Закодированный ответ: статус, сырые заголовки и тело."""
+
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    def get_header(self, name: bytes) -> bytes | None:
+        """Значение заголовка по имени в нижнем регистре."""
+        return next((value for key, value in self.headers if key == name), None)
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseCacheLookup:
+    """Результат чтения кэша ответов.
+
+    Хранит версии тегов на момент чтения: ответ, собранный после промаха,
+    кладется в кэш, только если теги c тех пор не инвалидировали.
+    """
+
+    key: str
+    tags: tuple[str, ...]
+    memory_key: str
+    # Версии тегов в общем уровне, None - общего уровня нет или он недоступен
+    shared_versions: tuple[int, ...] | None
+    response: CachedResponse | None
+
+
+class SharedResponseCache(CacheMetricsSource, Protocol):
+    """Общий для воркеров уровень кэша ответов, например Redis."""
+
+    async def get(
+        self, key: str, tags: Sequence[str]
+    ) -> tuple[CachedResponse | None, tuple[int, ...] | None]:
+        """Получаем ответ по ключу и версии тегов одним чтением.
+
+        Ответ None при промахе, версии None, если уровень недоступен.
+        """
+        ...
+
+    async def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Sequence[str],
+        versions: tuple[int, ...],
+    ) -> None:
+        """Кладем ответ, если версии тегов не изменились c чтения."""
+        ...
+
+    async def invalidate(self, *tags: str) -> None:
+        """Удаляем ответы c тегами."""
+        ...
+
+
+class ResponseCache:
+    """Кэш ответов: LRU в памяти процесса и, опционально, общий уровень.
+
+    В памяти ключ содержит версии тегов, поэтому инвалидация тега - это
+    увеличение его версии: старые записи больше не находятся и вытесняются LRU
+    или TTL. Инвалидация в памяти не доходит до других воркеров, поэтому TTL в
+    памяти держим коротким. Общий уровень ведет свои версии тегов, общие для
+    воркеров, и удаляет записи тегов сам.
+    """
+
+    name = 'response'
+
+    def __init__(
+        self,
+        memory: MemoryCache,
+        shared: SharedResponseCache | None = None,
+    ) -> None:
+        self.memory = memory
+        self.shared = shared
+        self.stats = CacheStats()
+        self._tag_versions: dict[str, int] = {}
+
+    async def get(self, key: str, tags: Sequence[str]) -> ResponseCacheLookup:
+        """Получаем ответ из памяти, затем из общего уровня.
+
+        Args:
+            key: str - ключ запроса
+            tags: Sequence[str] - теги ручки
+
+        Returns:
+            ResponseCacheLookup - ответ (None при промахе) и версии тегов
+        """
+        memory_key = self._get_memory_key(key, tags)
+        shared_versions = None
+        response = await self.memory.get(memory_key)
+        if response is None and self.shared is not None:
+            response, shared_versions = await self.shared.get(key, tags)
+            if response is not None:
+                await self.memory.set(memory_key, response)
+
+        if response is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return ResponseCacheLookup(
+            key=key,
+            tags=tuple(tags),
+            memory_key=memory_key,
+            shared_versions=shared_versions,
+            response=response,
+        )
+
+    async def set(self, lookup: ResponseCacheLookup, response: CachedResponse) -> None:
+        """Кладем ответ, если его теги не инвалидировали, пока он собирался.
+
+        Ответ мог собраться из данных до записи, которая сбросила теги. Память
+        сверяет версии этого воркера, общий уровень - свои, общие для воркеров.
+
+        Args:
+            lookup: ResponseCacheLookup - результат get до сборки ответа
+            response: CachedResponse
+        """
+        if lookup.memory_key != self._get_memory_key(lookup.key, lookup.tags):
+            return
+
+        await self.memory.set(lookup.memory_key, response)
+        if self.shared is not None and lookup.shared_versions is not None:
+            await self.shared.set(
+                lookup.key, response, lookup.tags, lookup.shared_versions
+            )
+
+    async def invalidate(self, *tags: str) -> None:
+        """Сбрасываем записи c тегами.
+
+        Args:
+            tags: str - теги
+        """
+        for tag in tags:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+        if self.shared is not None:
+            await self.shared.invalidate(*tags)
+
+    def _get_memory_key(self, key: str, tags: Sequence[str]) -> str:
+        """Ключ в памяти c текущими версиями тегов."""
+        versions = self._tag_versions
+        return f'{key}#{".".join(str(versions.get(tag, 0)) for tag in tags)}'
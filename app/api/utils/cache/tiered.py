@@ -0,0 +1,51 @@
+from typing import Any
+
+from app.api.utils.cache.base import CacheBackend
+from app.api.utils.cache.base import CacheStats
+
+
+class TieredCache:
+    """Многоуровневый кэш: читаем по порядку, от быстрого уровня к медленному.
+
+    Значение, найденное на нижнем уровне, дописывается во все уровни выше.
+    Запись и удаление идут во все уровни.
+    """
+
+    name = 'tiered'
+
+    def __init__(self, *tiers: CacheBackend) -> None:
+        self.tiers = tiers
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Any | None:
+        """Получаем значение c первого уровня, где оно есть.
+
+        Args:
+            key: str - ключ
+
+        Returns:
+            Any | None - None, если промах на всех уровнях
+        """
+        for index, tier in enumerate(self.tiers):
+            value = await tier.get(key)
+            if value is None:
+                continue
+
+            for upper_tier in self.tiers[:index]:
+                await upper_tier.set(key, value)
+            self.stats.hits += 1
+            return value
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """Кладем значение во все уровни."""
+        for tier in self.tiers:
+            await tier.set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        """Удаляем ключи из всех уровней."""
+        # Сначала медленный общий уровень, чтобы быстрый не дописался из него
+        for tier in reversed(self.tiers):
+            await tier.delete(*keys)
@@ -0,0 +1,126 @@
+"""Условные GET запросы: ETag, Last-Modified и 304 для сущностей."""
+
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from email.utils import format_datetime
+from email.utils import parsedate_to_datetime
+from typing import Any
+from typing import Self
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+
+def is_conditional_request(headers: Headers) -> bool:
+    """Клиент прислал валидаторы закэшированной копии.
+
+    Args:
+        headers: Headers - заголовки запроса
+
+    Returns:
+        bool
+    """
+    return 'if-none-match' in headers or 'if-modified-since' in headers
+
+
+def is_not_modified(
+    headers: Headers, *, etag: str | None, last_modified: datetime | None
+) -> bool:
+    """Копия клиента c такими валидаторами актуальна.
+
+    If-None-Match сравнивается слабо и, если передан, перекрывает
+    If-Modified-Since. Last-Modified в HTTP c точностью до секунды.
+
+    Args:
+        headers: Headers - заголовки запроса
+        etag: str | None - ETag актуальной версии
+        last_modified: datetime | None - время изменения актуальной версии
+
+    Returns:
+        bool
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        if etag is None:
+            return False
+        etag = etag.removeprefix('W/')
+        return any(
+            tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(',')
+        )
+
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+@dataclass(frozen=True, slots=True)
+class EntityValidators:
+    """Валидаторы версии сущности для кэша клиента.
+
+    ETag слабый: он меняется вместе co временем изменения записи, a не c
+    байтами ответа, поэтому сжатый и несжатый ответы считаются одной версией.
+    """
+
+    etag: str
+    last_modified: datetime
+
+    @classmethod
+    def create(cls, _id: Any, last_modified: datetime) -> Self:
+        """Валидаторы по PK и времени изменения записи.
+
+        Args:
+            _id: Any - PK сущности
+            last_modified: datetime - время последнего изменения
+
+        Returns:
+            EntityValidators
+        """
+        if last_modified.tzinfo is None:
+            # Колонки без timezone хранят UTC
+            last_modified = last_modified.replace(tzinfo=UTC)
+        version = int(last_modified.timestamp() * 1_000_000)
+        return cls(etag=f'W/"{_id}-{version:x}"', last_modified=last_modified)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Заголовки ответа c валидаторами."""
+        return {
+            'ETag': self.etag,
+            'Last-Modified': format_datetime(
+                self.last_modified.astimezone(UTC), usegmt=True
+            ),
+            # Клиент может хранить ответ, но перед использованием перепроверяет
+            'Cache-Control': 'no-cache',
+        }
+
+    def is_not_modified(self, headers: Headers) -> bool:
+        """Копия клиента актуальна.
+
+        Args:
+            headers: Headers - заголовки запроса
+
+        Returns:
+            bool
+        """
+        return is_not_modified(
+            headers, etag=self.etag, last_modified=self.last_modified
+        )
+
+    def get_not_modified_response(self) -> Response:
+        """Пустой ответ 304 c валидаторами.
+
+        Returns:
+            Response
+        """
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=self.headers)
@@ -0,0 +1,7 @@
+from app.api.utils.enums.base_enum import BaseENUM
+
+
+class ContentEncodingEnum(BaseENUM):
+    GZIP = 'gzip'  # zlib из стандартной библиотеки
+    BROTLI = 'br'  # нужен пакет brotli
+    ZSTD = 'zstd'  # нужен пакет zstandard
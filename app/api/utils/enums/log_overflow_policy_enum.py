@@ -0,0 +1,6 @@
+from app.api.utils.enums.base_enum import BaseENUM
+
+
+class LogOverflowPolicyEnum(BaseENUM):
+    DROP = 'DROP'  # Отбрасываем запись, если очередь логов переполнена
+    BLOCK = 'BLOCK'  # Ждем, пока в очереди освободится место
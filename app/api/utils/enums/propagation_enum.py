@@ -0,0 +1,9 @@
+from app.api.utils.enums.base_enum import BaseENUM
+
+
+class PropagationEnum(BaseENUM):
+    REQUIRED = 'REQUIRED'  # Присоединяемся к транзакции внешнего юзкейса или ведем свою
+    REQUIRES_NEW = 'REQUIRES_NEW'  # Всегда своя транзакция, нужна отдельная сессия
+    NESTED = 'NESTED'  # Внутри транзакции внешнего юзкейса - в SAVEPOINT
+    READ_ONLY = 'READ_ONLY'  # Без транзакции, только возвращаем соединение в пул
+    NONE = 'NONE'  # Без обертки, сессией управляет вызывающий код
@@ -0,0 +1,6 @@
+from app.api.utils.enums.base_enum import BaseENUM
+
+
+class ReplicaBalancingEnum(BaseENUM):
+    ROUND_ROBIN = 'ROUND_ROBIN'  # Реплики по очереди
+    LEAST_LATENCY = 'LEAST_LATENCY'  # Реплика c наименьшим временем запросов
@@ -0,0 +1,6 @@
+from app.api.utils.enums.base_enum import BaseENUM
+
+
+class StreamFormatEnum(BaseENUM):
+    NDJSON = 'ndjson'
+    JSON = 'json'
@@ -1,70 +1,224 @@
 import logging
+import queue
 import sys
+import threading
 import traceback
 
 from datetime import UTC
-from datetime import datetime
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import TextIO
 
 from loguru import logger
 from orjson import orjson
 
 from app.api.utils.enums.env_enum import EnvEnum
+from app.api.utils.enums.log_overflow_policy_enum import LogOverflowPolicyEnum
 from app.config import config
 
+if TYPE_CHECKING:
+    from loguru import Message
 
-async def init_logger() -> None:
-    """Метод инициализации логеров."""
+_STOP = object()
 
-    def serialize_extra(record: Any) -> str:
-        """Сериализуем дополнительную информацию.
 
-        Args:
-            record: Record - запись лога
+def serialize_record(record: Any) -> str:
+    """Сериализуем запись лога в JSON строку.
 
-        Returns:
-            dict - словарь с выводом
-        """
-        exception = record['exception']
-        extra = record['extra']
-        exc, exc_value, tb = (None, None, None)
-        if exception:
-            exc, exc_value, tb = exception
-
-            if tb:
-                tb = traceback.format_tb(tb)
-
-        subset = {
-            'level': record['level'].name,
-            'message': record['message'],
-            'additional_data': dict(extra),
-            'datetime_utc': datetime.now(tz=UTC).strftime('%d.%m.%Y, %H:%M:%S'),
-            'timestamp': record['time'].timestamp(),
-            'exception': str(exc),
-            'exc_value': str(exc_value),
-            'traceback': tb,
-        }
-        return orjson.dumps(subset).decode('utf-8')
-
-    def formatter(record: Any) -> str:
-        """Колбек для форматирования вывода.
+    Args:
+        record: Record - запись лога
+
+    Returns:
+        str - JSON строка c переводом строки
+    """
+    exception = record['exception']
+    extra = record['extra']
+    exc, exc_value, tb = (None, None, None)
+    if exception:
+        exc, exc_value, tb = exception
+
+        if tb:
+            tb = traceback.format_tb(tb)
+
+    subset = {
+        'level': record['level'].name,
+        'message': record['message'],
+        'additional_data': dict(extra),
+        'datetime_utc': record['time'].astimezone(UTC).strftime('%d.%m.%Y, %H:%M:%S'),
+        'timestamp': record['time'].timestamp(),
+        'exception': str(exc),
+        'exc_value': str(exc_value),
+        'traceback': tb,
+    }
+    return orjson.dumps(subset, default=str).decode('utf-8') + '\n'
+
+
+class BatchedLogSink:
+    """Синк loguru, который пишет логи из фонового потока пачками.
+
+    Вызывающий код (корутина запроса) только кладет запись в ограниченную очередь.
+    Сериализация и запись в stream происходят в отдельном потоке, поэтому медленный
+    stdout не блокирует event loop. Все, что накопилось в очереди к моменту записи,
+    склеивается в одну запись в stream.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        *,
+        max_queue_size: int = 10000,
+        batch_size: int = 256,
+        overflow_policy: LogOverflowPolicyEnum = LogOverflowPolicyEnum.DROP,
+    ) -> None:
+        self._stream = stream
+        self._batch_size = batch_size
+        self._overflow_policy = overflow_policy
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.written = 0
+
+        self._worker = threading.Thread(
+            target=self._run, name='log-sink-writer', daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def queued(self) -> int:
+        """Сколько записей сейчас ждет записи в stream."""
+        return self._queue.qsize()
+
+    def write(self, message: 'Message') -> None:
+        """Принимаем сообщение от loguru. Вызывается в потоке, который логирует.
 
         Args:
-            record: Record - запись лога
+            message: Message - отформатированное сообщение loguru c полем record
+        """
+        if self._overflow_policy == LogOverflowPolicyEnum.BLOCK:
+            self._queue.put(message.record)
+            return
+
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            self.dropped += 1
 
-        Returns:
-            str - отформатированный вывод
+    def stop(self) -> None:
+        """Дописываем все, что осталось в очереди, и останавливаем поток.
+
+        Вызывается loguru при logger.remove().
         """
-        record['extra']['serialized'] = serialize_extra(record)
-        return '{extra[serialized]}\n'
+        self._queue.put(_STOP)
+        self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            records = [record for record in batch if record is not _STOP]
+            if records:
+                self._stream.write(''.join(map(serialize_record, records)))
+                self._stream.flush()
+                self.written += len(records)
+
+            if stop:
+                return
+
+
+_log_handler_id: int | None = None
+_metrics_registered = False
+log_sink: BatchedLogSink | None = None
+
+
+async def init_logger() -> None:
+    """Метод инициализации логеров."""
+    global _log_handler_id, log_sink
 
     # Глушим стандартные логеры ювикорна
     logging.getLogger('uvicorn.access').handlers = []
     logging.getLogger('uvicorn.error').handlers = []
     if not config.common.human_readable_logs:
         logger.remove()
-        logger.add(sys.stdout, format=formatter, level=config.common.log_level.value)
+        log_sink = BatchedLogSink(
+            sys.stdout,
+            max_queue_size=config.common.log_queue_size,
+            batch_size=config.common.log_batch_size,
+            overflow_policy=config.common.log_overflow_policy,
+        )
+        # Форматирование делает сам синк в фоновом потоке
+        _log_handler_id = logger.add(
+            log_sink, format='{message}', level=config.common.log_level.value
+        )
+
+        if config.common.prometheus_enabled:
+            _register_log_sink_metrics()
 
     if config.common.environment.value != EnvEnum.LOCAL.name:
         # Вырубаем стандартный стектрейс
         logging.getLogger('uvicorn.error').propagate = False
+
+
+async def close_logger() -> None:
+    """Дописываем накопленные логи при остановке приложения."""
+    global _log_handler_id, log_sink
+
+    if _log_handler_id is None:
+        return
+
+    logger.remove(_log_handler_id)
+    # Все, что логируется после остановки, пишем синхронно в том же формате
+    _log_handler_id = logger.add(
+        _write_stdout,
+        format='{message}',
+        level=config.common.log_level.value,
+    )
+    log_sink = None
+
+
+def _write_stdout(message: 'Message') -> None:
+    sys.stdout.write(serialize_record(message.record))
+
+
+def _register_log_sink_metrics() -> None:
+    """Отдаем счетчики синка в /metrics."""
+    global _metrics_registered
+
+    if _metrics_registered:
+        return
+
+    from prometheus_client import REGISTRY
+    from prometheus_client.core import CounterMetricFamily
+    from prometheus_client.core import GaugeMetricFamily
+    from prometheus_client.registry import Collector
+
+    class LogSinkCollector(Collector):
+        def collect(self) -> Any:
+            if log_sink is None:
+                return
+
+            queued = GaugeMetricFamily(
+                'log_sink_queued_records', 'Записи логов в очереди на запись'
+            )
+            queued.add_metric([], log_sink.queued)
+            yield queued
+
+            dropped = CounterMetricFamily(
+                'log_sink_dropped_records',
+                'Записи логов, отброшенные из-за переполнения очереди',
+            )
+            dropped.add_metric([], log_sink.dropped)
+            yield dropped
+
+            written = CounterMetricFamily(
+                'log_sink_written_records', 'Записи логов, записанные в stream'
+            )
+            written.add_metric([], log_sink.written)
+            yield written
+
+    REGISTRY.register(LogSinkCollector())
+    _metrics_registered = True
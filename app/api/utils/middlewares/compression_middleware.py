@@ -0,0 +1,297 @@
+import zlib
+
+from collections.abc import Callable
+from functools import partial
+from typing import Protocol
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.api.utils.enums.content_encoding_enum import ContentEncodingEnum
+from app.config import CompressionSettings
+from app.config import config
+
+# Ответы без тела, сжимать нечего
+_NO_BODY_STATUSES = frozenset((204, 304))
+# Столько разных Accept-Encoding помним, обычно их единицы
+_NEGOTIATION_CACHE_SIZE = 64
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """Сжимаем очередной кусок, вывод может остаться в буфере."""
+
+    def flush(self) -> bytes:
+        """Отдаем все сжатое на текущий момент, поток продолжается."""
+
+    def finish(self) -> bytes:
+        """Завершаем поток."""
+
+
+class _GzipCompressor:
+    __slots__ = ('_compressobj',)
+
+    def __init__(self, level: int) -> None:
+        # wbits 16 + 15 - gzip заголовок и окно 32Кб
+        self._compressobj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressobj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressobj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressobj.flush()
+
+
+class _BrotliCompressor:
+    __slots__ = ('_compressor',)
+
+    def __init__(self, quality: int) -> None:
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    __slots__ = ('_compressobj', '_flush_block')
+
+    def __init__(self, level: int) -> None:
+        import zstandard
+
+        self._compressobj = zstandard.ZstdCompressor(level=level).compressobj()
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressobj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressobj.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressobj.flush()
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """Разбираем Accept-Encoding в кодировки c их q.
+
+    Args:
+        accept_encoding: str - заголовок Accept-Encoding
+
+    Returns:
+        dict[str, float] - кодировка в нижнем регистре -> q, 0 значит запрет
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def _get_compressor_factory(
+    encoding: ContentEncodingEnum, settings: CompressionSettings
+) -> Callable[[], _Compressor]:
+    match encoding:
+        case ContentEncodingEnum.GZIP:
+            return partial(_GzipCompressor, settings.gzip_level)
+        case ContentEncodingEnum.BROTLI:
+            return partial(_BrotliCompressor, settings.brotli_quality)
+        case ContentEncodingEnum.ZSTD:
+            return partial(_ZstdCompressor, settings.zstd_level)
+
+
+class CompressionMiddleware:
+    """Сжатие ответов c выбором кодировки по Accept-Encoding.
+
+    Чистая ASGI мидла. Сжимаются только ответы из списка content_types не меньше
+    minimum_size байт и без своего Content-Encoding (например, уже сжатая
+    OpenAPI схема). Ответ одним куском сжимается целиком c Content-Length.
+    Потоковый ответ сжимается по кускам: каждый кусок сбрасывается клиенту
+    сразу, поэтому стриминг не копится в буфере мидлы.
+
+    Должна стоять снаружи RouterLoggingMiddleware, чтобы в логи попадал
+    несжатый ответ.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        settings: CompressionSettings = config.compression,
+    ) -> None:
+        self.app = app
+        self._minimum_size = settings.minimum_size
+        self._factories = {
+            encoding.value: _get_compressor_factory(encoding, settings)
+            for encoding in settings.encodings
+        }
+        for factory in self._factories.values():
+            # Падаем при старте, если пакет для br или zstd не установлен
+            factory()
+
+        content_types = [
+            content_type.encode() for content_type in settings.content_types
+        ]
+        self._content_types = frozenset(content_types)
+        self._content_type_prefixes = tuple(
+            content_type
+            for content_type in content_types
+            if content_type.endswith(b'/')
+        )
+        self._negotiated: dict[bytes, str | None] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Сжимаем ответ, если клиент это принимает.
+
+        Args:
+            scope: Scope - ASGI scope
+            receive: Receive - канал чтения сообщений запроса
+            send: Send - канал отправки сообщений ответа
+        """
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                encoding = self._negotiate(value)
+                break
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        factory = self._factories[encoding]
+        start_message: Message | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message['type'] == 'http.response.start':
+                if self._is_compressible(message):
+                    # Заголовки отправим, когда по первому куску станет ясно,
+                    # сжимаем ли ответ
+                    start_message = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if start_message is None or message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if compressor is None:
+                headers = MutableHeaders(scope=start_message)
+                content_length = headers.get('content-length')
+                size = len(body) if not more_body else content_length
+                if size is not None and int(size) < self._minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = factory()
+                self._set_encoding_headers(headers, encoding)
+                if not more_body:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers['content-length'] = str(len(body))
+                    await send(start_message)
+                    await send({'type': 'http.response.body', 'body': body})
+                    return
+
+                if content_length is not None:
+                    del headers['content-length']
+                await send(start_message)
+
+            if more_body:
+                chunk = compressor.compress(body) + compressor.flush()
+            else:
+                chunk = compressor.compress(body) + compressor.finish()
+            await send(
+                {'type': 'http.response.body', 'body': chunk, 'more_body': more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _negotiate(self, accept_encoding: bytes) -> str | None:
+        """Выбираем кодировку: первую из настроенных, которую принимает клиент.
+
+        Args:
+            accept_encoding: bytes - заголовок Accept-Encoding
+
+        Returns:
+            str | None - None, если ни одна не подходит
+        """
+        if accept_encoding in self._negotiated:
+            return self._negotiated[accept_encoding]
+
+        accepted = parse_accept_encoding(accept_encoding.decode('latin-1'))
+        encoding = next(
+            (
+                encoding
+                for encoding in self._factories
+                if accepted.get(encoding, accepted.get('*', 0.0)) > 0
+            ),
+            None,
+        )
+        if len(self._negotiated) >= _NEGOTIATION_CACHE_SIZE:
+            self._negotiated.clear()
+        self._negotiated[accept_encoding] = encoding
+        return encoding
+
+    def _is_compressible(self, message: Message) -> bool:
+        if message['status'] in _NO_BODY_STATUSES:
+            return False
+
+        content_type = None
+        for name, value in message.get('headers', ()):
+            match name.lower():
+                case b'content-encoding':
+                    return False
+                case b'content-type':
+                    content_type = value.split(b';', 1)[0].strip().lower()
+
+        return content_type is not None and (
+            content_type in self._content_types
+            or content_type.startswith(self._content_type_prefixes)
+        )
+
+    @staticmethod
+    def _set_encoding_headers(headers: MutableHeaders, encoding: str) -> None:
+        headers['content-encoding'] = encoding
+        headers.add_vary_header('Accept-Encoding')
+        # Сжатый ответ побайтово другой, строгий ETag становится слабым
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            headers['etag'] = f'W/{etag}'
@@ -1,26 +1,45 @@
-from __future__ import annotations
-
+import hashlib
+import hmac
+import secrets
+import time
 import typing as t
-import uuid
 
+from base64 import urlsafe_b64encode
 from collections.abc import Sequence
 from http import HTTPMethod
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qsl
 
 from starlette import status
 from starlette.datastructures import URL
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.middleware.base import Request
-from starlette.middleware.base import RequestResponseEndpoint
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.requests import cookie_parser
 from starlette.responses import Response
 from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
 
 from app.config import config
 
+_FORM_CONTENT_TYPES = (b'application/x-www-form-urlencoded', b'multipart/form-data')
 
-class CSRFMiddleware(BaseHTTPMiddleware):
-    @staticmethod
-    def _get_new_token() -> str:
-        return str(uuid.uuid4())
+
+class CSRFMiddleware:
+    """Проверка CSRF токена.
+
+    Чистая ASGI мидла. Токен подписан HMAC и содержит время выдачи, поэтому
+    проверяется без состояния: для токена в заголовке кука не нужна, сверяется
+    только подпись и срок жизни. Подделать заголовок cross-site запрос не может,
+    a тело запроса при этом не читается вовсе.
+
+    Тело читается только для формы c allow_form_param, когда токена в заголовке
+    нет. Токен формы, в отличие от заголовка, отправит и чужая страница, поэтому
+    он дополнительно должен совпасть c кукой (double submit). Прочитанное тело
+    передается приложению как есть.
+    """
 
     def __init__(
         self,
@@ -31,96 +50,232 @@ class CSRFMiddleware(BaseHTTPMiddleware):
         max_age: int = config.auth.csrf_expire_time,
         allow_header_param: bool = True,
         allow_form_param: bool = False,
-        **kwargs,
+        secret: str | None = config.auth.csrf_secret,
     ) -> None:
         assert isinstance(allowed_hosts, Sequence), (
             'allowed_hosts must be a sequence (list or tuple)'
         )
 
+        self.app = app
         self.allowed_hosts = allowed_hosts
         self.cookie_name = cookie_name
         self.header_name = header_name
         self.max_age = max_age
         self.allow_header_param = allow_header_param
         self.allow_form_param = allow_form_param
-        super().__init__(app, **kwargs)
+        # Без общего секрета токен одного воркера не пройдет проверку в другом
+        self._secret = (secret or secrets.token_urlsafe(32)).encode()
+        self._raw_header_name = header_name.lower().encode('latin-1')
+        self._safe_methods = frozenset(config.auth.safe_http_methods)
 
-    def _is_valid_referer(self, request: Request) -> bool:
-        url = URL(request.headers.get('origin') or request.headers.get('referer') or '')
-        return url.hostname in self.allowed_hosts if url.hostname else False
+    def get_new_token(self) -> str:
+        """Выдаем новый подписанный токен.
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        """Генерируем новый CSRF токен на каждый SAFE_HTTP_METHODS.
+        Returns:
+            str - nonce.время выдачи.подпись
+        """
+        payload = f'{secrets.token_urlsafe(16)}.{int(time.time())}'
+        return f'{payload}.{self._sign(payload)}'
+
+    def is_valid_token(self, token: str | None) -> bool:
+        """Проверяем подпись и срок жизни токена.
+
+        Args:
+            token: str | None
 
-        Для любого другого метода проверяем CSRF.
+        Returns:
+            bool
         """
-        if HTTPMethod(request.method) in config.auth.safe_http_methods:
-            token = request.cookies.get(self.cookie_name, None)
-            token_required = token is None
-
-            if token_required:
-                token = self._get_new_token()
-
-            request.scope.update(
-                {
-                    'csrftoken': token,
-                    'csrf_cookie_name': self.cookie_name,
-                }
-            )
-            response = await call_next(request)
+        if not token:
+            return False
 
-            if token_required and token:
-                response.set_cookie(
-                    self.cookie_name,
-                    token,
-                    max_age=self.max_age,
-                )
-            return response
+        payload, _, signature = token.rpartition('.')
+        issued_at = payload.rpartition('.')[2]
+        # isdigit пропускает и не ASCII цифры вроде '²', на которых падает int
+        if not (issued_at.isascii() and issued_at.isdigit()):
+            return False
+        if time.time() - int(issued_at) > self.max_age:
+            return False
+        return self._compare(self._sign(payload), signature)
 
-        cookie_token = request.cookies.get(self.cookie_name)
-        if not cookie_token:
-            return Response(
-                'No CSRF cookie found', status_code=status.HTTP_403_FORBIDDEN
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._secret, payload.encode(), hashlib.sha256).digest()
+        return urlsafe_b64encode(digest).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _compare(expected: str, actual: str) -> bool:
+        """Сравниваем строки за постоянное время.
+
+        compare_digest не принимает строки c не ASCII символами, поэтому
+        сравниваем байты, a то, что в latin-1 не кодируется, считаем подделкой.
+        """
+        try:
+            return hmac.compare_digest(
+                expected.encode('latin-1'), actual.encode('latin-1')
             )
+        except UnicodeEncodeError:
+            return False
 
-        header_token = (
-            request.headers.get(self.header_name) if self.allow_header_param else None
-        )
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Выдаем токен на SAFE_HTTP_METHODS, для остальных методов проверяем его.
 
-        if not self.allow_form_param or header_token:
-            form_data = await request.form()
-            form_token = form_data.get(self.cookie_name, None)
-            request.scope.update({'form': form_data})
-        else:
-            form_token = None
+        Args:
+            scope: Scope - ASGI scope
+            receive: Receive - канал чтения сообщений запроса
+            send: Send - канал отправки сообщений ответа
+        """
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        if HTTPMethod(scope['method']) in self._safe_methods:
+            await self._issue_token(scope, receive, send)
+            return
+
+        header_token = None
+        content_type = b''
+        for name, value in scope['headers']:
+            if name == self._raw_header_name and self.allow_header_param:
+                header_token = value.decode('latin-1')
+            elif name == b'content-type':
+                content_type = value
 
-        if not header_token and not form_token:
-            return Response(
+        if header_token is not None:
+            if not self.is_valid_token(header_token):
+                await self._reject(
+                    'CSRF токен в заголовке недействителен', scope, receive, send
+                )
+                return
+            token = header_token
+        elif self.allow_form_param and content_type.startswith(_FORM_CONTENT_TYPES):
+            token, receive = await self._get_form_token(scope, receive, content_type)
+            if token is None:
+                await self._reject(
+                    'CSRF токен не найден ни в данных формы, ни в заголовках запроса',
+                    scope,
+                    receive,
+                    send,
+                )
+                return
+            cookie_token = self._get_cookie_token(scope)
+            if not cookie_token:
+                await self._reject('No CSRF cookie found', scope, receive, send)
+                return
+            if not (self._compare(cookie_token, token) and self.is_valid_token(token)):
+                await self._reject(
+                    'CSRF токен в форме не соответствует токену в куках',
+                    scope,
+                    receive,
+                    send,
+                )
+                return
+        else:
+            await self._reject(
                 'CSRF токен не найден ни в данных формы, ни в заголовках запроса',
-                status_code=status.HTTP_403_FORBIDDEN,
+                scope,
+                receive,
+                send,
             )
+            return
 
-        if (header_token and (cookie_token != header_token)) or (
-            form_token and (cookie_token != form_token)
-        ):
-            return Response(
-                'CSRF токен в заголовке или форме не соответствует токену в куках',
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
+        if scope['scheme'] == 'https' and not self._is_valid_referer(scope):
+            await self._reject('Referrer или origin некорректны', scope, receive, send)
+            return
+
+        scope['csrftoken'] = token
+        scope['csrf_cookie_name'] = self.cookie_name
+        await self.app(scope, receive, send)
+
+    async def _issue_token(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Кладем токен в scope и ставим куку, если действующего токена нет."""
+        token = self._get_cookie_token(scope)
+        token_required = not self.is_valid_token(token)
+        if token_required:
+            token = self.get_new_token()
+
+        scope['csrftoken'] = token
+        scope['csrf_cookie_name'] = self.cookie_name
+        if not token_required:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                cookie = SimpleCookie()
+                cookie[self.cookie_name] = token
+                cookie[self.cookie_name]['max-age'] = self.max_age
+                cookie[self.cookie_name]['path'] = '/'
+                cookie[self.cookie_name]['samesite'] = 'lax'
+                message.setdefault('headers', [])
+                MutableHeaders(scope=message).append(
+                    'set-cookie', cookie.output(header='').strip()
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _get_form_token(
+        self, scope: Scope, receive: Receive, content_type: bytes
+    ) -> tuple[str | None, Receive]:
+        """Читаем тело формы и достаем из него токен.
+
+        Args:
+            scope: Scope - ASGI scope
+            receive: Receive - канал чтения сообщений запроса
+            content_type: bytes - заголовок content-type
 
-        if request.base_url.is_secure and not self._is_valid_referer(request):
-            return Response(
-                'Referrer или origin некорректны',
-                status_code=status.HTTP_403_FORBIDDEN,
+        Returns:
+            tuple[str | None, Receive] - токен и канал, который отдает приложению
+            прочитанное тело, a затем продолжает читать из receive
+        """
+        messages: list[Message] = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message['type'] != 'http.request' or not message.get('more_body'):
+                break
+
+        replay = iter(messages)
+
+        async def replay_receive() -> Message:
+            return next(replay, None) or await receive()
+
+        if content_type.startswith(b'application/x-www-form-urlencoded'):
+            body = b''.join(message.get('body', b'') for message in messages)
+            fields = parse_qsl(body.decode('latin-1'), keep_blank_values=True)
+            token = next(
+                (value for name, value in fields if name == self.cookie_name), None
             )
+            return token, replay_receive
+
+        # multipart разбираем парсером starlette на копии тела, файлы он пишет
+        # во временные файлы, a не в память
+        form_messages = iter(messages)
+
+        async def form_receive() -> Message:
+            return next(form_messages, None) or {'type': 'http.disconnect'}
 
-        request.scope.update(
-            {
-                'csrftoken': cookie_token,
-                'csrf_cookie_name': self.cookie_name,
-            }
+        async with Request(scope, form_receive).form() as form:
+            value = form.get(self.cookie_name)
+        return (value if isinstance(value, str) else None), replay_receive
+
+    def _get_cookie_token(self, scope: Scope) -> str | None:
+        for name, value in scope['headers']:
+            if name == b'cookie':
+                token = cookie_parser(value.decode('latin-1')).get(self.cookie_name)
+                if token:
+                    return token
+        return None
+
+    def _is_valid_referer(self, scope: Scope) -> bool:
+        headers = dict(scope['headers'])
+        url = URL(
+            (headers.get(b'origin') or headers.get(b'referer') or b'').decode('latin-1')
         )
+        return url.hostname in self.allowed_hosts if url.hostname else False
 
-        return await call_next(request)
+    @staticmethod
+    async def _reject(detail: str, scope: Scope, receive: Receive, send: Send) -> None:
+        await Response(detail, status_code=status.HTTP_403_FORBIDDEN)(
+            scope, receive, send
+        )
@@ -0,0 +1,197 @@
+import re
+
+from collections.abc import Sequence
+from email.utils import parsedate_to_datetime
+
+from starlette.datastructures import Headers
+from starlette.routing import BaseRoute
+from starlette.routing import Route
+from starlette.status import HTTP_200_OK
+from starlette.status import HTTP_304_NOT_MODIFIED
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.api.utils.cache.response import CachedResponse
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.cache.response import ResponseCachePolicy
+from app.api.utils.cache.response import get_response_cache_policy
+from app.api.utils.conditional_request import is_not_modified
+from app.config import config
+
+# Заголовки, которые повторяем в 304 из закэшированного ответа
+_NOT_MODIFIED_HEADERS = frozenset(
+    (b'etag', b'last-modified', b'cache-control', b'vary')
+)
+
+type _RoutePolicy = tuple[re.Pattern, ResponseCachePolicy | None]
+
+
+class ResponseCacheMiddleware:
+    """Кэш ответов GET ручек, помеченных @cache_response.
+
+    Чистая ASGI мидла. Попадание отдается из ResponseCache без роутинга, DI и
+    запросов в БД. Ключ - путь, query string и заголовки из vary ручки.
+    Кэшируются только ответы 200 без Set-Cookie не больше max_body_size байт.
+    Если у ответа в кэше есть ETag или Last-Modified, условный запрос получает
+    304 прямо из кэша.
+
+    Должна стоять внутри CompressionMiddleware и RouterLoggingMiddleware: в кэше
+    лежит несжатый ответ, a попадания видны в логах и метриках.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Sequence[BaseRoute] = (),
+        cache: ResponseCache | None = None,
+        max_body_size: int = config.response_cache.max_body_size,
+    ) -> None:
+        self.app = app
+        # Роуты в приложение добавляются и после создания мидлы, поэтому
+        # собираем их при первом запросе
+        self._routes = routes
+        self._policies: list[_RoutePolicy] | None = None
+        self._cache = cache
+        self._max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Отдаем ответ из кэша или кэшируем ответ ручки.
+
+        Args:
+            scope: Scope - ASGI scope
+            receive: Receive - канал чтения сообщений запроса
+            send: Send - канал отправки сообщений ответа
+        """
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        policy = self._get_policy(scope['path'])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        cache = self._cache
+        if cache is None:
+            cache = self._cache = await scope['app'].state.dishka_container.get(
+                ResponseCache
+            )
+
+        lookup = await cache.get(self._get_key(scope, policy), policy.tags)
+        if lookup.response is not None:
+            await self._send_cached(scope, send, lookup.response)
+            return
+
+        status = HTTP_200_OK
+        headers: list[tuple[bytes, bytes]] | None = None
+        chunks: list[bytes] = []
+        size = 0
+        cacheable = True
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, headers, size, cacheable
+
+            if cacheable:
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+                    # Внешние мидлы меняют список заголовков на месте, копируем
+                    # его до отправки
+                    headers = list(message.get('headers', ()))
+                    cacheable = status == HTTP_200_OK and not any(
+                        name.lower() == b'set-cookie' for name, _ in headers
+                    )
+                elif message['type'] == 'http.response.body':
+                    body = message.get('body', b'')
+                    size += len(body)
+                    if size > self._max_body_size:
+                        cacheable = False
+                        chunks.clear()
+                    else:
+                        chunks.append(body)
+
+            await send(message)
+
+            if (
+                cacheable
+                and headers is not None
+                and message['type'] == 'http.response.body'
+                and not message.get('more_body', False)
+            ):
+                await cache.set(
+                    lookup,
+                    CachedResponse(
+                        status=status,
+                        headers=headers,
+                        body=b''.join(chunks),
+                    ),
+                )
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _get_policy(self, path: str) -> ResponseCachePolicy | None:
+        """Настройки кэша первого GET роута, совпавшего c путем."""
+        if self._policies is None:
+            self._policies = [
+                (route.path_regex, get_response_cache_policy(route))
+                for route in self._routes
+                if isinstance(route, Route) and 'GET' in (route.methods or ())
+            ]
+
+        for path_regex, policy in self._policies:
+            if path_regex.match(path):
+                return policy
+        return None
+
+    @staticmethod
+    def _get_key(scope: Scope, policy: ResponseCachePolicy) -> str:
+        key = scope['path']
+        if scope['query_string']:
+            key = f'{key}?{scope["query_string"].decode("latin-1")}'
+        if policy.vary:
+            values = dict.fromkeys(policy.vary, b'')
+            for name, value in scope['headers']:
+                if name in values:
+                    values[name] = value
+            key = f'{key}|{b"|".join(values.values()).decode("latin-1")}'
+        return key
+
+    @staticmethod
+    async def _send_cached(scope: Scope, send: Send, cached: CachedResponse) -> None:
+        etag = cached.get_header(b'etag')
+        last_modified = cached.get_header(b'last-modified')
+        if etag is not None or last_modified is not None:
+            request_headers = Headers(scope=scope)
+            if is_not_modified(
+                request_headers,
+                etag=etag.decode('latin-1') if etag is not None else None,
+                last_modified=(
+                    parsedate_to_datetime(last_modified.decode('latin-1'))
+                    if last_modified is not None
+                    else None
+                ),
+            ):
+                await send(
+                    {
+                        'type': 'http.response.start',
+                        'status': HTTP_304_NOT_MODIFIED,
+                        'headers': [
+                            (name, value)
+                            for name, value in cached.headers
+                            if name in _NOT_MODIFIED_HEADERS
+                        ],
+                    }
+                )
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': cached.status,
+                'headers': list(cached.headers),
+            }
+        )
+        await send({'type': 'http.response.body', 'body': cached.body})
@@ -1,184 +1,375 @@
-import contextlib
-import json
+import random
+import re
 import time
 
-from collections.abc import Callable
-from json import JSONDecodeError
+from collections.abc import Collection
+from collections.abc import Sequence
 from typing import Any
 from uuid import uuid4
 
 import loguru
+import orjson
 
-from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.routing import BaseRoute
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
-
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.api.utils.sqlalchemy.pool import track_connection_wait
+from app.api.utils.sqlalchemy.queries import finish_request_queries
+from app.api.utils.sqlalchemy.queries import track_queries
+from app.config import AccessLogSettings
 from app.config import config
 
+JSON_CONTENT_TYPE = b'application/json'
+REQUEST_ID_HEADER = 'X-API-Request-ID'
+_RAW_REQUEST_ID_HEADER = REQUEST_ID_HEADER.lower().encode('latin-1')
+
 
-class AsyncIteratorWrapper:
-    """Делаем вместо обычного итератора - асинхронный.
+class _BodyTee:
+    """Копия тела запроса/ответа, ограниченная max_size байтами.
 
-    Link: https://www.python.org/dev/peps/pep-0492/#example-2
+    Байты дальше лимита не копируются, а только считаются, поэтому тело в памяти
+    не дублируется целиком.
     """
 
-    def __init__(self, obj) -> None:
-        self._it = iter(obj)
+    __slots__ = ('chunks', 'max_size', 'size')
 
-    def __aiter__(self) -> object:
-        return self
+    def __init__(self, max_size: int) -> None:
+        self.chunks: list[bytes] = []
+        self.max_size = max_size
+        self.size = 0
 
-    async def __anext__(self) -> object:
-        try:
-            value = next(self._it)
-        except StopIteration as e:
-            raise StopAsyncIteration from e
-        return value
+    def write(self, chunk: bytes) -> None:
+        if chunk and self.size < self.max_size:
+            self.chunks.append(chunk[: self.max_size - self.size])
+        self.size += len(chunk)
+
+    @property
+    def truncated(self) -> bool:
+        return self.size > self.max_size
+
+    def getvalue(self) -> bytes:
+        return b''.join(self.chunks)
+
+
+def compile_log_exclusion(
+    prefixes: Sequence[str],
+    routes: Sequence[BaseRoute] = (),
+    route_names: Collection[str] = (),
+    route_tags: Collection[str] = (),
+) -> re.Pattern | None:
+    """Собираем одну регулярку путей, которые не нужно логировать.
+
+    Префикс совпадает c путем целиком или до границы сегмента: /health исключает
+    /health и /health/ready, но не /healthcheck. Для роутов, исключенных по имени
+    или тегу, берем их собственную регулярку пути.
 
+    Args:
+        prefixes: Sequence[str] - префиксы путей
+        routes: Sequence[BaseRoute] - роуты приложения
+        route_names: Collection[str] - имена исключаемых роутов
+        route_tags: Collection[str] - теги исключаемых роутов
 
-class RouterLoggingMiddleware(BaseHTTPMiddleware):
+    Returns:
+        re.Pattern | None - None, если исключать нечего
+    """
+    patterns = [f'{re.escape(prefix.rstrip("/"))}(?:/.*)?' for prefix in prefixes]
+
+    for route in routes:
+        path_regex = getattr(route, 'path_regex', None)
+        if path_regex is None:
+            continue
+        if getattr(route, 'name', None) in route_names or set(
+            getattr(route, 'tags', None) or ()
+        ).intersection(route_tags):
+            # Именованные группы разных роутов конфликтуют в одной регулярке
+            pattern = re.sub(r'\(\?P<\w+>', '(?:', path_regex.pattern)
+            patterns.append(pattern.removeprefix('^').removesuffix('$'))
+
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in dict.fromkeys(patterns)))
+
+
+class RouterLoggingMiddleware:
     """Логирование роутов фастапи.
 
-    https://medium.com/@dhavalsavalia/fastapi-logging-middleware-logging-requests-and-responses-with-ease-and-style-201b9aa4001a
+    Чистая ASGI мидла: не оборачивает приложение в BaseHTTPMiddleware, не создает
+    лишних тасок и не буферизирует тела целиком. Тела запроса и ответа копируются
+    по мере прохождения через receive/send и только до
+    logger_body_content_max_size байт, парсятся orjson только при логировании.
     """
 
     _logger: 'loguru.Logger'
 
-    def __init__(self, app: FastAPI, *, current_logger: 'loguru.Logger') -> None:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        current_logger: 'loguru.Logger',
+        settings: AccessLogSettings = config.common.access_log,
+        routes: Sequence[BaseRoute] = (),
+    ) -> None:
+        self.app = app
         self._logger = current_logger
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Стандартный метод, который нужно имплементировать для мидлы.
-
-        Дока - https://fastapi.tiangolo.com/tutorial/middleware/
+        # Мидлвари строятся на первом запросе, к этому моменту все роуты подключены
+        self._exclusion = compile_log_exclusion(
+            config.common.disabled_log_endpoint,
+            routes,
+            route_names=config.common.disabled_log_route_names,
+            route_tags=config.common.disabled_log_route_tags,
+        )
+        self._max_body_size = config.common.logger_body_content_max_size
+        self._settings = settings
+        # Если уровень логов выше INFO, access лог все равно не попадет в вывод
+        self._access_log_enabled = (
+            current_logger.level(config.common.log_level.value).no
+            <= current_logger.level('INFO').no
+        )
+        # Самый длинный префикс проверяем первым
+        self._route_sample_rates = sorted(
+            settings.route_sample_rates.items(),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """ASGI точка входа.
+
+        Исключенные из логирования пути проходят насквозь до любой обработки.
+        Запрос, не попавший в выборку, проходит без копирования тел и сборки
+        словарей для лога. Он логируется, только если упал, вернул 5xx или
+        выполнялся дольше slow_request_threshold.
 
         Args:
-            request:Request - объект реквеста старлета
-            call_next: Callable - вызываемая функция над реквестом. По сути вызывает
-            сам контроллер
-            с текущим реквестом
-
-        Returns:
-            Response - объект респонса старлета
+            scope: Scope - ASGI scope
+            receive: Receive - канал чтения сообщений запроса
+            send: Send - канал отправки сообщений ответа
 
         Raises:
             None - ничего не райзит, фукнция всегда работает, даже если внутри нее
             исключение
 
         """
-        request_id: str = str(uuid4())
-        response_dict = {}
+        if scope['type'] != 'http' or (
+            self._exclusion and self._exclusion.fullmatch(scope['path'])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = str(uuid4())
+        sampled = self._is_sampled(scope['path'])
         exception = None
+        status_code = None
+        response_headers: list[tuple[bytes, bytes]] = []
+        request_body = _BodyTee(self._max_body_size) if sampled else None
+        response_body: _BodyTee | None = None
 
         start_time = time.perf_counter()
 
-        request_dict = await self._compile_request_log(request)
-
-        try:
-            response: Response = await call_next(request)
-
-            # Отключаем логирование для ненужных ендпоинтов
-            if any(
-                [
-                    endpoint in str(request.url)
-                    for endpoint in config.common.disabled_log_endpoint
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message['type'] == 'http.request':
+                request_body.write(message.get('body', b''))  # type: ignore[union-attr]
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_body, response_headers
+
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                response_headers = list(message.get('headers', []))
+                if sampled and self._is_loggable_response_body(response_headers):
+                    response_body = _BodyTee(self._max_body_size)
+                message['headers'] = [
+                    *response_headers,
+                    (_RAW_REQUEST_ID_HEADER, request_id.encode('latin-1')),
                 ]
-            ):
-                return response
-
-            response_dict['status_code'] = response.status_code
-            response_dict['headers'] = self._sanitaze_log(dict(response.headers))
-
-            # Логируем тело только для app/json
-            if (
-                response.headers.get('Content-Type') == 'application/json'
-                # проверка на 204 статус ошибки
-                and response.headers.get('content-length') is not None
-            ):
-                # хак, чтобы забрать тело асинхронно. Взял по ссылке из medium
-                resp_body = [
-                    section async for section in response.__dict__['body_iterator']
-                ]
-                response.__setattr__('body_iterator', AsyncIteratorWrapper(resp_body))
-
-                try:
-                    resp_body = json.loads(resp_body[0].decode())
-                except (JSONDecodeError, TypeError):
-                    # Ругается на тип, ожидается словарь, но это не корректно,
-                    # т.к. боди может быть любым
-                    resp_body = str(resp_body)  # type: ignore
+            elif message['type'] == 'http.response.body' and response_body:
+                response_body.write(message.get('body', b''))
 
-                if (
-                    int(response.headers['content-length'])
-                    > config.common.logger_body_content_max_size
-                ):
-                    response_dict['body'] = {
-                        'detail': f'Слишком большое тело для отображения. '
-                        f'{response.headers["content-length"]} байт из доступных '
-                        f'{config.common.logger_body_content_max_size}'
-                    }
-                else:
-                    # в ответе критичных данных нет.
-                    # Если нужно, можно авторизационные ручки исключить из логирования
-                    response_dict['body'] = resp_body
+            await send(message)
 
+        try:
+            with track_connection_wait() as connection_wait, track_queries() as queries:
+                await self.app(
+                    scope, receive_wrapper if sampled else receive, send_wrapper
+                )
         except Exception as e:
             exception = e
 
-            response = ORJSONResponse(
-                content={
-                    'message': str(e),
-                },
-                status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-            response_dict['status_code'] = HTTP_500_INTERNAL_SERVER_ERROR
+            if status_code is None:
+                await ORJSONResponse(
+                    content={
+                        'message': str(e),
+                    },
+                    status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                    headers={REQUEST_ID_HEADER: request_id},
+                )(scope, receive, send)
+            status_code = HTTP_500_INTERNAL_SERVER_ERROR
 
         execution_time = time.perf_counter() - start_time
-        response_dict['time_taken'] = f'{execution_time:0.4f}s'
+        # Роутер кладет найденный роут в scope, шаблон пути не плодит метки
+        finish_request_queries(
+            queries, getattr(scope.get('route'), 'path', None) or 'unmatched'
+        )
+        is_error = exception is not None or (status_code or 0) >= 500
+        is_slow = (
+            self._settings.slow_request_threshold is not None
+            and execution_time >= self._settings.slow_request_threshold
+        )
+        if not (sampled or is_error or is_slow):
+            return
+
+        response_dict: dict[str, Any] = {
+            'status_code': status_code,
+            'time_taken': f'{execution_time:0.4f}s',
+        }
+        if connection_wait.checkouts:
+            # Ожидание соединений из пула: отличает нехватку пула от медленных SQL
+            response_dict['db_wait_time'] = f'{connection_wait.seconds:0.4f}s'
+        if queries.count:
+            response_dict['db_queries'] = queries.count
+            response_dict['db_time'] = f'{queries.seconds:0.4f}s'
+        if response_headers:
+            response_dict['headers'] = self._sanitaze_log(
+                self._decode_headers(response_headers)
+            )
 
-        response.headers['X-API-Request-ID'] = request_id
+        log_bodies = (
+            not self._settings.log_bodies_on_error_only or (status_code or 0) >= 400
+        )
+        if not log_bodies:
+            request_body = response_body = None
+        if response_body is not None:
+            # в ответе критичных данных нет.
+            # Если нужно, можно авторизационные ручки исключить из логирования
+            response_dict['body'] = self._compile_body_log(response_body)
 
         with self._logger.contextualize(
-            request=request_dict, response=response_dict, x_request_id=request_id
+            request=self._compile_request_log(scope, request_body),
+            response=response_dict,
+            x_request_id=request_id,
         ):
             if exception:
                 self._logger.opt(exception=exception).error('Error log')
+            elif is_slow and not sampled:
+                self._logger.warning('Slow request log')
             else:
                 self._logger.info('Access log')
 
-        return response
+    def _is_sampled(self, path: str) -> bool:
+        """Решаем, попадает ли запрос в выборку access лога.
+
+        Args:
+            path: str - путь запроса
+
+        Returns:
+            bool
+
+        """
+        if not self._access_log_enabled:
+            return False
+
+        sample_rate = self._settings.sample_rate
+        for prefix, route_sample_rate in self._route_sample_rates:
+            if path.startswith(prefix):
+                sample_rate = route_sample_rate
+                break
+
+        return sample_rate >= 1 or random.random() < sample_rate
 
-    async def _compile_request_log(self, request: Request) -> dict[str, str]:
+    def _compile_request_log(
+        self, scope: Scope, body: _BodyTee | None
+    ) -> dict[str, Any]:
         """Собираем пейлоад для реквеста.
 
         Args:
-            request: Request - объект реквеста старлета
+            scope: Scope - ASGI scope запроса
+            body: _BodyTee | None - прочитанная приложением часть тела
 
         Returns:
-            dict[str, str]: словарь с данными для логирования
+            dict[str, Any]: словарь с данными для логирования
 
         """
-        path = request.url.path
-        if request.query_params:
-            path += f'?{request.query_params}'
+        path = scope['path']
+        if scope.get('query_string'):
+            path += f'?{scope["query_string"].decode("latin-1")}'
 
-        request_logging = {
-            'method': request.method,
+        headers = self._decode_headers(scope['headers'])
+        request_logging: dict[str, Any] = {
+            'method': scope['method'],
             'path': path,
-            'ip': request.client.host,
-            'headers': self._sanitaze_log(dict(request.headers)),
+            'ip': scope['client'][0] if scope.get('client') else None,
+            'headers': self._sanitaze_log(headers),
         }
 
-        with contextlib.suppress(JSONDecodeError, TypeError, UnicodeDecodeError):
-            body = await request.json()
-            request_logging['body'] = self._sanitaze_log(body)
+        if (
+            body
+            and body.size
+            and headers.get('content-type', '').startswith('application/json')
+        ):
+            request_logging['body'] = self._sanitaze_log(self._compile_body_log(body))
 
         return request_logging
 
+    def _compile_body_log(self, body: _BodyTee) -> Any:
+        """Парсим скопированное тело для лога.
+
+        Args:
+            body: _BodyTee - скопированное тело
+
+        Returns:
+            Any
+
+        """
+        if body.truncated:
+            return {
+                'detail': f'Слишком большое тело для отображения. '
+                f'{body.size} байт из доступных {self._max_body_size}'
+            }
+
+        raw = body.getvalue()
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return raw.decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _is_loggable_response_body(headers: list[tuple[bytes, bytes]]) -> bool:
+        """Логируем тело только для app/json c известной длиной.
+
+        Args:
+            headers: list[tuple[bytes, bytes]] - сырые заголовки ответа
+
+        Returns:
+            bool
+
+        """
+        content_type = None
+        content_length = None
+        for key, value in headers:
+            match key.lower():
+                case b'content-type':
+                    content_type = value.split(b';', 1)[0].strip()
+                case b'content-length':
+                    content_length = value
+
+        # проверка на 204 статус ошибки
+        return content_type == JSON_CONTENT_TYPE and content_length is not None
+
+    @staticmethod
+    def _decode_headers(headers: list[tuple[bytes, bytes]]) -> dict[str, str]:
+        return {
+            key.decode('latin-1').lower(): value.decode('latin-1')
+            for key, value in headers
+        }
+
     def _sanitaze_log(self, data: Any) -> Any:
         """Функция санитайзер. Убираем чувствительные штуки из логов.
 
@@ -0,0 +1,120 @@
+"""Быстрый путь чтения: core строки БД сразу в байты ответа."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import cache
+from typing import Any
+from typing import get_args
+
+import orjson
+
+from pydantic import BaseModel
+from sqlalchemy import Row
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+from app.api.utils.sqlalchemy.pagination import CursorPage
+
+# Z вместо +00:00 для UTC, как y pydantic
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    # orjson не умеет Decimal, pydantic отдает его строкой
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+@dataclass(frozen=True, slots=True)
+class RowEncoder:
+    """Сериализатор строк БД по схеме ответа.
+
+    Строки из БД считаются доверенными: схема не валидирует их заново, из нее
+    берутся только имена колонок и ключи в ответе.
+    """
+
+    # Колонки модели в порядке полей схемы
+    columns: tuple[str, ...]
+    # Ключи в ответе c учетом alias
+    keys: tuple[str, ...]
+
+    def encode_page(self, page: CursorPage[Row]) -> bytes:
+        """Сериализуем страницу строк как CursorPageSchema.
+
+        Лишние колонки в конце строки (ключ сортировки) отбрасываются zip-ом.
+
+        Args:
+            page: CursorPage[Row] - строки c колонками self.columns в начале
+
+        Returns:
+            bytes
+        """
+        keys = self.keys
+        return orjson.dumps(
+            {
+                'items': [dict(zip(keys, row, strict=False)) for row in page.items],
+                'next_cursor': page.next_cursor,
+            },
+            default=_default,
+            option=_ORJSON_OPTIONS,
+        )
+
+
+def _is_model(annotation: Any) -> bool:
+    return any(
+        isinstance(arg, type) and issubclass(arg, BaseModel)
+        for arg in (annotation, *get_args(annotation))
+    )
+
+
+@cache
+def get_row_encoder(schema: type[BaseModel]) -> RowEncoder:
+    """Собираем сериализатор строк для схемы один раз.
+
+    Args:
+        schema: type[BaseModel] - плоская схема, поля которой - колонки модели
+
+    Returns:
+        RowEncoder
+
+    Raises:
+        ValueError - в схеме есть вложенные схемы
+    """
+    columns = []
+    keys = []
+    for name, field in schema.model_fields.items():
+        if _is_model(field.annotation):
+            raise ValueError(
+                f'Поле {schema.__name__}.{name} - вложенная схема, строки БД '
+                f'сериализуются только в плоские схемы'
+            )
+        columns.append(name)
+        keys.append(field.serialization_alias or field.alias or name)
+    return RowEncoder(columns=tuple(columns), keys=tuple(keys))
+
+
+class RowPageResponse(Response):
+    """JSON ответ co страницей core строк, без ORM объектов и pydantic.
+
+    response_model роута остается для OpenAPI: FastAPI не валидирует ответ,
+    если эндпоинт вернул Response.
+    """
+
+    media_type = 'application/json'
+
+    def __init__(
+        self,
+        content: CursorPage[Row],
+        schema: type[BaseModel],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ) -> None:
+        self.encoder = get_row_encoder(schema)
+        super().__init__(content, status_code, headers, background=background)
+
+    def render(self, content: CursorPage[Row]) -> bytes:
+        """Сериализуем страницу строк."""
+        return self.encoder.encode_page(content)
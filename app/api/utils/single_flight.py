@@ -0,0 +1,145 @@
+import asyncio
+import copy
+import time
+
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Hashable
+from typing import Any
+
+_groups: dict[str, 'SingleFlight'] = {}
+_metrics_registered = False
+
+
+class _LeaderCancelledError(Exception):
+    """Запрос, выполнявший общий вызов, был отменен."""
+
+
+def _copy_exception(e: Exception) -> Exception:
+    """Копия исключения лидера для ожидающего вызова.
+
+    Один экземпляр, поднятый в нескольких задачах, копил бы в __traceback__ их
+    кадры, a обработчики меняли бы его конкурентно.
+    """
+    try:
+        copied = copy.copy(e)
+    except Exception:
+        return e
+    return copied.with_traceback(None)
+
+
+class SingleFlight:
+    """Склейка одинаковых конкурентных вызовов в один.
+
+    Первый вызов по ключу (лидер) выполняется сам, остальные c тем же ключом
+    ждут его результат или исключение, не выполняя свой вызов. Ждать дольше
+    timeout c начала вызова лидера не будем: опоздавший или не дождавшийся
+    вызов выполняется сам, чтобы зависший запрос не собирал за собой очередь.
+    Если лидер отменен (клиент отвалился), ожидающие тоже выполняются сами.
+    """
+
+    def __init__(self, name: str, *, timeout: float) -> None:
+        self.name = name
+        self.timeout = timeout
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self._in_flight: dict[Hashable, tuple[asyncio.Future, float]] = {}
+        _groups[name] = self
+
+    async def do[T](self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Выполняем func или присоединяемся к уже идущему вызову c тем же key.
+
+        Args:
+            key: Hashable - ключ вызова
+            func: Callable[[], Awaitable[T]] - вызов
+
+        Returns:
+            T - результат вызова лидера или собственного вызова
+        """
+        self.calls += 1
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            return await self._join(in_flight, func)
+
+        entry = (asyncio.get_running_loop().create_future(), time.monotonic())
+        future = entry[0]
+        self._in_flight[key] = entry
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelledError())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # Если ожидающих нет, исключение никто не заберет, не шумим об этом
+            if future.done() and not future.cancelled():
+                future.exception()
+            if self._in_flight.get(key) is entry:
+                del self._in_flight[key]
+
+    async def _join[T](
+        self,
+        in_flight: tuple[asyncio.Future, float],
+        func: Callable[[], Awaitable[T]],
+    ) -> T:
+        future, started_at = in_flight
+        remaining = self.timeout - (time.monotonic() - started_at)
+        if remaining <= 0:
+            self.timeouts += 1
+            return await func()
+
+        self.coalesced += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), remaining)
+        except TimeoutError:
+            self.timeouts += 1
+        except _LeaderCancelledError:
+            pass
+        except Exception as e:
+            raise _copy_exception(e) from e.__cause__
+        return await func()
+
+
+def register_single_flight_metrics() -> None:
+    """Отдаем счетчики склейки вызовов в /metrics."""
+    global _metrics_registered
+
+    if _metrics_registered:
+        return
+
+    from prometheus_client import REGISTRY
+    from prometheus_client.core import CounterMetricFamily
+    from prometheus_client.registry import Collector
+
+    class SingleFlightCollector(Collector):
+        def collect(self) -> Any:
+            calls = CounterMetricFamily(
+                'single_flight_calls', 'Вызовы юзкейсов со склейкой', labels=['name']
+            )
+            coalesced = CounterMetricFamily(
+                'single_flight_coalesced',
+                'Вызовы, получившие результат уже идущего вызова',
+                labels=['name'],
+            )
+            timeouts = CounterMetricFamily(
+                'single_flight_timeouts',
+                'Вызовы, не дождавшиеся идущего вызова и выполненные сами',
+                labels=['name'],
+            )
+            for name, group in _groups.items():
+                calls.add_metric([name], group.calls)
+                coalesced.add_metric([name], group.coalesced)
+                timeouts.add_metric([name], group.timeouts)
+
+            yield calls
+            yield coalesced
+            yield timeouts
+
+    REGISTRY.register(SingleFlightCollector())
+    _metrics_registered = True
@@ -0,0 +1,64 @@
+"""Утилиты для keyset (курсорной) пагинации."""
+
+import binascii
+
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+
+
+@dataclass(slots=True, frozen=True)
+class CursorPage[T]:
+    """Страница выборки c курсором на следующую страницу.
+
+    next_cursor равен None, если страница последняя.
+    """
+
+    items: Sequence[T]
+    next_cursor: str | None = None
+
+
+def encode_cursor(order_by: str, values: Sequence[Any]) -> str:
+    """Кодируем ключ последней записи страницы в непрозрачный курсор.
+
+    Args:
+        order_by: str - имя колонки, по которой идет сортировка
+        values: Sequence[Any] - значения ключа сортировки последней записи
+
+    Returns:
+        str - base64url строка без паддинга
+    """
+    payload = orjson.dumps({'o': order_by, 'v': list(values)})
+    return urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, order_by: str) -> list[Any]:
+    """Раскодируем курсор, выданный encode_cursor.
+
+    Args:
+        cursor: str - курсор из запроса клиента
+        order_by: str - имя колонки, для которой курсор должен быть выдан
+
+    Returns:
+        list[Any] - значения ключа сортировки в JSON представлении
+
+    Raises:
+        ValueError - курсор поврежден или выдан для другой сортировки
+    """
+    try:
+        payload = orjson.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, orjson.JSONDecodeError, UnicodeEncodeError) as e:
+        raise ValueError('Курсор поврежден') from e
+
+    if (
+        not isinstance(payload, dict)
+        or payload.get('o') != order_by
+        or not isinstance(payload.get('v'), list)
+    ):
+        raise ValueError('Курсор выдан для другой сортировки')
+
+    return payload['v']
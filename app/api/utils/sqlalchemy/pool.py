@@ -0,0 +1,230 @@
+"""Инструментация пула соединений алхимии."""
+
+import bisect
+import time
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import exc
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import ConnectionPoolEntry
+from sqlalchemy.pool import PoolProxiedConnection
+
+# Ведра гистограммы ожидания соединения, сек
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_engines: dict[str, AsyncEngine] = {}
+_metrics_registered = False
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Счетчики пула для метрик."""
+
+    checkouts: int = 0
+    checkins: int = 0
+    # Соединения, открытые сверх pool_size
+    overflows: int = 0
+    timeouts: int = 0
+    pre_ping_failures: int = 0
+    wait_sum: float = 0.0
+    # Последнее ведро - +Inf
+    wait_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(WAIT_BUCKETS) + 1)
+    )
+
+    def observe_wait(self, seconds: float) -> None:
+        """Учитываем время ожидания соединения."""
+        self.wait_sum += seconds
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+
+@dataclass(slots=True)
+class ConnectionWait:
+    """Сколько запрос ждал соединений из пула."""
+
+    seconds: float = 0.0
+    checkouts: int = 0
+
+
+_connection_wait: ContextVar[ConnectionWait | None] = ContextVar(
+    'connection_wait', default=None
+)
+
+
+@contextmanager
+def track_connection_wait() -> Iterator[ConnectionWait]:
+    """Суммируем ожидание соединений из пула внутри блока.
+
+    Yields:
+        ConnectionWait - заполняется по мере получения соединений
+    """
+    wait = ConnectionWait()
+    token = _connection_wait.set(wait)
+    try:
+        yield wait
+    finally:
+        _connection_wait.reset(token)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool со счетчиками для метрик.
+
+    Ожидание считаем на всем получении соединения: очередь пула, открытие
+    нового соединения и pre-ping. Из-за этого время ожидания отличает нехватку
+    соединений от медленных запросов: запросы в него не входят.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        """Получаем соединение, замеряя ожидание."""
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.observe_wait(elapsed)
+            wait = _connection_wait.get()
+            if wait is not None:
+                wait.seconds += elapsed
+                wait.checkouts += 1
+
+        self.stats.checkouts += 1
+        return connection
+
+    def recreate(self) -> 'InstrumentedAsyncQueuePool':
+        """Пересоздаем пул после инвалидации, сохраняя счетчики."""
+        pool = super().recreate()
+        pool.stats = self.stats  # type: ignore[attr-defined]
+        return pool  # type: ignore[return-value]
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        self.stats.checkins += 1
+        super()._do_return_conn(record)  # type: ignore[arg-type]
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        # overflow отсчитывается от -pool_size, больше нуля - сверх pool_size
+        if opened and self._overflow > 0:
+            self.stats.overflows += 1
+        return opened
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Считаем неудачные pre-ping движка и отдаем его пул в /metrics.
+
+    Движок должен быть создан c poolclass=InstrumentedAsyncQueuePool. Движок c
+    тем же именем заменяет ранее зарегистрированный, поэтому пересоздание DI
+    контейнера не плодит метрики.
+
+    Args:
+        engine: AsyncEngine
+        name: str - метка engine в метриках
+    """
+
+    def handle_error(context: ExceptionContext) -> None:
+        pool = engine.sync_engine.pool
+        if context.is_pre_ping and isinstance(pool, InstrumentedAsyncQueuePool):
+            pool.stats.pre_ping_failures += 1
+
+    event.listen(engine.sync_engine, 'handle_error', handle_error)
+    _engines[name] = engine
+
+
+def register_pool_metrics() -> None:
+    """Отдаем состояние и счетчики пулов в /metrics."""
+    global _metrics_registered
+
+    if _metrics_registered:
+        return
+
+    from prometheus_client import REGISTRY
+    from prometheus_client.core import CounterMetricFamily
+    from prometheus_client.core import GaugeMetricFamily
+    from prometheus_client.core import HistogramMetricFamily
+    from prometheus_client.registry import Collector
+
+    class PoolCollector(Collector):
+        def collect(self) -> Any:
+            labels = ['engine']
+            size = GaugeMetricFamily('db_pool_size', 'Размер пула', labels=labels)
+            checked_out = GaugeMetricFamily(
+                'db_pool_checked_out', 'Занятые соединения', labels=labels
+            )
+            overflow = GaugeMetricFamily(
+                'db_pool_overflow',
+                'Открытые сверх pool_size соединения',
+                labels=labels,
+            )
+            counters = {
+                'checkouts': CounterMetricFamily(
+                    'db_pool_checkouts', 'Выдачи соединений из пула', labels=labels
+                ),
+                'checkins': CounterMetricFamily(
+                    'db_pool_checkins', 'Возвраты соединений в пул', labels=labels
+                ),
+                'overflows': CounterMetricFamily(
+                    'db_pool_overflows',
+                    'Соединения, открытые сверх pool_size',
+                    labels=labels,
+                ),
+                'timeouts': CounterMetricFamily(
+                    'db_pool_timeouts',
+                    'Не дождавшиеся свободного соединения',
+                    labels=labels,
+                ),
+                'pre_ping_failures': CounterMetricFamily(
+                    'db_pool_pre_ping_failures',
+                    'Соединения, не прошедшие pre-ping',
+                    labels=labels,
+                ),
+            }
+            wait = HistogramMetricFamily(
+                'db_pool_wait_seconds',
+                'Ожидание соединения из пула',
+                labels=labels,
+            )
+            for name, engine in _engines.items():
+                pool = engine.sync_engine.pool
+                if not isinstance(pool, InstrumentedAsyncQueuePool):
+                    continue
+
+                size.add_metric([name], pool.size())
+                checked_out.add_metric([name], pool.checkedout())
+                overflow.add_metric([name], max(pool.overflow(), 0))
+                for key, counter in counters.items():
+                    counter.add_metric([name], getattr(pool.stats, key))
+
+                buckets = []
+                total = 0
+                for bound, count in zip(
+                    (*map(str, WAIT_BUCKETS), '+Inf'),
+                    pool.stats.wait_buckets,
+                    strict=True,
+                ):
+                    total += count
+                    buckets.append((bound, total))
+                wait.add_metric([name], buckets, pool.stats.wait_sum)
+
+            yield size
+            yield checked_out
+            yield overflow
+            yield from counters.values()
+            yield wait
+
+    REGISTRY.register(PoolCollector())
+    _metrics_registered = True
@@ -0,0 +1,156 @@
+"""Учет SQL запросов: время, медленные запросы и подозрения на N+1."""
+
+import re
+import time
+
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from functools import lru_cache
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import config
+
+_PARAM_RE = re.compile(r'\$\d+|%\(\w+\)s|\?')
+_PARAMS_GROUP_RE = re.compile(r'\(\?(?:, \?)*\)')
+_PARAMS_GROUPS_RE = re.compile(r'\(\?\)(?:, \(\?\))+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_query_stats: ContextVar['QueryStats | None'] = ContextVar('query_stats', default=None)
+_histograms: tuple[Any, Any] | None = None
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """SQL запросы одного HTTP запроса."""
+
+    count: int = 0
+    seconds: float = 0.0
+    # Сколько раз выполнялся запрос каждой формы
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def get_repeated(self, threshold: int) -> dict[str, int]:
+        """Формы запросов, выполненные не меньше threshold раз."""
+        return {
+            shape: count for shape, count in self.shapes.items() if count >= threshold
+        }
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """Приводим SQL к форме без значений параметров.
+
+    Параметры заменяются на ?, списки параметров (IN, VALUES) схлопываются,
+    поэтому запросы, отличающиеся только числом параметров, имеют одну форму.
+
+    Args:
+        statement: str - SQL c плейсхолдерами драйвера
+
+    Returns:
+        str
+    """
+    statement = _WHITESPACE_RE.sub(' ', statement).strip()
+    statement = _PARAM_RE.sub('?', statement)
+    statement = _PARAMS_GROUP_RE.sub('(?)', statement)
+    return _PARAMS_GROUPS_RE.sub('(?), ...', statement)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Собираем SQL запросы, выполненные внутри блока.
+
+    Yields:
+        QueryStats - заполняется по мере выполнения запросов
+    """
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Замеряем запросы движка и логируем медленные.
+
+    Args:
+        engine: AsyncEngine
+    """
+    slow_query_threshold = config.postgres.slow_query_threshold
+
+    def before_cursor_execute(conn: Any, *_: Any) -> None:
+        conn.info['query_start'] = time.perf_counter()
+
+    def after_cursor_execute(conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+        start = conn.info.pop('query_start', None)
+        if start is None:
+            return
+
+        elapsed = time.perf_counter() - start
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.shapes[normalize_sql(statement)] += 1
+
+        if slow_query_threshold is not None and elapsed >= slow_query_threshold:
+            logger.bind(
+                query={
+                    'sql': normalize_sql(statement),
+                    'time_taken': f'{elapsed:0.4f}s',
+                }
+            ).warning('Slow query log')
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def finish_request_queries(stats: QueryStats, route: str) -> None:
+    """Итоги запросов HTTP запроса: предупреждение o N+1 и метрики.
+
+    Args:
+        stats: QueryStats - запросы HTTP запроса
+        route: str - шаблон пути роута
+    """
+    threshold = config.postgres.n_plus_one_threshold
+    if threshold is not None and stats.count >= threshold:
+        repeated = stats.get_repeated(threshold)
+        if repeated:
+            logger.bind(route=route, queries=repeated).warning('Possible N+1 log')
+
+    if _histograms is not None:
+        queries, seconds = _histograms
+        queries.labels(route).observe(stats.count)
+        seconds.labels(route).observe(stats.seconds)
+
+
+def register_query_metrics() -> None:
+    """Отдаем число SQL запросов и время в БД на HTTP запрос в /metrics."""
+    global _histograms
+
+    if _histograms is not None:
+        return
+
+    from prometheus_client import Histogram
+
+    _histograms = (
+        Histogram(
+            'db_request_queries',
+            'SQL запросы на HTTP запрос',
+            ['route'],
+            buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+        ),
+        Histogram(
+            'db_request_seconds',
+            'Время в БД на HTTP запрос',
+            ['route'],
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+        ),
+    )
@@ -0,0 +1,80 @@
+"""Маршрутизация чтения по репликам PG."""
+
+import time
+
+from collections.abc import Sequence
+from itertools import count
+from typing import Any
+from typing import NewType
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.enums.replica_balancing_enum import ReplicaBalancingEnum
+
+# Сессия на реплику. Отдельный тип нужен DI, чтобы отличать ее от сессии на primary
+ReadAsyncSession = NewType('ReadAsyncSession', AsyncSession)
+
+
+class ReplicaRouter:
+    """Выбираем движок реплики для очередной сессии на чтение.
+
+    ROUND_ROBIN раздает реплики по очереди. LEAST_LATENCY выбирает реплику c
+    наименьшим скользящим средним времени запросов, но каждый probe_every-й выбор
+    делает по очереди, чтобы обновлять замеры у медленных реплик.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        balancing: ReplicaBalancingEnum = ReplicaBalancingEnum.ROUND_ROBIN,
+        *,
+        probe_every: int = 10,
+        smoothing: float = 0.2,
+    ) -> None:
+        self.engines = list(engines)
+        self.balancing = balancing
+        self.probe_every = probe_every
+        self.smoothing = smoothing
+        self.latencies = [0.0] * len(self.engines)
+        self._counter = count()
+
+        if balancing is ReplicaBalancingEnum.LEAST_LATENCY and len(self.engines) > 1:
+            for index, engine in enumerate(self.engines):
+                self._track_latency(index, engine)
+
+    def get_engine(self) -> AsyncEngine:
+        """Движок реплики для новой сессии.
+
+        Returns:
+            AsyncEngine
+        """
+        if len(self.engines) == 1:
+            return self.engines[0]
+
+        turn = next(self._counter)
+        if (
+            self.balancing is ReplicaBalancingEnum.LEAST_LATENCY
+            and turn % self.probe_every
+        ):
+            index = min(range(len(self.engines)), key=self.latencies.__getitem__)
+        else:
+            index = turn % len(self.engines)
+        return self.engines[index]
+
+    def _track_latency(self, index: int, engine: AsyncEngine) -> None:
+        """Считаем скользящее среднее времени запросов движка."""
+
+        def before_cursor_execute(conn: Any, *_: Any) -> None:
+            conn.info['replica_query_start'] = time.perf_counter()
+
+        def after_cursor_execute(conn: Any, *_: Any) -> None:
+            start = conn.info.pop('replica_query_start', None)
+            if start is None:
+                return
+            elapsed = time.perf_counter() - start
+            self.latencies[index] += self.smoothing * (elapsed - self.latencies[index])
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
@@ -0,0 +1,171 @@
+"""Метрики кэшей запросов: SQL алхимии и prepared statements asyncpg."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.engine.default import CACHE_MISS
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.util import LRUCache
+
+_engines: dict[str, tuple[AsyncEngine, 'StatementCacheStats']] = {}
+_metrics_registered = False
+
+
+@dataclass(slots=True)
+class StatementCacheStats:
+    """Счетчики кэшей запросов движка."""
+
+    compiled_hits: int = 0
+    compiled_misses: int = 0
+    prepared_hits: int = 0
+    prepared_misses: int = 0
+
+
+class _CountingPreparedStatementCache(LRUCache):
+    """LRU кэш prepared statements адаптера asyncpg co счетчиками.
+
+    Адаптер на каждый запрос один раз проверяет наличие запроса в кэше и кладет
+    в него новый prepared statement, только если переиспользовать нечего.
+    Поэтому промахи - это записи, a попадания - проверки без записи.
+    """
+
+    def __init__(self, stats: StatementCacheStats, capacity: int) -> None:
+        super().__init__(capacity)
+        self.stats = stats
+
+    def __contains__(self, key: object) -> bool:
+        self.stats.prepared_hits += 1
+        return super().__contains__(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.stats.prepared_hits -= 1
+        self.stats.prepared_misses += 1
+        super().__setitem__(key, value)
+
+
+def _install_counting_cache(dbapi_connection: Any, stats: StatementCacheStats) -> bool:
+    """Подменяем кэш prepared statements адаптера asyncpg на считающий.
+
+    Кэш лежит в приватном атрибуте адаптера, поэтому его пропажу или смену типа
+    после обновления алхимии нужно заметить.
+
+    Args:
+        dbapi_connection: Any - соединение адаптера asyncpg
+        stats: StatementCacheStats - счетчики движка
+
+    Returns:
+        bool - False, если кэша нет или он неизвестного типа
+    """
+    cache = getattr(dbapi_connection, '_prepared_statement_cache', None)
+    if isinstance(cache, LRUCache):
+        dbapi_connection._prepared_statement_cache = _CountingPreparedStatementCache(
+            stats, cache.capacity
+        )
+        return True
+    # None - кэш выключен через prepared_statement_cache_size=0
+    return cache is None and hasattr(dbapi_connection, '_prepared_statement_cache')
+
+
+def instrument_statement_cache(engine: AsyncEngine, name: str) -> None:
+    """Считаем попадания в кэши запросов движка и отдаем их в /metrics.
+
+    Движок c тем же именем заменяет ранее зарегистрированный, поэтому
+    пересоздание DI контейнера не плодит метрики.
+
+    Args:
+        engine: AsyncEngine
+        name: str - метка engine в метриках
+    """
+    stats = StatementCacheStats()
+    warned = False
+
+    def connect(dbapi_connection: Any, _: Any) -> None:
+        nonlocal warned
+
+        if not _install_counting_cache(dbapi_connection, stats) and not warned:
+            warned = True
+            logger.warning(
+                'Кэш prepared statements адаптера не найден в {}, метрики '
+                'prepared statements движка {} считаться не будут',
+                type(dbapi_connection).__name__,
+                name,
+            )
+
+    def after_cursor_execute(
+        _conn: Any,
+        _cursor: Any,
+        _statement: str,
+        _parameters: Any,
+        context: DefaultExecutionContext,
+        _executemany: bool,
+    ) -> None:
+        cache_hit = getattr(context, 'cache_hit', None)
+        if cache_hit is CACHE_HIT:
+            stats.compiled_hits += 1
+        elif cache_hit is CACHE_MISS:
+            stats.compiled_misses += 1
+
+    event.listen(engine.sync_engine, 'connect', connect)
+    event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
+    _engines[name] = (engine, stats)
+
+
+def register_statement_cache_metrics() -> None:
+    """Отдаем счетчики кэшей запросов в /metrics."""
+    global _metrics_registered
+
+    if _metrics_registered:
+        return
+
+    from prometheus_client import REGISTRY
+    from prometheus_client.core import CounterMetricFamily
+    from prometheus_client.core import GaugeMetricFamily
+    from prometheus_client.registry import Collector
+
+    class StatementCacheCollector(Collector):
+        def collect(self) -> Any:
+            labels = ['engine']
+            compiled_size = GaugeMetricFamily(
+                'db_compiled_cache_size',
+                'Запросы в кэше скомпилированного SQL алхимии',
+                labels=labels,
+            )
+            counters = {
+                'compiled_hits': CounterMetricFamily(
+                    'db_compiled_cache_hits',
+                    'Запросы, взявшие SQL из кэша компиляции',
+                    labels=labels,
+                ),
+                'compiled_misses': CounterMetricFamily(
+                    'db_compiled_cache_misses',
+                    'Запросы, скомпилированные заново',
+                    labels=labels,
+                ),
+                'prepared_hits': CounterMetricFamily(
+                    'db_prepared_statement_hits',
+                    'Запросы, переиспользовавшие prepared statement',
+                    labels=labels,
+                ),
+                'prepared_misses': CounterMetricFamily(
+                    'db_prepared_statement_misses',
+                    'Запросы, подготовленные заново при включенном кэше',
+                    labels=labels,
+                ),
+            }
+            for name, (engine, stats) in _engines.items():
+                compiled_cache = engine.sync_engine._compiled_cache
+                compiled_size.add_metric(
+                    [name], len(compiled_cache) if compiled_cache is not None else 0
+                )
+                for key, counter in counters.items():
+                    counter.add_metric([name], getattr(stats, key))
+
+            yield compiled_size
+            yield from counters.values()
+
+    REGISTRY.register(StatementCacheCollector())
+    _metrics_registered = True
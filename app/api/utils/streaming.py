@@ -0,0 +1,85 @@
+"""Потоковая сериализация больших выборок в ответ без материализации всей выборки."""
+
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+from app.api.utils.enums.stream_format_enum import StreamFormatEnum
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+JSON_MEDIA_TYPE = 'application/json'
+
+
+def _serialize_batch(batch: Sequence[Any], schema: type[BaseModel]) -> list[bytes]:
+    serializer = schema.__pydantic_serializer__
+    return [serializer.to_json(schema.model_validate(row)) for row in batch]
+
+
+async def iter_ndjson(
+    batches: AsyncIterable[Sequence[Any]],
+    schema: type[BaseModel],
+) -> AsyncIterator[bytes]:
+    """Сериализуем батчи строк в NDJSON. Один чанк ответа на один батч из БД.
+
+    Args:
+        batches: AsyncIterable[Sequence[Any]] - батчи строк/моделей
+        schema: type[BaseModel] - схема ответа для одной строки
+
+    Yields:
+        bytes
+    """
+    async for batch in batches:
+        if batch:
+            yield b'\n'.join(_serialize_batch(batch, schema)) + b'\n'
+
+
+async def iter_json_array(
+    batches: AsyncIterable[Sequence[Any]],
+    schema: type[BaseModel],
+) -> AsyncIterator[bytes]:
+    """Сериализуем батчи строк в JSON массив, который пишется по частям.
+
+    Args:
+        batches: AsyncIterable[Sequence[Any]] - батчи строк/моделей
+        schema: type[BaseModel] - схема ответа для одной строки
+
+    Yields:
+        bytes
+    """
+    separator = b'['
+    async for batch in batches:
+        if batch:
+            yield separator + b','.join(_serialize_batch(batch, schema))
+            separator = b','
+
+    yield b'[]' if separator == b'[' else b']'
+
+
+def get_streaming_response(
+    batches: AsyncIterable[Sequence[Any]],
+    schema: type[BaseModel],
+    stream_format: StreamFormatEnum = StreamFormatEnum.NDJSON,
+) -> StreamingResponse:
+    """Собираем chunked ответ в нужном формате.
+
+    Args:
+        batches: AsyncIterable[Sequence[Any]] - батчи строк/моделей
+        schema: type[BaseModel] - схема ответа для одной строки
+        stream_format: StreamFormatEnum - формат выгрузки
+
+    Returns:
+        StreamingResponse
+    """
+    match stream_format:
+        case StreamFormatEnum.JSON:
+            return StreamingResponse(
+                iter_json_array(batches, schema), media_type=JSON_MEDIA_TYPE
+            )
+        case _:
+            return StreamingResponse(
+                iter_ndjson(batches, schema), media_type=NDJSON_MEDIA_TYPE
+            )
@@ -1,7 +1,9 @@
 from collections import defaultdict
 
+from pydantic import BaseModel
 from starlette import status
 
+from app.api.utils.streaming import NDJSON_MEDIA_TYPE
 from app.api.v1.schemas.base_schema import ErrorSchema
 
 
@@ -21,6 +23,11 @@ def get_responses(include_statuses: list[int] | None = None) -> dict:
 
     for status_code in include_statuses:
         match status_code:
+            case status.HTTP_304_NOT_MODIFIED:
+                responses[status_code] = {
+                    'description': 'Копия клиента актуальна (If-None-Match или '
+                    'If-Modified-Since), тело не передается',
+                }
             case status.HTTP_401_UNAUTHORIZED:
                 responses[status_code] = {
                     'description': 'Ошибка авторизации',
@@ -52,3 +59,27 @@ def get_responses(include_statuses: list[int] | None = None) -> dict:
                 }
 
     return responses
+
+
+def get_streaming_responses(model: type[BaseModel]) -> dict:
+    """Документация для ручек, которые отдают StreamingResponse.
+
+    Для JSON формата документируем массив моделей, для NDJSON - одну строку потока.
+
+    Args:
+        model: type[BaseModel] - схема одной строки выгрузки
+
+    Returns:
+        dict
+    """
+    return {
+        status.HTTP_200_OK: {
+            'description': 'Потоковая выгрузка. Каждая строка NDJSON - одна запись',
+            'model': list[model],  # type: ignore[valid-type]
+            'content': {
+                NDJSON_MEDIA_TYPE: {
+                    'schema': {'$ref': f'#/components/schemas/{model.__name__}'},
+                },
+            },
+        },
+    }
@@ -1,9 +1,16 @@
+from functools import cache
+
 from dishka.integrations.fastapi import DishkaRoute
 from fastapi import APIRouter
 from fastapi import Depends
+from starlette.requests import Request
 from starlette.responses import HTMLResponse
+from starlette.responses import Response
 
 from app.api.utils.security import authenticate_swagger
+from app.api.utils.swagger.openapi import OPENAPI_URL
+from app.api.utils.swagger.openapi import get_openapi_document
+from app.api.utils.swagger.static import get_asset_url
 from app.api.utils.swagger.ui import get_swagger_ui_html
 
 ROUTER = APIRouter(
@@ -11,6 +18,22 @@ ROUTER = APIRouter(
 )
 
 
+@cache
+def _get_swagger_html() -> bytes:
+    """HTML сваггера не зависит от запроса, собираем его один раз."""
+    return get_swagger_ui_html(
+        openapi_url=OPENAPI_URL,
+        swagger_js_url=get_asset_url('swagger-ui-bundle.js'),
+        swagger_css_url=get_asset_url('swagger-ui.css'),
+        swagger_favicon_url=get_asset_url('favicon.png'),
+        custom_js_url=get_asset_url('hierarchical-tags.js'),
+        swagger_ui_parameters={
+            'defaultModelsExpandDepth': -1,  # убирает раздел со схемами внизу
+            'displayRequestDuration': True,
+        },
+    ).body
+
+
 #  FIXME: Такая реализация выполнена исключительно для того чтобы добавлять плагины в
 #   swagger. Более того Depends(authenticate_swagger) позволяет запаролить сваггер
 #   и защищать его от несанкционированного доступа. При желании можно сделать более
@@ -22,10 +45,13 @@ ROUTER = APIRouter(
 )
 async def custom_swagger_ui_html() -> HTMLResponse:
     """Генерация кастомного html для сваггера."""
-    return get_swagger_ui_html(
-        openapi_url='/openapi.json',
-        swagger_ui_parameters={
-            'defaultModelsExpandDepth': -1,  # убирает раздел со схемами внизу
-            'displayRequestDuration': True,
-        },
-    )
+    return HTMLResponse(_get_swagger_html())
+
+
+@ROUTER.get(
+    OPENAPI_URL,
+    include_in_schema=False,
+)
+async def openapi_json(request: Request) -> Response:
+    """OpenAPI схема готовыми байтами c ETag и gzip."""
+    return get_openapi_document(request.app).get_response(request.headers)
@@ -0,0 +1,94 @@
+"""OpenAPI документ, собранный и сериализованный один раз.
+
+FastAPI кэширует схему словарем и сериализует ее заново на каждый запрос. Здесь
+схема собирается при старте приложения c его текущими настройками и отдается
+готовыми байтами c ETag и gzip.
+"""
+
+import gzip
+import hashlib
+
+from dataclasses import dataclass
+
+import orjson
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from app.api.utils.middlewares.compression_middleware import parse_accept_encoding
+
+OPENAPI_URL = '/openapi.json'
+
+
+@dataclass(frozen=True, slots=True)
+class OpenAPIDocument:
+    """Сериализованная схема и ее сжатая копия."""
+
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+    @classmethod
+    def from_bytes(cls, body: bytes) -> 'OpenAPIDocument':
+        """Сжимаем схему и считаем ETag один раз.
+
+        Args:
+            body: bytes - JSON схемы
+
+        Returns:
+            OpenAPIDocument
+        """
+        return cls(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        )
+
+    def get_response(self, request_headers: Headers) -> Response:
+        """Ответ на запрос схемы: 304, сжатый или обычный.
+
+        Args:
+            request_headers: Headers - заголовки запроса
+
+        Returns:
+            Response
+        """
+        headers = {
+            'ETag': self.etag,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match and self._matches(if_none_match):
+            return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        accepted = parse_accept_encoding(request_headers.get('accept-encoding', ''))
+        if accepted.get('gzip', accepted.get('*', 0.0)) > 0:
+            headers['Content-Encoding'] = 'gzip'
+            return Response(
+                self.gzip_body, headers=headers, media_type='application/json'
+            )
+        return Response(self.body, headers=headers, media_type='application/json')
+
+    def _matches(self, if_none_match: str) -> bool:
+        return if_none_match.strip() == '*' or self.etag in (
+            tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+        )
+
+
+def get_openapi_document(app: FastAPI) -> OpenAPIDocument:
+    """Схема приложения, собранная один раз на приложение.
+
+    Args:
+        app: FastAPI
+
+    Returns:
+        OpenAPIDocument
+    """
+    document: OpenAPIDocument | None = getattr(app.state, 'openapi_document', None)
+    if document is None:
+        document = OpenAPIDocument.from_bytes(orjson.dumps(app.openapi()))
+        app.state.openapi_document = document
+    return document
@@ -0,0 +1,80 @@
+"""Локальные ассеты Swagger UI.
+
+Ассеты скачиваются при сборке образа: python -m app.api.utils.swagger.static.
+На узлах без доступа в интернет CDN недоступен, поэтому /docs берет их c
+/docs/static, a на CDN ссылается, только если ассеты не скачаны.
+"""
+
+import os
+import sys
+
+from pathlib import Path
+from urllib.request import urlopen
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+SWAGGER_UI_VERSION = '5.9.0'
+HIERARCHICAL_TAGS_VERSION = '1.0.4'
+
+STATIC_DIR = Path(__file__).resolve().parents[3] / 'static' / 'swagger'
+STATIC_URL = '/docs/static'
+
+# Имя файла -> адрес на CDN
+ASSETS = {
+    'swagger-ui-bundle.js': f'https://cdn.jsdelivr.net/npm/swagger-ui-dist@{SWAGGER_UI_VERSION}/swagger-ui-bundle.js',
+    'swagger-ui.css': f'https://cdn.jsdelivr.net/npm/swagger-ui-dist@{SWAGGER_UI_VERSION}/swagger-ui.css',
+    'hierarchical-tags.js': f'https://unpkg.com/swagger-ui-plugin-hierarchical-tags@{HIERARCHICAL_TAGS_VERSION}/build/index.js',
+    'favicon.png': 'https://fastapi.tiangolo.com/img/favicon.png',
+}
+_ASSET_VERSION = f'{SWAGGER_UI_VERSION}-{HIERARCHICAL_TAGS_VERSION}'
+
+
+class SwaggerStaticFiles(StaticFiles):
+    """Раздача ассетов c долгим кэшем.
+
+    Адрес ассета содержит версии, поэтому браузер может кэшировать его навсегда:
+    после обновления версии адрес другой.
+    """
+
+    def file_response(self, *args, **kwargs) -> Response:
+        """Ответ c файлом и заголовком Cache-Control."""
+        response = super().file_response(*args, **kwargs)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+
+    def lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
+        """Отдаем только известные ассеты."""
+        if path not in ASSETS:
+            return '', None
+        return super().lookup_path(path)
+
+
+def get_asset_url(name: str) -> str:
+    """Адрес ассета: локальный, если он скачан, иначе CDN.
+
+    Args:
+        name: str - имя файла из ASSETS
+
+    Returns:
+        str
+    """
+    if (STATIC_DIR / name).is_file():
+        return f'{STATIC_URL}/{name}?v={_ASSET_VERSION}'
+    return ASSETS[name]
+
+
+def download_assets(directory: Path = STATIC_DIR) -> None:
+    """Скачиваем ассеты Swagger UI.
+
+    Args:
+        directory: Path - куда сохранить
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, url in ASSETS.items():
+        with urlopen(url, timeout=30) as response:
+            (directory / name).write_bytes(response.read())
+
+
+if __name__ == '__main__':
+    download_assets(Path(sys.argv[1]) if len(sys.argv) > 1 else STATIC_DIR)
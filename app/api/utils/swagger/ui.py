@@ -49,7 +49,7 @@ def get_swagger_ui_html(
     <script>
     const ui = SwaggerUIBundle({{
         url: '{openapi_url}',
-        dom_id: "#swagger",
+        dom_id: "#swagger-ui",
         plugins: [
           HierarchicalTagsPlugin
         ],
@@ -1,14 +1,177 @@
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from typing import ClassVar
 from typing import Protocol
 from typing import TypeVar
 
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.single_flight import SingleFlight
+from app.config import config
+
 TInputDTO = TypeVar('TInputDTO', contravariant=True)
 TOutputDTO = TypeVar('TOutputDTO', covariant=True)
 
 
+# Ключ в session.info: глубина вложенности вызовов юзкейсов на одной сессии
+_USECASE_DEPTH_KEY = 'usecase_depth'
+
+type _Call = Callable[..., Awaitable[Any]]
+
+
+async def _call_outermost(
+    session: AsyncSession, call: _Call, self: object, kwargs: dict
+) -> Any:
+    """Вызов внешнего юзкейса: он ведет транзакцию сессии.
+
+    Транзакция не открывается заранее: сессия начинает ее сама (autobegin) на
+    первом запросе. На выходе коммитим (при ошибке - откатываем) и сразу
+    возвращаем соединение в пул.
+    """
+    session.info[_USECASE_DEPTH_KEY] = 1
+    try:
+        result = await call(self, **kwargs)
+    except BaseException:
+        if session.in_transaction():
+            await session.rollback()
+        raise
+    finally:
+        session.info[_USECASE_DEPTH_KEY] = 0
+
+    if session.in_transaction():
+        await session.commit()
+    return result
+
+
+async def _call_joined(
+    session: AsyncSession, call: _Call, self: object, kwargs: dict
+) -> Any:
+    """Вызов вложенного юзкейса в транзакции внешнего."""
+    depth = session.info[_USECASE_DEPTH_KEY]
+    session.info[_USECASE_DEPTH_KEY] = depth + 1
+    try:
+        return await call(self, **kwargs)
+    finally:
+        session.info[_USECASE_DEPTH_KEY] = depth
+
+
+def _wrap_required(call: _Call) -> _Call:
+    async def wrapped_call(self: 'Usecase', **kwargs) -> Any:
+        session = getattr(self, 'session', None)
+        if session is None:
+            return await call(self, **kwargs)
+        if session.info.get(_USECASE_DEPTH_KEY):
+            return await _call_joined(session, call, self, kwargs)
+        return await _call_outermost(session, call, self, kwargs)
+
+    return wrapped_call
+
+
+def _wrap_requires_new(call: _Call) -> _Call:
+    async def wrapped_call(self: 'Usecase', **kwargs) -> Any:
+        session = getattr(self, 'session', None)
+        if session is None:
+            return await call(self, **kwargs)
+        if session.info.get(_USECASE_DEPTH_KEY):
+            raise RuntimeError(
+                f'{type(self).__name__} c REQUIRES_NEW вызван в сессии внешнего '
+                f'юзкейса. Передайте ему отдельную сессию'
+            )
+        return await _call_outermost(session, call, self, kwargs)
+
+    return wrapped_call
+
+
+async def _in_db_transaction(session: AsyncSession) -> bool:
+    """Открыта ли в БД транзакция, в которой можно поставить SAVEPOINT.
+
+    Без транзакции в сессии соединение не берем. В AUTOCOMMIT транзакции в БД
+    нет и после запросов.
+    """
+    if not session.in_transaction():
+        return False
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    return raw_connection.driver_connection.is_in_transaction()
+
+
+def _wrap_nested(call: _Call) -> _Call:
+    async def wrapped_call(self: 'Usecase', **kwargs) -> Any:
+        session = getattr(self, 'session', None)
+        if session is None:
+            return await call(self, **kwargs)
+        if not session.info.get(_USECASE_DEPTH_KEY):
+            return await _call_outermost(session, call, self, kwargs)
+
+        # SAVEPOINT уходит в БД на первом запросе вложенного юзкейса, если
+        # он вообще пойдет в БД
+        if await _in_db_transaction(session):
+            async with session.begin_nested():
+                return await _call_joined(session, call, self, kwargs)
+
+        # Внешнему откатывать в БД нечего: в AUTOCOMMIT запросы уже закоммичены,
+        # a без запросов транзакцию в БД откроет сам вложенный. Тогда при ошибке
+        # откатываем ее целиком
+        try:
+            return await _call_joined(session, call, self, kwargs)
+        except BaseException:
+            if await _in_db_transaction(session):
+                await session.rollback()
+            raise
+
+    return wrapped_call
+
+
+def _wrap_read_only(call: _Call) -> _Call:
+    async def wrapped_call(self: 'Usecase', **kwargs) -> Any:
+        try:
+            return await call(self, **kwargs)
+        finally:
+            session = getattr(self, 'session', None)
+            # Коммит без открытой транзакции в БД не делает round trip, только
+            # возвращает соединение в пул. Откат здесь не нужен, a объекты,
+            # которые еще будут сериализовать, он бы протушил
+            if (
+                session is not None
+                and not session.info.get(_USECASE_DEPTH_KEY)
+                and session.in_transaction()
+            ):
+                await session.commit()
+
+    return wrapped_call
+
+
+_WRAPPERS: dict[PropagationEnum, Callable[[_Call], _Call]] = {
+    PropagationEnum.REQUIRED: _wrap_required,
+    PropagationEnum.REQUIRES_NEW: _wrap_requires_new,
+    PropagationEnum.NESTED: _wrap_nested,
+    PropagationEnum.READ_ONLY: _wrap_read_only,
+}
+
+
 class _TransactionalMixin(Protocol):
-    """Миксин для автоматических транзакций."""
+    """Миксин для автоматических транзакций.
+
+    Режим задается атрибутом класса propagation и выбирается один раз при
+    объявлении класса, на вызове лишних проверок нет:
+
+    - REQUIRED (по умолчанию) - внешний юзкейс ведет транзакцию: она
+      начинается на первом запросе, a на выходе коммитится или откатывается,
+      и соединение сразу возвращается в пул. Вложенные выполняются в ней же.
+    - REQUIRES_NEW - юзкейс всегда ведет свою транзакцию, поэтому ему нужна
+      отдельная сессия. В сессии внешнего юзкейса вызов падает.
+    - NESTED - как REQUIRED, но вложенный вызов внутри уже открытой в БД
+      транзакции (не AUTOCOMMIT) выполняется в SAVEPOINT и при ошибке
+      откатывает только себя.
+    - READ_ONLY - без транзакции: движок работает в AUTOCOMMIT, поэтому
+      читающему юзкейсу нечего коммитить и откатывать. На выходе внешнего
+      вызова соединение возвращается в пул.
+    - NONE - __call__ не оборачивается.
+    """
 
     # FIXME: Это хак, для того чтобы в каждом юзкейсе отдельно не открывать транзакцию.
     #  Более того, в силу допущения случаев когда один юзкейс дергает другой юзкейс,
@@ -16,19 +179,72 @@ class _TransactionalMixin(Protocol):
     #  транзакция или нет. Это все из-за особенностей dishka.
     #  Если вам такой хак не подходит, то используйте
     #  class Usecase(Protocol[TInputDTO, TOutputDTO]).
+    propagation: ClassVar[PropagationEnum] = PropagationEnum.REQUIRED
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Оборачиваем только собственный __call__, унаследованный уже обернут
+        wrap = _WRAPPERS.get(cls.propagation)
+        if wrap is not None and '__call__' in cls.__dict__:
+            cls.__call__ = wrap(cls.__call__)  # type: ignore[method-assign]
+
+
+class SingleFlightMixin:
+    """Миксин склейки одинаковых конкурентных вызовов юзкейса.
+
+    Конкурентные вызовы c одинаковым входным DTO выполняются один раз и получают
+    общий результат, остальные не берут сессию и не ходят в БД. Подходит только
+    для юзкейсов на чтение. Миксин ставится перед Usecase, чтобы склейка
+    происходила до открытия транзакции:
+    class GetUserByIdUsecase(SingleFlightMixin, Usecase[...]).
+    """
+
+    # Сколько секунд ждем уже идущий вызов, прежде чем выполниться самим
+    single_flight_timeout: ClassVar[float] = config.common.single_flight_timeout
+    _single_flight: ClassVar[SingleFlight]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._single_flight = SingleFlight(
+            cls.__qualname__, timeout=cls.single_flight_timeout
+        )
+        # Унаследованный __call__ уже обернут, a склеивать он будет по группе
+        # наследника, потому что группу берет из self
+        if '__call__' not in cls.__dict__:
+            return
+        original_call = cls.__call__
+
+        async def wrapped_call(self: 'SingleFlightMixin', data: BaseModel) -> object:
+            return await self._single_flight.do(
+                data.model_dump_json(),
+                lambda: original_call(self, data=data),  # type: ignore[call-arg]
+            )
+
+        cls.__call__ = wrapped_call  # type: ignore[method-assign]
+
+
+class InvalidatesResponseCacheMixin:
+    """Миксин сброса кэша ответов после изменения данных.
+
+    После успешного вызова сбрасываются теги invalidates_tags в response_cache
+    (см. cache_response). Миксин ставится перед Usecase, поэтому сброс идет после
+    коммита транзакции юзкейса, a не до него:
+    class CreateRoleUsecase(InvalidatesResponseCacheMixin, Usecase[...]).
+    """
+
+    invalidates_tags: ClassVar[tuple[str, ...]] = ()
+    response_cache: ResponseCache
+
     def __init_subclass__(cls, **kwargs) -> None:
         super().__init_subclass__(**kwargs)
-        # Оборачиваем __call__ метод автоматически
+        if '__call__' not in cls.__dict__:
+            return
         original_call = cls.__call__
 
-        async def wrapped_call(self: 'Usecase', **kwargs) -> TOutputDTO:
-            if hasattr(self, 'session') and isinstance(self.session, AsyncSession):
-                if self.session.in_transaction():
-                    async with self.session.begin_nested():
-                        return await original_call(self, **kwargs)
-                async with self.session.begin():
-                    return await original_call(self, **kwargs)
-            return await original_call(self, **kwargs)
+        async def wrapped_call(self: 'InvalidatesResponseCacheMixin', **kwargs) -> Any:
+            result = await original_call(self, **kwargs)
+            await self.response_cache.invalidate(*self.invalidates_tags)
+            return result
 
         cls.__call__ = wrapped_call  # type: ignore[method-assign]
 
@@ -1,21 +1,38 @@
 """FIXME Сделано в демонстрационных целях. Удалить в боевом проекте."""
 
-from collections.abc import Sequence
+from typing import Annotated
 
 from dishka import FromDishka as Depends
 from dishka.integrations.fastapi import DishkaRoute
 from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Request
+from fastapi import Response
+from starlette.responses import StreamingResponse
+from starlette.status import HTTP_304_NOT_MODIFIED
 from starlette.status import HTTP_404_NOT_FOUND
 from starlette.status import HTTP_409_CONFLICT
+from starlette.status import HTTP_422_UNPROCESSABLE_CONTENT
 
+from app.api.utils.cache.response import cache_response
+from app.api.utils.conditional_request import EntityValidators
+from app.api.utils.conditional_request import is_conditional_request
+from app.api.utils.enums.stream_format_enum import StreamFormatEnum
+from app.api.utils.row_response import RowPageResponse
+from app.api.utils.streaming import get_streaming_response
 from app.api.utils.swagger.default_response import get_responses
+from app.api.utils.swagger.default_response import get_streaming_responses
 from app.api.v1.models import UserRoleModel
+from app.api.v1.schemas.base_schema import CursorPageSchema
+from app.api.v1.schemas.base_schema import CursorPaginationSchema
 from app.api.v1.schemas.role_schema import CreateRoleSchema
 from app.api.v1.schemas.role_schema import GetRoleByIdSchema
 from app.api.v1.schemas.role_schema import RoleSchema
 from app.api.v1.usecases.role.create import CreateRoleUsecase
+from app.api.v1.usecases.role.export import ExportRolesUsecase
 from app.api.v1.usecases.role.get_all import GetAllRolesUsecase
 from app.api.v1.usecases.role.get_by_id import GetRoleByIdUsecase
+from app.api.v1.usecases.role.get_last_modified import GetRoleLastModifiedUsecase
 
 router = APIRouter(
     route_class=DishkaRoute,
@@ -24,15 +41,38 @@ router = APIRouter(
 
 @router.get(
     '/',
-    response_model=list[RoleSchema],
+    response_model=CursorPageSchema[RoleSchema],
     name='Получить все роли',
-    description='Получить список всех ролей системы с полной информацией о каждой роли'
-    ' включая идентификатор, название и дату создания',
+    description='Получить страницу ролей системы с полной информацией о каждой роли'
+    ' включая идентификатор, название и дату создания. Для получения следующей'
+    ' страницы передайте next_cursor из ответа в параметр cursor',
+    responses=get_responses(
+        include_statuses=[HTTP_422_UNPROCESSABLE_CONTENT],
+    ),
 )
+@cache_response('roles')
 async def get_all_roles(
+    pagination: Annotated[CursorPaginationSchema, Query()],
     usecase: Depends[GetAllRolesUsecase],
-) -> Sequence[UserRoleModel]:
-    return await usecase()
+) -> RowPageResponse:
+    return RowPageResponse(await usecase(data=pagination), RoleSchema)
+
+
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    name='Выгрузить всех ролей',
+    description='Потоковая выгрузка всех ролей без пагинации. Ответ отдается'
+    ' чанками по мере чтения из БД: NDJSON (по записи на строку) или JSON массив',
+    responses=get_streaming_responses(RoleSchema),
+)
+async def export_roles(
+    usecase: Depends[ExportRolesUsecase],
+    stream_format: Annotated[StreamFormatEnum, Query(alias='format')] = (
+        StreamFormatEnum.NDJSON
+    ),
+) -> StreamingResponse:
+    return get_streaming_response(await usecase(), RoleSchema, stream_format)
 
 
 @router.get(
@@ -42,18 +82,31 @@ async def get_all_roles(
     description='Получить детальную информацию о роли по её уникальному идентификатору.'
     ' Возвращает все данные роли включая название и дату создания',
     responses=get_responses(
-        include_statuses=[HTTP_404_NOT_FOUND],
+        include_statuses=[HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND],
     ),
 )
+@cache_response('roles')
 async def get_role_by_id(
     role_id: int,
+    request: Request,
+    response: Response,
     usecase: Depends[GetRoleByIdUsecase],
-) -> UserRoleModel | None:
-    return await usecase(
-        data=GetRoleByIdSchema(
-            id=role_id,
-        ),
+    last_modified_usecase: Depends[GetRoleLastModifiedUsecase],
+) -> UserRoleModel | Response:
+    data = GetRoleByIdSchema(
+        id=role_id,
     )
+    if is_conditional_request(request.headers):
+        # Проверка без загрузки записи: created_at из кэша или одной колонкой из БД
+        last_modified = await last_modified_usecase(data=data)
+        if last_modified is not None:
+            validators = EntityValidators.create(role_id, last_modified)
+            if validators.is_not_modified(request.headers):
+                return validators.get_not_modified_response()
+
+    role = await usecase(data=data)
+    response.headers.update(EntityValidators.create(role.id, role.created_at).headers)
+    return role
 
 
 @router.post(
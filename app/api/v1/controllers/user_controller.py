@@ -1,23 +1,54 @@
 """FIXME Сделано в демонстрационных целях. Удалить в боевом проекте."""
 
+from typing import Annotated
 from typing import Any
 
 from dishka import FromDishka as Depends
 from dishka.integrations.fastapi import DishkaRoute
 from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Request
+from fastapi import Response
+from starlette.responses import StreamingResponse
 from starlette.status import HTTP_204_NO_CONTENT
+from starlette.status import HTTP_304_NOT_MODIFIED
 from starlette.status import HTTP_404_NOT_FOUND
 from starlette.status import HTTP_409_CONFLICT
+from starlette.status import HTTP_422_UNPROCESSABLE_CONTENT
 
+from app.api.utils.conditional_request import EntityValidators
+from app.api.utils.conditional_request import is_conditional_request
+from app.api.utils.enums.stream_format_enum import StreamFormatEnum
+from app.api.utils.row_response import RowPageResponse
+from app.api.utils.streaming import get_streaming_response
 from app.api.utils.swagger.default_response import get_responses
+from app.api.utils.swagger.default_response import get_streaming_responses
+from app.api.v1.schemas.base_schema import BatchResultSchema
+from app.api.v1.schemas.base_schema import BatchSchema
+from app.api.v1.schemas.base_schema import CursorPageSchema
+from app.api.v1.schemas.base_schema import CursorPaginationSchema
+from app.api.v1.schemas.base_schema import WithSchema
 from app.api.v1.schemas.user_schema import CreateUserSchema
 from app.api.v1.schemas.user_schema import DeleteUserSchema
+from app.api.v1.schemas.user_schema import DeleteUsersSchema
 from app.api.v1.schemas.user_schema import GetUserByIdSchema
+from app.api.v1.schemas.user_schema import PatchUserSchema
+from app.api.v1.schemas.user_schema import UpdateUserSchema
 from app.api.v1.schemas.user_schema import UserSchema
+from app.api.v1.schemas.user_schema import UserWithRoleSchema
+from app.api.v1.usecases.user.batch_create import BatchCreateUsersUsecase
+from app.api.v1.usecases.user.batch_delete import BatchDeleteUsersUsecase
+from app.api.v1.usecases.user.batch_update import BatchUpdateUsersUsecase
+from app.api.v1.usecases.user.batch_upsert import BatchUpsertUsersUsecase
 from app.api.v1.usecases.user.create import CreateUserUsecase
 from app.api.v1.usecases.user.delete import DeleteUserUsecase
+from app.api.v1.usecases.user.export import ExportUsersUsecase
 from app.api.v1.usecases.user.get_all import GetAllUsersUsecase
+from app.api.v1.usecases.user.get_all_with_roles import GetAllUsersWithRolesUsecase
 from app.api.v1.usecases.user.get_by_id import GetUserByIdUsecase
+from app.api.v1.usecases.user.get_last_modified import GetUserLastModifiedUsecase
+from app.api.v1.usecases.user.import_users import ImportUsersUsecase
+from app.api.v1.usecases.user.update import UpdateUserUsecase
 
 router = APIRouter(
     route_class=DishkaRoute,
@@ -26,15 +57,128 @@ router = APIRouter(
 
 @router.get(
     '/',
-    response_model=list[UserSchema],
+    response_model=CursorPageSchema[UserSchema],
     name='Получить всех пользователей',
-    description='Получить список всех пользователей системы с полной информацией о'
-    ' каждом пользователе включая идентификатор, имя пользователя и email',
+    description='Получить страницу пользователей системы с полной информацией о'
+    ' каждом пользователе включая идентификатор, имя пользователя и email. Для'
+    ' получения следующей страницы передайте next_cursor из ответа в параметр cursor',
+    responses=get_responses(include_statuses=[HTTP_422_UNPROCESSABLE_CONTENT]),
 )
 async def get_all_users(
+    pagination: Annotated[CursorPaginationSchema, Query()],
     usecase: Depends[GetAllUsersUsecase],
+) -> RowPageResponse:
+    # Страница сериализуется из строк БД напрямую, UserSchema здесь только для OpenAPI
+    return RowPageResponse(await usecase(data=pagination), UserSchema)
+
+
+@router.get(
+    '/with-roles',
+    response_model=CursorPageSchema[UserWithRoleSchema],
+    name='Получить пользователей c ролями',
+    description='Получить страницу пользователей вместе c их ролями одним запросом,'
+    ' без отдельного запроса роли на каждого пользователя. Пагинация как у'
+    ' списка пользователей',
+    responses=get_responses(include_statuses=[HTTP_422_UNPROCESSABLE_CONTENT]),
+)
+async def get_all_users_with_roles(
+    pagination: Annotated[CursorPaginationSchema, Query()],
+    usecase: Depends[GetAllUsersWithRolesUsecase],
+) -> Any:
+    return await usecase(data=pagination)
+
+
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    name='Выгрузить всех пользователей',
+    description='Потоковая выгрузка всех пользователей без пагинации. Ответ отдается'
+    ' чанками по мере чтения из БД: NDJSON (по записи на строку) или JSON массив',
+    responses=get_streaming_responses(UserSchema),
+)
+async def export_users(
+    usecase: Depends[ExportUsersUsecase],
+    stream_format: Annotated[StreamFormatEnum, Query(alias='format')] = (
+        StreamFormatEnum.NDJSON
+    ),
+) -> StreamingResponse:
+    return get_streaming_response(await usecase(), UserSchema, stream_format)
+
+
+@router.post(
+    '/batch',
+    response_model=list[UserSchema],
+    name='Создать пользователей пачкой',
+    description='Создать пачку пользователей. Записи уходят в БД multi-row INSERT'
+    ' пачками, все в одной транзакции: при ошибке не создается ни один пользователь.'
+    ' Ответ в порядке входных элементов',
+    responses=get_responses(include_statuses=[HTTP_409_CONFLICT]),
+)
+async def batch_create_users(
+    body: BatchSchema[CreateUserSchema],
+    usecase: Depends[BatchCreateUsersUsecase],
+) -> Any:
+    return await usecase(data=body)
+
+
+@router.put(
+    '/batch',
+    response_model=list[UserSchema],
+    name='Создать или обновить пользователей пачкой',
+    description='Создать пользователей, a существующих c тем же user_name обновить'
+    ' (INSERT ... ON CONFLICT DO UPDATE). Все пачки в одной транзакции',
+    responses=get_responses(include_statuses=[HTTP_409_CONFLICT]),
+)
+async def batch_upsert_users(
+    body: BatchSchema[CreateUserSchema],
+    usecase: Depends[BatchUpsertUsersUsecase],
+) -> Any:
+    return await usecase(data=body)
+
+
+@router.patch(
+    '/batch',
+    response_model=list[UserSchema],
+    name='Обновить пользователей пачкой',
+    description='Обновить пользователей по id. Обновляются только переданные поля.'
+    ' Если хотя бы одного пользователя нет, не обновляется ни один',
+    responses=get_responses(include_statuses=[HTTP_404_NOT_FOUND, HTTP_409_CONFLICT]),
+)
+async def batch_update_users(
+    body: BatchSchema[UpdateUserSchema],
+    usecase: Depends[BatchUpdateUsersUsecase],
 ) -> Any:
-    return await usecase()
+    return await usecase(data=body)
+
+
+@router.delete(
+    '/batch',
+    status_code=HTTP_204_NO_CONTENT,
+    name='Удалить пользователей пачкой',
+    description='Удалить пользователей по списку id. Если хотя бы одного пользователя'
+    ' нет, не удаляется ни один',
+    responses=get_responses(include_statuses=[HTTP_404_NOT_FOUND]),
+)
+async def batch_delete_users(
+    query: Annotated[DeleteUsersSchema, Query()],
+    usecase: Depends[BatchDeleteUsersUsecase],
+) -> None:
+    await usecase(data=query)
+
+
+@router.post(
+    '/import',
+    response_model=BatchResultSchema,
+    name='Импортировать пользователей',
+    description='Быстрая загрузка большой пачки пользователей через COPY. Созданные'
+    ' записи не возвращаются, только их количество',
+    responses=get_responses(include_statuses=[HTTP_409_CONFLICT]),
+)
+async def import_users(
+    body: BatchSchema[CreateUserSchema],
+    usecase: Depends[ImportUsersUsecase],
+) -> Any:
+    return BatchResultSchema(count=await usecase(data=body))
 
 
 @router.get(
@@ -44,15 +188,54 @@ async def get_all_users(
     description='Получить детальную информацию о пользователе по его уникальному'
     ' идентификатору. Возвращает все данные пользователя включая имя,'
     ' email и дату создания',
-    responses=get_responses(include_statuses=[HTTP_404_NOT_FOUND]),
+    responses=get_responses(
+        include_statuses=[HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND]
+    ),
 )
 async def get_user_by_id(
     user_id: int,
+    request: Request,
+    response: Response,
     usecase: Depends[GetUserByIdUsecase],
+    last_modified_usecase: Depends[GetUserLastModifiedUsecase],
+) -> Any:
+    data = GetUserByIdSchema(
+        id=user_id,
+    )
+    if is_conditional_request(request.headers):
+        # Проверка без загрузки записи: из БД читается только updated_at
+        last_modified = await last_modified_usecase(data=data)
+        if last_modified is not None:
+            validators = EntityValidators.create(user_id, last_modified)
+            if validators.is_not_modified(request.headers):
+                return validators.get_not_modified_response()
+
+    user = await usecase(data=data)
+    if user.updated_at is not None:
+        response.headers.update(
+            EntityValidators.create(user.id, user.updated_at).headers
+        )
+    return user
+
+
+@router.patch(
+    '/{user_id}',
+    response_model=UserSchema,
+    name='Обновить пользователя',
+    description='Обновить переданные поля пользователя. Если передать updated_at из'
+    ' последнего чтения, изменение применится, только если пользователя никто не'
+    ' изменил после этого чтения, иначе вернется 409',
+    responses=get_responses(include_statuses=[HTTP_404_NOT_FOUND, HTTP_409_CONFLICT]),
+)
+async def update_user(
+    user_id: int,
+    body: PatchUserSchema,
+    usecase: Depends[UpdateUserUsecase],
 ) -> Any:
     return await usecase(
-        data=GetUserByIdSchema(
-            id=user_id,
+        data=WithSchema[int, PatchUserSchema](
+            with_data=user_id,
+            payload=body,
         ),
     )
 
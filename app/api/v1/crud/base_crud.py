@@ -1,41 +1,123 @@
+from collections.abc import AsyncIterator
+from collections.abc import Collection
 from collections.abc import Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+from functools import cache
+from itertools import batched
 from typing import Any
+from typing import cast
 from typing import get_args
+from uuid import UUID
 
+from asyncpg import CheckViolationError
 from asyncpg import ForeignKeyViolationError
+from asyncpg import NotNullViolationError
+from asyncpg import PostgresError
 from asyncpg import UniqueViolationError
 from pydantic import BaseModel
+from sqlalchemy import Column
+from sqlalchemy import Delete
+from sqlalchemy import Insert
+from sqlalchemy import Row
+from sqlalchemy import RowMapping
+from sqlalchemy import Select
+from sqlalchemy import Table
+from sqlalchemy import bindparam
+from sqlalchemy import column
 from sqlalchemy import delete
 from sqlalchemy import insert
+from sqlalchemy import literal
 from sqlalchemy import select
+from sqlalchemy import tuple_
 from sqlalchemy import update
+from sqlalchemy import values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.sql.elements import ColumnElement
 from starlette.exceptions import HTTPException
 from starlette.status import HTTP_404_NOT_FOUND
 from starlette.status import HTTP_409_CONFLICT
+from starlette.status import HTTP_422_UNPROCESSABLE_CONTENT
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 
 from app.api.utils.sqlalchemy.base_db_model import BaseDBModel
+from app.api.utils.sqlalchemy.pagination import CursorPage
+from app.api.utils.sqlalchemy.pagination import decode_cursor
+from app.api.utils.sqlalchemy.pagination import encode_cursor
 
 type ModelType = BaseDBModel
 type CreateSchemaType = BaseModel
 type UpdateSchemaType = BaseModel
 
 
+@dataclass(frozen=True, slots=True)
+class _Statements:
+    """Заранее собранные запросы BaseCRUD для модели.
+
+    Значения передаются только bindparam-ами при выполнении, поэтому запрос
+    собирается один раз на модель, a его ключ в кэше компиляции алхимии не
+    зависит от значений.
+    """
+
+    get: Select
+    get_multi: Select
+    delete: Delete
+    create: Insert
+
+
+@cache
+def _get_statements(model: type[ModelType]) -> _Statements:
+    """Собираем запросы BaseCRUD для модели один раз."""
+    id_column = model.__table__.c.id
+    return _Statements(
+        get=select(model).where(id_column == bindparam('id')),
+        # LIMIT NULL в PG - без ограничения, OFFSET 0 - без смещения
+        get_multi=select(model).limit(bindparam('limit')).offset(bindparam('offset')),
+        delete=delete(model).where(id_column == bindparam('id')),
+        create=insert(model).returning(model),
+    )
+
+
+@cache
+def _get_last_modified_statement(model: type[ModelType], column_name: str) -> Select:
+    """Запрос времени изменения записи без остальных колонок."""
+    columns = model.__table__.columns
+    return select(columns[column_name]).where(columns.id == bindparam('id'))
+
+
 class BaseCRUD[ModelT: ModelType]:
     model: type[ModelT]
+    _table: Table
+    _statements: _Statements
+    # Колонка оптимистичной блокировки для update(version=...): целочисленный
+    # счетчик или колонка c onupdate, например updated_at
+    version_column: str | None = None
+    # Колонка времени последнего изменения записи для ETag и Last-Modified
+    last_modified_column: str | None = None
 
-    def __new__(
-        cls,
-        *args,
-        **kwargs,
-    ) -> 'BaseCRUD':
-        """Создаем и инициализируем инстанс, прокидывая модель."""
-        instance = super().__new__(cls)
+    __slots__ = ('db',)
 
-        instance.model = get_args(cls.__orig_bases__[0])[0]  # type: ignore
-        return instance
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Один раз на класс достаем модель из BaseCRUD[Model] и собираем запросы.
+
+        Обобщенные наследники вроде CacheCRUDMixin[ModelT] модель не получают,
+        ее получит конкретный класс: class RoleCRUD(CacheCRUDMixin[UserRoleModel]).
+        """
+        super().__init_subclass__(**kwargs)
+        for base in getattr(cls, '__orig_bases__', ()):
+            model = next(iter(get_args(base)), None)
+            if isinstance(model, type) and issubclass(model, BaseDBModel):
+                cls.model = model  # type: ignore[assignment]
+                cls._table = cast(Table, model.__table__)
+                cls._statements = _get_statements(model)
+                return
 
     def __init__(
         self,
@@ -59,13 +141,7 @@ class BaseCRUD[ModelT: ModelType]:
             HTTPException
 
         """
-        stmt = await self.db.execute(
-            select(
-                self.model,
-            ).where(
-                self.model.id == _id,
-            )
-        )
+        stmt = await self.db.execute(self._statements.get, {'id': _id})
         result = stmt.scalars().first()
 
         if not result:
@@ -75,6 +151,42 @@ class BaseCRUD[ModelT: ModelType]:
             )
         return result
 
+    async def get_last_modified(
+        self,
+        _id: Any,
+    ) -> datetime | None:
+        """Получаем время последнего изменения записи по айди.
+
+        Читается одна колонка, без загрузки и сериализации всей записи. Нужно для
+        дешевой проверки условных GET запросов.
+
+        Args:
+            _id: Any
+
+        Returns:
+            datetime | None
+
+        Raises:
+            HTTPException
+            ValueError - у CRUD не задан last_modified_column
+
+        """
+        if self.last_modified_column is None:
+            raise ValueError(f'У {type(self).__name__} не задан last_modified_column')
+
+        stmt = await self.db.execute(
+            _get_last_modified_statement(self.model, self.last_modified_column),
+            {'id': _id},
+        )
+        row = stmt.first()
+
+        if row is None:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+                detail=f'Запись {self.model.__tablename__} не найдена!',
+            )
+        return row[0]
+
     async def get_multi(
         self,
         *,
@@ -91,15 +203,250 @@ class BaseCRUD[ModelT: ModelType]:
             Sequence[Row | RowMapping | Any]
 
         """
-        stmt = select(self.model)
+        data = await self.db.execute(
+            self._statements.get_multi,
+            {'limit': limit or None, 'offset': offset or 0},
+        )
+        return data.scalars().all()
 
-        if limit:
-            stmt = stmt.limit(limit)
-        if offset:
-            stmt = stmt.offset(offset)
+    async def get_multi_by_cursor(
+        self,
+        *,
+        cursor: str | None = None,
+        limit: int = 50,
+        order_by: str = 'id',
+        options: Sequence[ExecutableOption] = (),
+    ) -> CursorPage[ModelT]:
+        """Получаем страницу элементов c keyset пагинацией.
+
+        Вместо OFFSET фильтруем по ключу последней записи предыдущей страницы,
+        поэтому стоимость запроса не зависит от глубины страницы. Сортировать можно
+        только по PK или индексированной колонке. Для неуникальной колонки к ключу
+        добавляется PK, чтобы порядок был однозначным.
 
-        data = await self.db.execute(stmt)
-        return data.scalars().all()
+        Args:
+            cursor: str | None - курсор из next_cursor предыдущей страницы
+            limit: int - размер страницы
+            order_by: str - колонка сортировки
+            options: Sequence[ExecutableOption] - опции загрузки, например
+                joinedload связей
+
+        Returns:
+            CursorPage[ModelT]
+
+        Raises:
+            HTTPException
+
+        """
+        key = self._get_cursor_key(order_by)
+        return await self._get_page_by_cursor(
+            select(self.model).options(*options),
+            key=key,
+            cursor=cursor,
+            limit=limit,
+            order_by=order_by,
+            scalars=True,
+        )
+
+    async def get_multi_rows_by_cursor(
+        self,
+        *,
+        columns: Sequence[str],
+        cursor: str | None = None,
+        limit: int = 50,
+        order_by: str = 'id',
+    ) -> CursorPage[Row]:
+        """Получаем страницу core строк c keyset пагинацией.
+
+        Быстрый путь для чтения: строки не превращаются в ORM объекты и не
+        попадают в identity map. Колонки в строке идут в порядке columns, за
+        ними - колонки ключа сортировки, если их нет в columns.
+
+        Args:
+            columns: Sequence[str] - имена колонок модели
+            cursor: str | None - курсор из next_cursor предыдущей страницы
+            limit: int - размер страницы
+            order_by: str - колонка сортировки
+
+        Returns:
+            CursorPage[Row]
+
+        Raises:
+            HTTPException
+
+        """
+        key = self._get_cursor_key(order_by)
+        table_columns = self._table.columns
+        return await self._get_page_by_cursor(
+            select(
+                *(table_columns[name] for name in columns),
+                *(column for column in key if column.key not in columns),
+            ),
+            key=key,
+            cursor=cursor,
+            limit=limit,
+            order_by=order_by,
+            scalars=False,
+        )
+
+    async def _get_page_by_cursor(
+        self,
+        stmt: Select,
+        *,
+        key: tuple[Column, ...],
+        cursor: str | None,
+        limit: int,
+        order_by: str,
+        scalars: bool,
+    ) -> CursorPage[Any]:
+        """Выполняем запрос страницы keyset пагинации.
+
+        Args:
+            stmt: Select - запрос без сортировки и лимита
+            key: tuple[Column, ...] - ключ сортировки
+            cursor: str | None - курсор из next_cursor предыдущей страницы
+            limit: int - размер страницы
+            order_by: str - колонка сортировки
+            scalars: bool - отдавать ORM объекты, a не строки
+
+        Returns:
+            CursorPage[Any]
+
+        Raises:
+            HTTPException
+
+        """
+        if cursor:
+            try:
+                key_values = [
+                    self._restore_column_value(column, value)
+                    for column, value in zip(
+                        key, decode_cursor(cursor, order_by), strict=True
+                    )
+                ]
+            except (ValueError, TypeError) as e:
+                raise HTTPException(
+                    status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail='Некорректный курсор пагинации',
+                ) from e
+            stmt = stmt.where(tuple_(*key) > tuple_(*key_values))
+
+        # Берем на одну запись больше, чтобы понять есть ли следующая страница
+        stmt = stmt.order_by(*key).limit(limit + 1)
+        result = await self.db.execute(stmt)
+        items: Sequence[Any] = result.scalars().all() if scalars else result.all()
+
+        if len(items) <= limit:
+            return CursorPage(items=items)
+
+        items = items[:limit]
+        return CursorPage(
+            items=items,
+            next_cursor=encode_cursor(
+                order_by, [getattr(items[-1], column.key) for column in key]
+            ),
+        )
+
+    async def stream_multi(
+        self,
+        *,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """Потоково читаем всю таблицу батчами через серверный курсор.
+
+        В памяти одновременно живет только один батч, поэтому потребление памяти
+        не зависит от размера таблицы. Отдаем строки core-маппингами, без ORM
+        объектов и identity map.
+
+        Args:
+            batch_size: int - сколько строк забираем из курсора за раз
+
+        Yields:
+            Sequence[RowMapping]
+
+        """
+        owns_transaction = not self.db.in_transaction()
+        if owns_transaction:
+            # Серверный курсор asyncpg живет только внутри транзакции, а движок
+            # работает в AUTOCOMMIT. REPEATABLE READ заодно дает согласованный
+            # снимок на всю выгрузку.
+            await self.db.connection(
+                execution_options={'isolation_level': 'REPEATABLE READ'},
+            )
+
+        try:
+            result = await self.db.stream(
+                select(*self._table.columns)
+                .order_by(*self._table.primary_key.columns)
+                .execution_options(yield_per=batch_size),
+            )
+            async for partition in result.mappings().partitions():
+                yield partition
+        finally:
+            if owns_transaction:
+                await self.db.rollback()
+
+    def _get_cursor_key(self, order_by: str) -> tuple[Column, ...]:
+        """Собираем ключ сортировки для keyset пагинации.
+
+        Args:
+            order_by: str - колонка сортировки
+
+        Returns:
+            tuple[Column, ...]
+
+        Raises:
+            ValueError - колонка не существует или не индексирована
+
+        """
+        column = self._table.columns.get(order_by)
+        if column is None:
+            raise ValueError(f'У модели {self.model.__name__} нет колонки {order_by}')
+
+        if column.primary_key or column.unique:
+            return (column,)
+        if column.index:
+            return column, *self._table.primary_key.columns
+        raise ValueError(
+            f'Колонка {order_by} не индексирована, keyset пагинация по ней '
+            f'будет делать full scan'
+        )
+
+    def _get_version_column(self) -> Column:
+        """Колонка оптимистичной блокировки.
+
+        Returns:
+            Column
+
+        Raises:
+            ValueError - у CRUD не задан version_column
+
+        """
+        if self.version_column is None:
+            raise ValueError(
+                f'У {type(self).__name__} не задан version_column, оптимистичная '
+                f'блокировка недоступна'
+            )
+        return self._table.columns[self.version_column]
+
+    @staticmethod
+    def _restore_column_value(column: ColumnElement[Any], value: Any) -> Any:
+        """Восстанавливаем python тип значения колонки из JSON представления."""
+        if value is None:
+            return None
+
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            return value
+
+        if python_type in (datetime, date) and isinstance(value, str):
+            return python_type.fromisoformat(value)
+        if python_type is UUID and isinstance(value, str):
+            return UUID(value)
+        if not isinstance(value, python_type):
+            raise ValueError(f'Неверный тип значения курсора для {column.key}')
+        return value
 
     async def create(
         self,
@@ -122,20 +469,11 @@ class BaseCRUD[ModelT: ModelType]:
         """
         try:
             stmt = await self.db.execute(
-                insert(
-                    self.model,
-                )
-                .values(
-                    **(
-                        obj_in.model_dump(
-                            exclude_none=True,
-                            exclude=exclude,
-                        )
-                    ),
-                )
-                .returning(
-                    self.model,
-                )
+                self._statements.create,
+                obj_in.model_dump(
+                    exclude_none=True,
+                    exclude=exclude,
+                ),
             )
             await self.db.flush()
             return stmt.scalars().first()
@@ -165,33 +503,47 @@ class BaseCRUD[ModelT: ModelType]:
         *,
         _id: int,
         obj_in: UpdateSchemaType,
-    ) -> ModelT | None:
+        exclude: set | None = None,
+        version: Any | None = None,
+    ) -> ModelT:
         """Обновляем запись по айди.
 
+        Один UPDATE ... RETURNING без предварительного чтения: пустой RETURNING
+        значит, что записи нет. Если передан version, включается оптимистичная
+        блокировка: запись обновится, только если ее version_column все еще равна
+        version. Конкурентные UPDATE сериализуются блокировкой строки в PG, второй
+        перепроверяет условие и не находит строку, поэтому FOR UPDATE не нужен.
+
         Args:
             _id: int - айди поля
             obj_in: - схема c данными для обновления
+            exclude: set - исключаемые поля
+            version: Any | None - значение version_column из последнего чтения
 
         Returns:
-            Row | RowMapping
+            ModelT
 
         Raises:
-            HTTPException
+            HTTPException - 404, если записи нет, 409, если ее уже изменили
 
         """
-        await self.get(_id=_id)
+        stmt = (
+            update(self.model)
+            .where(self.model.id == _id)
+            .values(**obj_in.model_dump(exclude_unset=True, exclude=exclude))
+            .returning(self.model)
+        )
+        if version is not None:
+            version_column = self._get_version_column()
+            stmt = stmt.where(version_column == version)
+            if version_column.onupdate is None:
+                # Счетчик версий. Колонку c onupdate (updated_at) обновит алхимия
+                stmt = stmt.values({version_column.key: version_column + 1})
 
         try:
-            stmt = (
-                update(self.model)
-                .where(self.model.id == _id)
-                .values(**obj_in.model_dump(exclude_unset=True))
-                .returning(self.model)
-            )
             payload = await self.db.execute(stmt)
             await self.db.flush()
-            return payload.scalars().first()
-
+            result = payload.scalars().first()
         except IntegrityError as e:
             match e.orig.sqlstate:
                 case ForeignKeyViolationError.sqlstate:
@@ -212,6 +564,23 @@ class BaseCRUD[ModelT: ModelType]:
                         detail=str(e),
                     ) from e
 
+        if result is not None:
+            return result
+
+        # Лишний запрос только на неуспешном пути: отличаем 409 от 404
+        if version is not None and await self.db.scalar(
+            select(self.model.id).where(self.model.id == _id)
+        ):
+            raise HTTPException(
+                status_code=HTTP_409_CONFLICT,
+                detail=f'Запись {self.model.__tablename__} уже изменена другим '
+                f'запросом. Перечитайте ее и повторите изменение',
+            )
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail=f'Запись {self.model.__tablename__} не найдена!',
+        )
+
     async def delete(
         self,
         *,
@@ -223,15 +592,356 @@ class BaseCRUD[ModelT: ModelType]:
             _id: int - айди сущности в БД
 
         """
-        result = await self.db.execute(
-            delete(
-                self.model,
-            ).where(
-                self.model.id == _id,
-            )
-        )
+        result = await self.db.execute(self._statements.delete, {'id': _id})
         if result.rowcount != 1:
             raise HTTPException(
                 status_code=HTTP_404_NOT_FOUND, detail='Сущность не найдена!'
             )
         await self.db.flush()
+
+    async def create_many(
+        self,
+        *,
+        objs_in: Sequence[CreateSchemaType],
+        exclude: set | None = None,
+        chunk_size: int = 1000,
+    ) -> Sequence[RowMapping]:
+        """Создаем записи пачками multi-row INSERT.
+
+        Каждая пачка уходит одним INSERT ... VALUES (...), (...) RETURNING, поэтому
+        round trip на пачку, a не на запись. Все пачки выполняются в одной
+        транзакции: ошибка в любой откатывает весь вызов.
+
+        Args:
+            objs_in: Sequence[CreateSchemaType] - создаваемые записи
+            exclude: set - исключаемые поля
+            chunk_size: int - записей в одном INSERT
+
+        Returns:
+            Sequence[RowMapping] - созданные строки в порядке objs_in
+
+        Raises:
+            HTTPException
+
+        """
+        table = self._table
+        stmt = insert(table).returning(*table.columns, sort_by_parameter_order=True)
+        rows = [obj.model_dump(exclude_none=True, exclude=exclude) for obj in objs_in]
+
+        result: list[Any] = [None] * len(rows)
+        async with self._batch_transaction():
+            # Строки c разным набором полей не склеить в один VALUES
+            for indexes in self._group_by_fields(rows).values():
+                for chunk in batched(indexes, chunk_size, strict=False):
+                    try:
+                        payload = await self.db.execute(
+                            stmt, [rows[index] for index in chunk]
+                        )
+                    except (IntegrityError, DataError) as e:
+                        raise self._get_batch_error(e, chunk) from e
+                    for index, row in zip(chunk, payload.mappings(), strict=True):
+                        result[index] = row
+        return result
+
+    async def upsert_many(
+        self,
+        *,
+        objs_in: Sequence[CreateSchemaType],
+        index_elements: Sequence[str],
+        update_fields: Sequence[str] | None = None,
+        chunk_size: int = 1000,
+    ) -> Sequence[RowMapping]:
+        """Создаем или обновляем записи пачками INSERT ... ON CONFLICT DO UPDATE.
+
+        Поля схемы пишутся как есть: None в схеме запишется в БД как NULL. У всех
+        записей должен быть одинаковый набор полей.
+
+        Args:
+            objs_in: Sequence[CreateSchemaType] - записи
+            index_elements: Sequence[str] - колонки уникального индекса конфликта
+            update_fields: Sequence[str] | None - обновляемые при конфликте поля,
+                по умолчанию все поля схемы кроме index_elements
+            chunk_size: int - записей в одном INSERT
+
+        Returns:
+            Sequence[RowMapping] - созданные и обновленные строки
+
+        Raises:
+            HTTPException
+            ValueError - у записей разный набор полей
+
+        """
+        table = self._table
+        rows = [obj.model_dump() for obj in objs_in]
+        groups = self._group_by_fields(rows)
+        if len(groups) > 1:
+            # Один VALUES и один SET на все пачки: иначе часть полей молча не
+            # обновится при конфликте
+            raise ValueError(
+                f'У записей для upsert_many разный набор полей: {sorted(groups)}'
+            )
+        if update_fields is None:
+            update_fields = [
+                key for key in next(iter(groups), ()) if key not in index_elements
+            ]
+
+        result: list[RowMapping] = []
+        async with self._batch_transaction():
+            for chunk in batched(range(len(rows)), chunk_size, strict=False):
+                insert_stmt = pg_insert(table).values([rows[index] for index in chunk])
+                # onupdate колонки (updated_at) сами в ON CONFLICT не попадают
+                set_ = self._get_onupdate_values(exclude=update_fields)
+                set_.update(
+                    {field: insert_stmt.excluded[field] for field in update_fields}
+                )
+                stmt = insert_stmt.on_conflict_do_update(
+                    index_elements=index_elements,
+                    set_=set_,
+                ).returning(*table.columns)
+                try:
+                    payload = await self.db.execute(stmt)
+                except (IntegrityError, DataError) as e:
+                    raise self._get_batch_error(e, chunk) from e
+                result.extend(payload.mappings().all())
+        return result
+
+    async def update_many(
+        self,
+        *,
+        objs_in: Sequence[UpdateSchemaType],
+        chunk_size: int = 1000,
+    ) -> Sequence[RowMapping]:
+        """Обновляем записи по айди пачками UPDATE ... FROM (VALUES ...).
+
+        У каждой схемы должно быть поле id. Обновляются только явно переданные
+        поля, схемы c разным набором полей уходят разными UPDATE.
+
+        Args:
+            objs_in: Sequence[UpdateSchemaType] - схемы c id и данными для обновления
+            chunk_size: int - записей в одном UPDATE
+
+        Returns:
+            Sequence[RowMapping] - обновленные строки
+
+        Raises:
+            HTTPException - 404, если хотя бы одной записи нет. Весь вызов
+            откатывается
+
+        """
+        table = self._table
+        rows = [obj.model_dump(exclude_unset=True) for obj in objs_in]
+
+        result: list[RowMapping] = []
+        async with self._batch_transaction():
+            for fields, indexes in self._group_by_fields(rows, exclude='id').items():
+                data_columns = [table.c.id, *(table.c[field] for field in fields)]
+                for chunk in batched(indexes, chunk_size, strict=False):
+                    data = values(
+                        *(column(c.key, c.type) for c in data_columns),
+                        name='data',
+                    ).data(
+                        [
+                            tuple(rows[index][c.key] for c in data_columns)
+                            for index in chunk
+                        ]
+                    )
+                    stmt = (
+                        update(table)
+                        .where(table.c.id == data.c.id)
+                        .values({field: data.c[field] for field in fields})
+                        .returning(*table.columns)
+                    )
+                    try:
+                        payload = (await self.db.execute(stmt)).mappings().all()
+                    except (IntegrityError, DataError) as e:
+                        raise self._get_batch_error(
+                            e, chunk, fk_status=HTTP_404_NOT_FOUND
+                        ) from e
+
+                    if len(payload) != len(chunk):
+                        missing = {rows[index]['id'] for index in chunk} - {
+                            row['id'] for row in payload
+                        }
+                        raise HTTPException(
+                            status_code=HTTP_404_NOT_FOUND,
+                            detail=f'Записи {self.model.__tablename__} c id '
+                            f'{sorted(missing)} не найдены!',
+                        )
+                    result.extend(payload)
+        return result
+
+    async def delete_many(
+        self,
+        *,
+        ids: Sequence[Any],
+        chunk_size: int = 1000,
+    ) -> None:
+        """Удаляем объекты по айди пачками DELETE ... WHERE id IN (...).
+
+        Args:
+            ids: Sequence[Any] - айди сущностей в БД
+            chunk_size: int - айди в одном DELETE
+
+        Raises:
+            HTTPException - 404, если хотя бы одной сущности нет. Весь вызов
+            откатывается
+
+        """
+        table = self._table
+        missing = set(ids)
+        async with self._batch_transaction():
+            for chunk in batched(list(missing), chunk_size, strict=False):
+                payload = await self.db.execute(
+                    delete(table).where(table.c.id.in_(chunk)).returning(table.c.id)
+                )
+                missing.difference_update(payload.scalars().all())
+
+            if missing:
+                raise HTTPException(
+                    status_code=HTTP_404_NOT_FOUND,
+                    detail=f'Сущности c id {sorted(missing)} не найдены!',
+                )
+
+    async def copy_many(
+        self,
+        *,
+        objs_in: Sequence[CreateSchemaType],
+        exclude: set | None = None,
+    ) -> int:
+        """Загружаем записи через COPY (asyncpg copy_records_to_table).
+
+        Самый быстрый способ залить большой объем данных, но без RETURNING:
+        созданные строки не возвращаются. Выполняется в той же транзакции, что и
+        остальные пакетные операции.
+
+        Args:
+            objs_in: Sequence[CreateSchemaType] - создаваемые записи
+            exclude: set - исключаемые поля
+
+        Returns:
+            int - сколько записей загружено
+
+        Raises:
+            HTTPException
+
+        """
+        if not objs_in:
+            return 0
+
+        table = self._table
+        rows = [obj.model_dump(exclude=exclude) for obj in objs_in]
+        columns = list(rows[0])
+
+        async with self._batch_transaction():
+            connection = await self.db.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            if not driver_connection.is_in_transaction():
+                # Адаптер asyncpg открывает транзакцию только на первом запросе
+                # через алхимию, a COPY идет мимо нее
+                await connection.execute(select(literal(1)))
+            try:
+                await driver_connection.copy_records_to_table(
+                    table.name,
+                    schema_name=table.schema,
+                    columns=columns,
+                    records=[tuple(row[key] for key in columns) for row in rows],
+                )
+            except PostgresError as e:
+                raise self._get_batch_error(e, range(len(rows))) from e
+        return len(rows)
+
+    @asynccontextmanager
+    async def _batch_transaction(self) -> AsyncIterator[None]:
+        """Транзакция на все пачки пакетной операции.
+
+        Движок работает в AUTOCOMMIT, поэтому без явной транзакции каждая пачка
+        коммитилась бы отдельно. Если сессия уже в транзакции, выполняемся в ней.
+        """
+        if self.db.in_transaction():
+            yield
+            return
+
+        await self.db.connection(
+            execution_options={'isolation_level': 'READ COMMITTED'},
+        )
+        try:
+            yield
+        except BaseException:
+            await self.db.rollback()
+            raise
+        await self.db.commit()
+
+    @staticmethod
+    def _group_by_fields(
+        rows: Sequence[dict[str, Any]], exclude: str | None = None
+    ) -> dict[tuple[str, ...], list[int]]:
+        """Группируем индексы строк по набору полей."""
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for index, row in enumerate(rows):
+            fields = tuple(key for key in row if key != exclude)
+            groups.setdefault(fields, []).append(index)
+        return groups
+
+    def _get_onupdate_values(self, exclude: Collection[str]) -> dict[str, Any]:
+        """Значения onupdate колонок для UPDATE, который их сам не проставит."""
+        payload = {}
+        for table_column in self._table.columns:
+            onupdate = table_column.onupdate
+            if onupdate is None or table_column.key in exclude:
+                continue
+            if onupdate.is_callable:
+                payload[table_column.key] = onupdate.arg(None)  # type: ignore[attr-defined]
+            else:
+                payload[table_column.key] = onupdate.arg  # type: ignore[attr-defined]
+        return payload
+
+    def _get_batch_error(
+        self,
+        e: DBAPIError | PostgresError,
+        chunk: Sequence[int],
+        fk_status: int = HTTP_409_CONFLICT,
+    ) -> HTTPException:
+        """Маппим ошибку БД пачки в HTTPException как у create/update.
+
+        Args:
+            e: DBAPIError | PostgresError - ошибка алхимии или asyncpg (COPY)
+            chunk: Sequence[int] - индексы записей пачки во входных данных
+            fk_status: int - статус для нарушения FK
+
+        Returns:
+            HTTPException
+        """
+        orig = e.orig if isinstance(e, DBAPIError) else e
+        batch = f'Пачка записей c {chunk[0]} по {chunk[-1]}.'
+        match getattr(orig, 'sqlstate', None):
+            case UniqueViolationError.sqlstate:
+                return HTTPException(
+                    status_code=HTTP_409_CONFLICT,
+                    detail=f'Поля переданные в модель {self.model} содержат '
+                    f'неуникальные значения! {batch}',
+                )
+            case ForeignKeyViolationError.sqlstate:
+                return HTTPException(
+                    status_code=fk_status,
+                    detail='Вы пытаетесь связать поля c несуществующими '
+                    f'значениями FK! {batch}',
+                )
+            case NotNullViolationError.sqlstate | CheckViolationError.sqlstate:
+                return HTTPException(
+                    status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail=f'Данные не прошли ограничения модели {self.model}: '
+                    f'{orig} {batch}',
+                )
+            # Класс 22 - некорректные данные: переполнение, неверный формат и т.п.
+            case str() as sqlstate if sqlstate.startswith('22'):
+                return HTTPException(
+                    status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail=f'Некорректные данные для модели {self.model}: '
+                    f'{orig} {batch}',
+                )
+            case _:
+                return HTTPException(
+                    status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f'{orig} {batch}',
+                )
@@ -0,0 +1,187 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import RowMapping
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.api.utils.cache.base import CacheBackend
+from app.api.v1.crud.base_crud import BaseCRUD
+from app.api.v1.crud.base_crud import CreateSchemaType
+from app.api.v1.crud.base_crud import ModelType
+from app.api.v1.crud.base_crud import UpdateSchemaType
+
+
+class CacheCRUDMixin[ModelT: ModelType](BaseCRUD[ModelT]):
+    """Read-through кэш для BaseCRUD.get.
+
+    get сначала смотрит в кэш и идет в БД только при промахе. create, update и
+    delete инвалидируют запись после изменения. В кэше лежат значения колонок,
+    a не ORM объект, поэтому из кэша возвращается объект, подклеенный к текущей
+    сессии без запроса в БД. Пакетные операции тоже инвалидируют свои записи,
+    кроме create_many и copy_many: новых айди в кэше быть не может.
+
+    Подключается наследованием: class RoleCRUD(CacheCRUDMixin[UserRoleModel]).
+    Без переданного cache ведет себя как обычный BaseCRUD.
+    """
+
+    __slots__ = ('cache',)
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache: CacheBackend | None = None,
+    ) -> None:
+        super().__init__(db=db)
+        self.cache = cache
+
+    async def get(
+        self,
+        _id: Any,
+    ) -> ModelT:
+        """Получаем элемент по айди, сначала из кэша.
+
+        Args:
+            _id: Any
+
+        Returns:
+            ModelT
+
+        Raises:
+            HTTPException
+
+        """
+        if self.cache is None:
+            return await super().get(_id=_id)
+
+        key = self._get_cache_key(_id)
+        values = await self.cache.get(key)
+        if values is not None:
+            return await self._load_from_cache(values)
+
+        result = await super().get(_id=_id)
+        await self.cache.set(
+            key,
+            {
+                column.key: getattr(result, column.key)
+                for column in self.model.__table__.columns
+            },
+        )
+        return result
+
+    async def get_last_modified(
+        self,
+        _id: Any,
+    ) -> datetime | None:
+        """Получаем время изменения записи, сначала из кэша."""
+        if self.cache is not None and self.last_modified_column is not None:
+            values = await self.cache.get(self._get_cache_key(_id))
+            if values is not None:
+                column = self.model.__table__.columns[self.last_modified_column]
+                return self._restore_column_value(column, values[column.key])
+
+        return await super().get_last_modified(_id=_id)
+
+    async def create(
+        self,
+        *,
+        obj_in: CreateSchemaType,
+        exclude: set | None = None,
+    ) -> ModelT:
+        """Создаем запись в БД и инвалидируем кэш по ее айди."""
+        result = await super().create(obj_in=obj_in, exclude=exclude)
+        # BaseDBModel не объявляет id, берем первичный ключ из состояния объекта
+        await self._invalidate(*inspect(result).identity)
+        return result
+
+    async def update(
+        self,
+        *,
+        _id: int,
+        obj_in: UpdateSchemaType,
+        exclude: set | None = None,
+        version: Any | None = None,
+    ) -> ModelT:
+        """Обновляем запись по айди и инвалидируем кэш."""
+        result = await super().update(
+            _id=_id, obj_in=obj_in, exclude=exclude, version=version
+        )
+        await self._invalidate(_id)
+        return result
+
+    async def delete(
+        self,
+        *,
+        _id: int,
+    ) -> None:
+        """Удаляем объект по айди и инвалидируем кэш."""
+        await super().delete(_id=_id)
+        await self._invalidate(_id)
+
+    async def upsert_many(
+        self,
+        *,
+        objs_in: Sequence[CreateSchemaType],
+        index_elements: Sequence[str],
+        update_fields: Sequence[str] | None = None,
+        chunk_size: int = 1000,
+    ) -> Sequence[RowMapping]:
+        """Создаем или обновляем записи пачками и инвалидируем кэш."""
+        result = await super().upsert_many(
+            objs_in=objs_in,
+            index_elements=index_elements,
+            update_fields=update_fields,
+            chunk_size=chunk_size,
+        )
+        await self._invalidate(*(row['id'] for row in result))
+        return result
+
+    async def update_many(
+        self,
+        *,
+        objs_in: Sequence[UpdateSchemaType],
+        chunk_size: int = 1000,
+    ) -> Sequence[RowMapping]:
+        """Обновляем записи по айди пачками и инвалидируем кэш."""
+        result = await super().update_many(objs_in=objs_in, chunk_size=chunk_size)
+        await self._invalidate(*(row['id'] for row in result))
+        return result
+
+    async def delete_many(
+        self,
+        *,
+        ids: Sequence[Any],
+        chunk_size: int = 1000,
+    ) -> None:
+        """Удаляем объекты по айди пачками и инвалидируем кэш."""
+        await super().delete_many(ids=ids, chunk_size=chunk_size)
+        await self._invalidate(*ids)
+
+    def _get_cache_key(self, _id: Any) -> str:
+        return f'{self.model.__tablename__}:{_id}'
+
+    async def _invalidate(self, *ids: Any) -> None:
+        if self.cache is not None and ids:
+            await self.cache.delete(*(self._get_cache_key(_id) for _id in ids))
+
+    async def _load_from_cache(self, values: dict[str, Any]) -> ModelT:
+        """Собираем ORM объект из закэшированных значений колонок.
+
+        Args:
+            values: dict[str, Any] - значения колонок
+
+        Returns:
+            ModelT - объект в состоянии persistent в текущей сессии
+
+        """
+        instance = self.model(
+            **{
+                column.key: self._restore_column_value(column, values[column.key])
+                for column in self.model.__table__.columns
+            }
+        )
+        make_transient_to_detached(instance)
+        # load=False: объект считается актуальным и в БД за ним не ходим
+        return await self.db.merge(instance, load=False)
@@ -1,8 +1,11 @@
 """FIXME Сделано в демонстрационных целях. Удалить в боевом проекте."""
 
-from app.api.v1.crud.base_crud import BaseCRUD
+from app.api.v1.crud.cache_mixin import CacheCRUDMixin
 from app.api.v1.models import UserRoleModel
 
 
-class RoleCRUD(BaseCRUD[UserRoleModel]):
-    pass
+class RoleCRUD(CacheCRUDMixin[UserRoleModel]):
+    __slots__ = ()
+
+    # Роли не изменяются после создания
+    last_modified_column = 'created_at'
@@ -5,4 +5,7 @@ from app.api.v1.models import UserModel
 
 
 class UserCRUD(BaseCRUD[UserModel]):
-    pass
+    __slots__ = ()
+
+    version_column = 'updated_at'
+    last_modified_column = 'updated_at'
@@ -6,6 +6,7 @@ from sqlalchemy import ForeignKey
 from sqlalchemy import text
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import relationship
 
 from app.api.utils.sqlalchemy.annotated_fields import created_at_datetime
 from app.api.utils.sqlalchemy.annotated_fields import integer_pk
@@ -13,7 +14,7 @@ from app.api.utils.sqlalchemy.annotated_fields import updated_at_datetime
 from app.api.utils.sqlalchemy.base_db_model import BaseDBModel
 
 if t.TYPE_CHECKING:
-    pass
+    from app.api.v1.models.user_role import UserRoleModel
 
 
 class UserModel(BaseDBModel):
@@ -31,6 +32,9 @@ class UserModel(BaseDBModel):
         server_default=text('1'),
         comment='ФК на роль',
     )
+    # lazy='raise': в async ленивая загрузка невозможна, роль грузится явно
+    # через options(joinedload(UserModel.role))
+    role: Mapped['UserRoleModel | None'] = relationship(lazy='raise')
 
     created_at: Mapped[created_at_datetime]
     updated_at: Mapped[updated_at_datetime]
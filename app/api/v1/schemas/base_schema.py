@@ -53,3 +53,29 @@ class WithSchema[TWith, TSchema](BaseSchema):
     payload: TSchema
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class CursorPaginationSchema(BaseSchema):
+    cursor: str | None = Field(
+        default=None,
+        description='Курсор следующей страницы из поля next_cursor предыдущего ответа',
+    )
+    limit: int = Field(default=50, ge=1, le=1000, description='Размер страницы')
+
+
+class CursorPageSchema[TSchema](BaseSchema):
+    items: list[TSchema] = Field(description='Элементы страницы')
+    next_cursor: str | None = Field(
+        default=None,
+        description='Курсор следующей страницы. null, если страница последняя',
+    )
+
+
+class BatchSchema[TSchema](BaseSchema):
+    items: list[TSchema] = Field(
+        min_length=1, max_length=10000, description='Элементы пачки'
+    )
+
+
+class BatchResultSchema(BaseSchema):
+    count: int = Field(description='Сколько записей обработано')
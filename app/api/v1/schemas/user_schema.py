@@ -4,6 +4,7 @@ from pydantic import Field
 
 from app.api.v1.schemas.base_schema import BaseSchema
 from app.api.v1.schemas.base_schema import StrictDatetime
+from app.api.v1.schemas.role_schema import RoleSchema
 
 
 class CreateUserSchema(BaseSchema):
@@ -11,6 +12,22 @@ class CreateUserSchema(BaseSchema):
     role_id: int
 
 
+class UpdateUserSchema(BaseSchema):
+    id: int
+    user_name: str | None = None
+    role_id: int | None = None
+
+
+class PatchUserSchema(BaseSchema):
+    user_name: str | None = None
+    role_id: int | None = None
+    updated_at: StrictDatetime | None = Field(
+        default=None,
+        description='updated_at из последнего чтения. Если передан, пользователь'
+        ' обновится, только если его никто не изменил после этого чтения',
+    )
+
+
 class UserSchema(BaseSchema):
     id: int
     created_at: StrictDatetime
@@ -18,9 +35,17 @@ class UserSchema(BaseSchema):
     user_name: str = Field(min_length=6)
 
 
+class UserWithRoleSchema(UserSchema):
+    role: RoleSchema | None
+
+
 class GetUserByIdSchema(BaseSchema):
     id: int
 
 
 class DeleteUserSchema(BaseSchema):
     id: int
+
+
+class DeleteUsersSchema(BaseSchema):
+    ids: list[int] = Field(min_length=1, max_length=10000)
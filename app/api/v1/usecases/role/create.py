@@ -1,5 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.cache.base import CacheBackend
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.usecase import InvalidatesResponseCacheMixin
 from app.api.utils.usecase import Usecase
 from app.api.v1.crud.role_crud import RoleCRUD
 from app.api.v1.models import UserRoleModel
@@ -7,17 +10,25 @@ from app.api.v1.schemas.role_schema import CreateRoleSchema
 
 
 class CreateRoleUsecase(
+    InvalidatesResponseCacheMixin,
     Usecase[
         CreateRoleSchema,
         UserRoleModel,
     ],
 ):
+    invalidates_tags = ('roles',)
+
     def __init__(
         self,
         session: AsyncSession,
+        cache: CacheBackend,
+        response_cache: ResponseCache,
     ) -> None:
+        self.session = session
+        self.response_cache = response_cache
         self.role_crud = RoleCRUD(
             db=session,
+            cache=cache,
         )
 
     async def __call__(
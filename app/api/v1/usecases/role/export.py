@@ -0,0 +1,37 @@
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.role_crud import RoleCRUD
+
+
+class ExportRolesUsecase(
+    Usecase[
+        None,
+        AsyncIterator[Sequence[RowMapping]],
+    ],
+):
+    propagation = PropagationEnum.READ_ONLY
+
+    def __init__(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        self.session = session
+        self.role_crud = RoleCRUD(
+            db=session,
+        )
+
+    async def __call__(
+        self,
+        data: None = None,
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """Stream all roles.
+
+        Поток читается уже после выхода из юзкейса, при отправке ответа.
+        """
+        return self.role_crud.stream_multi()
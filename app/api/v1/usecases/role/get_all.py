@@ -1,29 +1,39 @@
-from collections.abc import Sequence
-
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.row_response import get_row_encoder
+from app.api.utils.sqlalchemy.pagination import CursorPage
 from app.api.utils.usecase import Usecase
 from app.api.v1.crud.role_crud import RoleCRUD
-from app.api.v1.models import UserRoleModel
+from app.api.v1.schemas.base_schema import CursorPaginationSchema
+from app.api.v1.schemas.role_schema import RoleSchema
 
 
 class GetAllRolesUsecase(
     Usecase[
-        None,
-        Sequence[UserRoleModel],
+        CursorPaginationSchema,
+        CursorPage[Row],
     ],
 ):
+    propagation = PropagationEnum.READ_ONLY
+
     def __init__(
         self,
         session: AsyncSession,
     ) -> None:
+        self.session = session
         self.role_crud = RoleCRUD(
             db=session,
         )
 
     async def __call__(
         self,
-        data: None = None,
-    ) -> Sequence[UserRoleModel]:
-        """Get all roles."""
-        return await self.role_crud.get_multi()
+        data: CursorPaginationSchema,
+    ) -> CursorPage[Row]:
+        """Get roles page."""
+        return await self.role_crud.get_multi_rows_by_cursor(
+            columns=get_row_encoder(RoleSchema).columns,
+            cursor=data.cursor,
+            limit=data.limit,
+        )
@@ -1,5 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.cache.base import CacheBackend
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.usecase import SingleFlightMixin
 from app.api.utils.usecase import Usecase
 from app.api.v1.crud.role_crud import RoleCRUD
 from app.api.v1.models import UserRoleModel
@@ -7,17 +10,23 @@ from app.api.v1.schemas.role_schema import GetRoleByIdSchema
 
 
 class GetRoleByIdUsecase(
+    SingleFlightMixin,
     Usecase[
         GetRoleByIdSchema,
         UserRoleModel,
     ],
 ):
+    propagation = PropagationEnum.READ_ONLY
+
     def __init__(
         self,
         session: AsyncSession,
+        cache: CacheBackend,
     ) -> None:
+        self.session = session
         self.role_crud = RoleCRUD(
             db=session,
+            cache=cache,
         )
 
     async def __call__(
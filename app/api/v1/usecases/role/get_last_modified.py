@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.cache.base import CacheBackend
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.usecase import SingleFlightMixin
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.role_crud import RoleCRUD
+from app.api.v1.schemas.role_schema import GetRoleByIdSchema
+
+
+class GetRoleLastModifiedUsecase(
+    SingleFlightMixin,
+    Usecase[
+        GetRoleByIdSchema,
+        datetime | None,
+    ],
+):
+    propagation = PropagationEnum.READ_ONLY
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: CacheBackend,
+    ) -> None:
+        self.session = session
+        self.role_crud = RoleCRUD(
+            db=session,
+            cache=cache,
+        )
+
+    async def __call__(
+        self,
+        data: GetRoleByIdSchema,
+    ) -> datetime | None:
+        """Get role last modification time."""
+        return await self.role_crud.get_last_modified(_id=data.id)
@@ -0,0 +1,30 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.schemas.user_schema import DeleteUsersSchema
+
+
+class BatchDeleteUsersUsecase(
+    Usecase[
+        DeleteUsersSchema,
+        None,
+    ],
+):
+    def __init__(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        self.session = session
+        self.user_crud = UserCRUD(
+            db=session,
+        )
+
+    async def __call__(
+        self,
+        data: DeleteUsersSchema,
+    ) -> None:
+        """Delete users batch."""
+        await self.user_crud.delete_many(
+            ids=data.ids,
+        )
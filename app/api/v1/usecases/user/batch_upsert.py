@@ -0,0 +1,35 @@
+from collections.abc import Sequence
+
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.schemas.base_schema import BatchSchema
+from app.api.v1.schemas.user_schema import CreateUserSchema
+
+
+class BatchUpsertUsersUsecase(
+    Usecase[
+        BatchSchema[CreateUserSchema],
+        Sequence[RowMapping],
+    ],
+):
+    def __init__(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        self.session = session
+        self.user_crud = UserCRUD(
+            db=session,
+        )
+
+    async def __call__(
+        self,
+        data: BatchSchema[CreateUserSchema],
+    ) -> Sequence[RowMapping]:
+        """Create or update users batch by user_name."""
+        return await self.user_crud.upsert_many(
+            objs_in=data.items,
+            index_elements=['user_name'],
+        )
@@ -16,6 +16,7 @@ class CreateUserUsecase(
         self,
         session: AsyncSession,
     ) -> None:
+        self.session = session
         self.user_crud = UserCRUD(
             db=session,
         )
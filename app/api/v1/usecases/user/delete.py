@@ -15,6 +15,7 @@ class DeleteUserUsecase(
         self,
         session: AsyncSession,
     ) -> None:
+        self.session = session
         self.user_crud = UserCRUD(
             db=session,
         )
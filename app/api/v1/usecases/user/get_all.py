@@ -1,29 +1,43 @@
-from collections.abc import Sequence
-
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.row_response import get_row_encoder
+from app.api.utils.sqlalchemy.pagination import CursorPage
 from app.api.utils.usecase import Usecase
 from app.api.v1.crud.user_crud import UserCRUD
-from app.api.v1.models import UserModel
+from app.api.v1.schemas.base_schema import CursorPaginationSchema
+from app.api.v1.schemas.user_schema import UserSchema
 
 
 class GetAllUsersUsecase(
     Usecase[
-        None,
-        Sequence[UserModel],
+        CursorPaginationSchema,
+        CursorPage[Row],
     ],
 ):
+    propagation = PropagationEnum.READ_ONLY
+
     def __init__(
         self,
         session: AsyncSession,
     ) -> None:
+        self.session = session
         self.user_crud = UserCRUD(
             db=session,
         )
 
     async def __call__(
         self,
-        data: None = None,
-    ) -> Sequence[UserModel]:
-        """Get all users."""
-        return await self.user_crud.get_multi()
+        data: CursorPaginationSchema,
+    ) -> CursorPage[Row]:
+        """Get users page.
+
+        Строки отдаются core-строками только c колонками UserSchema: ответ
+        сериализуется из них напрямую, без ORM объектов.
+        """
+        return await self.user_crud.get_multi_rows_by_cursor(
+            columns=get_row_encoder(UserSchema).columns,
+            cursor=data.cursor,
+            limit=data.limit,
+        )
@@ -0,0 +1,42 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.sqlalchemy.pagination import CursorPage
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.models import UserModel
+from app.api.v1.schemas.base_schema import CursorPaginationSchema
+
+
+class GetAllUsersWithRolesUsecase(
+    Usecase[
+        CursorPaginationSchema,
+        CursorPage[UserModel],
+    ],
+):
+    propagation = PropagationEnum.READ_ONLY
+
+    def __init__(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        self.session = session
+        self.user_crud = UserCRUD(
+            db=session,
+        )
+
+    async def __call__(
+        self,
+        data: CursorPaginationSchema,
+    ) -> CursorPage[UserModel]:
+        """Get users page with roles.
+
+        Роль у пользователя одна, поэтому она приходит LEFT JOIN-ом в том же
+        запросе, что и страница: один запрос вместо запроса роли на пользователя.
+        """
+        return await self.user_crud.get_multi_by_cursor(
+            cursor=data.cursor,
+            limit=data.limit,
+            options=[joinedload(UserModel.role)],
+        )
@@ -1,5 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.usecase import SingleFlightMixin
 from app.api.utils.usecase import Usecase
 from app.api.v1.crud.user_crud import UserCRUD
 from app.api.v1.models import UserModel
@@ -7,15 +9,19 @@ from app.api.v1.schemas.user_schema import GetUserByIdSchema
 
 
 class GetUserByIdUsecase(
+    SingleFlightMixin,
     Usecase[
         GetUserByIdSchema,
         UserModel,
     ],
 ):
+    propagation = PropagationEnum.READ_ONLY
+
     def __init__(
         self,
         session: AsyncSession,
     ) -> None:
+        self.session = session
         self.user_crud = UserCRUD(
             db=session,
         )
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.usecase import SingleFlightMixin
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.schemas.user_schema import GetUserByIdSchema
+
+
+class GetUserLastModifiedUsecase(
+    SingleFlightMixin,
+    Usecase[
+        GetUserByIdSchema,
+        datetime | None,
+    ],
+):
+    propagation = PropagationEnum.READ_ONLY
+
+    def __init__(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        self.session = session
+        self.user_crud = UserCRUD(
+            db=session,
+        )
+
+    async def __call__(
+        self,
+        data: GetUserByIdSchema,
+    ) -> datetime | None:
+        """Get user last modification time."""
+        return await self.user_crud.get_last_modified(
+            _id=data.id,
+        )
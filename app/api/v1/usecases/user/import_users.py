@@ -0,0 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.schemas.base_schema import BatchSchema
+from app.api.v1.schemas.user_schema import CreateUserSchema
+
+
+class ImportUsersUsecase(
+    Usecase[
+        BatchSchema[CreateUserSchema],
+        int,
+    ],
+):
+    def __init__(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        self.session = session
+        self.user_crud = UserCRUD(
+            db=session,
+        )
+
+    async def __call__(
+        self,
+        data: BatchSchema[CreateUserSchema],
+    ) -> int:
+        """Import users batch via COPY."""
+        return await self.user_crud.copy_many(
+            objs_in=data.items,
+        )
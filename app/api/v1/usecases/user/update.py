@@ -0,0 +1,35 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.usecase import Usecase
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.models import UserModel
+from app.api.v1.schemas.base_schema import WithSchema
+from app.api.v1.schemas.user_schema import PatchUserSchema
+
+
+class UpdateUserUsecase(
+    Usecase[
+        WithSchema[int, PatchUserSchema],
+        UserModel,
+    ],
+):
+    def __init__(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        self.session = session
+        self.user_crud = UserCRUD(
+            db=session,
+        )
+
+    async def __call__(
+        self,
+        data: WithSchema[int, PatchUserSchema],
+    ) -> UserModel:
+        """Update user by id."""
+        return await self.user_crud.update(
+            _id=data.with_data,
+            obj_in=data.payload,
+            exclude={'updated_at'},
+            version=data.payload.updated_at,
+        )
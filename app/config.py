@@ -1,5 +1,6 @@
 from http import HTTPMethod
 from typing import Any
+from uuid import uuid4
 
 from dotenv import find_dotenv
 from dotenv import load_dotenv
@@ -9,8 +10,20 @@ from pydantic_settings import BaseSettings
 from pydantic_settings import SettingsConfigDict
 from sqlalchemy import URL
 
+from app.api.utils.enums.content_encoding_enum import ContentEncodingEnum
 from app.api.utils.enums.env_enum import EnvEnum
 from app.api.utils.enums.log_level_enum import LogLevelEnum
+from app.api.utils.enums.log_overflow_policy_enum import LogOverflowPolicyEnum
+from app.api.utils.enums.replica_balancing_enum import ReplicaBalancingEnum
+
+
+class AccessLogSettings(BaseModel):
+    sample_rate: float = 1.0  # Доля запросов, которые попадают в access лог
+    # Доля запросов по префиксу пути. Перекрывает sample_rate, побеждает самый длинный
+    route_sample_rates: dict[str, float] = {}
+    log_bodies_on_error_only: bool = False  # Логировать тела только для 4xx/5xx
+    # Запросы дольше порога (сек) логируются всегда, даже если не попали в выборку
+    slow_request_threshold: float | None = None
 
 
 class CommonSettings(BaseModel):
@@ -25,13 +38,63 @@ class CommonSettings(BaseModel):
         '/openapi.json',
         '/docs',
     ]
+    disabled_log_route_names: list[str] = []  # Имена роутов (name=...) без логов
+    disabled_log_route_tags: list[str] = []  # Теги роутов без логов
     logger_body_content_max_size: int = 2500
+    log_queue_size: int = 10000  # Размер очереди фонового синка логов
+    log_batch_size: int = 256  # Сколько записей склеиваем в одну запись в stdout
+    log_overflow_policy: LogOverflowPolicyEnum = LogOverflowPolicyEnum.DROP
+    access_log: AccessLogSettings = AccessLogSettings()
+    # Сколько секунд одинаковые конкурентные чтения ждут общий вызов
+    single_flight_timeout: float = 5.0
     backend_cors_origins: Any = []
 
     prometheus_enabled: bool = True
     struct_log: bool = True
 
 
+class ResponseCacheSettings(BaseModel):
+    enabled: bool = True
+    memory_max_size: int = 1000  # Максимум ответов в памяти процесса (LRU)
+    # TTL (сек) в памяти процесса. Инвалидация не доходит до других воркеров,
+    # поэтому TTL держим коротким
+    memory_ttl: float = 10.0
+    redis_ttl: float = 60.0  # TTL (сек) в Redis, если задан REDIS__URL
+    max_body_size: int = 1024 * 1024  # Ответы больше (байт) не кэшируем
+
+
+class CompressionSettings(BaseModel):
+    enabled: bool = True
+    # Кодировки в порядке предпочтения сервера. br и zstd требуют пакеты brotli и
+    # zstandard
+    encodings: list[ContentEncodingEnum] = [ContentEncodingEnum.GZIP]
+    minimum_size: int = 1024  # Ответы меньше порога (байт) не сжимаем
+    # Сжимаем только эти типы: точное совпадение или префикс, если оканчивается на /
+    content_types: list[str] = [
+        'application/json',
+        'application/x-ndjson',
+        'application/javascript',
+        'text/',
+    ]
+    gzip_level: int = 5  # 1-9
+    brotli_quality: int = 4  # 0-11
+    zstd_level: int = 3  # 1-22
+
+
+class CacheSettings(BaseModel):
+    enabled: bool = True
+    memory_max_size: int = 10000  # Максимум записей в памяти процесса (LRU)
+    # TTL (сек) в памяти процесса. Инвалидация не доходит до других воркеров,
+    # поэтому TTL держим коротким
+    memory_ttl: float = 10.0
+    redis_ttl: float = 300.0  # TTL (сек) в Redis
+
+
+class RedisSettings(BaseModel):
+    # redis://host:6379/0. Если не задан, кэш живет только в памяти процесса
+    url: str | None = None
+
+
 class SwaggerSettings(BaseModel):
     doc_login: str = 'admin'
     doc_password: str = 'admin'
@@ -48,6 +111,9 @@ class AuthSettings(BaseModel):
     csrf_expire_time: int = 31536000  # 365 * 24 * 60 * 60
     csrf_cookie_name: str = 'csrftoken'
     csrf_header_name: str = 'X-CSRFToken'
+    # Секрет подписи CSRF токенов. Если не задан, генерируется на процесс, и
+    # токены разных воркеров друг друга не примут
+    csrf_secret: str | None = None
 
 
 class PostgresSettings(BaseModel):
@@ -59,6 +125,22 @@ class PostgresSettings(BaseModel):
     database_uri: Any | None = None
     pool_size: int = 10  # Размер пула соединений алхимии
     overflow_pool_size: int = 20  # Размер очереди соединений
+    # Реплики для чтения: host или host:port. Пусто - читаем c primary
+    replica_hosts: list[str] = []
+    replica_balancing: ReplicaBalancingEnum = ReplicaBalancingEnum.ROUND_ROBIN
+    # Prepared statements asyncpg, которые держим на соединение. 0 - не кэшируем
+    prepared_statement_cache_size: int = 100
+    # Скомпилированные запросы алхимии, которые держим на движок
+    query_cache_size: int = 500
+    # Работа через pgbouncer в transaction mode
+    pgbouncer: bool = False
+    # Кэш prepared statements через pgbouncer >= 1.21 c max_prepared_statements.
+    # Без флага через pgbouncer кэш выключен
+    pgbouncer_prepared_statements: bool = False
+    # Запросы дольше порога (сек) попадают в лог медленных запросов
+    slow_query_threshold: float | None = 0.5
+    # Сколько раз один запрос может повториться за HTTP запрос до подозрения на N+1
+    n_plus_one_threshold: int | None = 10
 
     @model_validator(mode='before')
     @classmethod
@@ -80,6 +162,41 @@ class PostgresSettings(BaseModel):
 
         return data
 
+    @property
+    def connect_args(self) -> dict[str, Any]:
+        """Аргументы соединения asyncpg.
+
+        Через pgbouncer соединение c PG меняется между транзакциями, поэтому
+        имена prepared statements делаем уникальными, чтобы не столкнуться c
+        чужими, и выключаем внутренний кэш asyncpg. Кэш адаптера
+        (prepared_statement_cache_size) тоже выключаем: он безопасен только c
+        pgbouncer >= 1.21 и включенным max_prepared_statements, что включается
+        явно через pgbouncer_prepared_statements.
+        """
+        prepared_statement_cache_size = self.prepared_statement_cache_size
+        if self.pgbouncer and not self.pgbouncer_prepared_statements:
+            prepared_statement_cache_size = 0
+        connect_args: dict[str, Any] = {
+            'prepared_statement_cache_size': prepared_statement_cache_size,
+        }
+        if self.pgbouncer:
+            connect_args['statement_cache_size'] = 0
+            connect_args['prepared_statement_name_func'] = (
+                lambda: f'__asyncpg_{uuid4()}__'
+            )
+        return connect_args
+
+    @property
+    def replica_database_uris(self) -> list[URL]:
+        """PG-URI реплик: те же креды и БД, что у primary."""
+        uris = []
+        for replica_host in self.replica_hosts:
+            host, _, port = replica_host.partition(':')
+            uris.append(
+                self.database_uri.set(host=host, port=int(port) if port else self.port)
+            )
+        return uris
+
 
 class Settings(BaseSettings):
     def __init__(self, **values: Any) -> None:
@@ -97,6 +214,10 @@ class Settings(BaseSettings):
     swagger: SwaggerSettings = SwaggerSettings()
     auth: AuthSettings = AuthSettings()
     postgres: PostgresSettings = PostgresSettings()
+    redis: RedisSettings = RedisSettings()
+    cache: CacheSettings = CacheSettings()
+    compression: CompressionSettings = CompressionSettings()
+    response_cache: ResponseCacheSettings = ResponseCacheSettings()
 
 
 config = Settings()
@@ -0,0 +1,73 @@
+from typing import TYPE_CHECKING
+from typing import Any
+
+import orjson
+
+from loguru import logger
+
+from app.api.utils.cache.base import CacheStats
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+class RedisCache:
+    """Уровень кэша в Redis, общий для всех воркеров.
+
+    Значения хранятся в JSON, поэтому datetime, UUID и т.п. возвращаются строками.
+    Ошибки Redis не роняют запрос: чтение считается промахом, запись пропускается.
+    """
+
+    name = 'redis'
+
+    def __init__(
+        self,
+        client: 'Redis',
+        *,
+        ttl: float,
+        prefix: str = 'cache:',
+    ) -> None:
+        self.client = client
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Any | None:
+        """Получаем значение по ключу.
+
+        Args:
+            key: str - ключ
+
+        Returns:
+            Any | None - None при промахе или недоступном Redis
+        """
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning('Redis кэш недоступен: {}', e)
+            raw = None
+
+        if raw is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return orjson.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        """Кладем значение c TTL."""
+        try:
+            await self.client.set(
+                self.prefix + key, orjson.dumps(value), px=self.ttl_ms
+            )
+        except Exception as e:
+            logger.warning('Redis кэш недоступен: {}', e)
+
+    async def delete(self, *keys: str) -> None:
+        """Удаляем ключи."""
+        try:
+            await self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            # Запись в БД уже прошла, поэтому запрос не роняем. Протухшее значение
+            # проживет в Redis не дольше ttl
+            logger.error('Не удалось инвалидировать Redis кэш {}: {}', keys, e)
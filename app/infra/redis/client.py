@@ -0,0 +1,21 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+def create_redis_client(url: str) -> 'Redis':
+    """Создаем асинхронный клиент Redis.
+
+    Пакет redis опциональный и нужен, только если задан REDIS__URL
+    (poetry install --extras redis).
+
+    Args:
+        url: str - redis://host:port/db
+
+    Returns:
+        Redis
+    """
+    from redis.asyncio import Redis
+
+    return Redis.from_url(url)
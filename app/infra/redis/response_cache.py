@@ -0,0 +1,158 @@
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+from typing import cast
+
+import orjson
+
+from loguru import logger
+
+from app.api.utils.cache.base import CacheStats
+from app.api.utils.cache.response import CachedResponse
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+# Пишем ответ, только если версии тегов не изменились c чтения перед сборкой
+# ответа. KEYS: ключ ответа, ключи версий тегов, ключи множеств тегов. ARGV:
+# ответ, ttl в мс, ключ запроса, версии тегов на момент чтения
+_SET_SCRIPT = """
+local tags = (#KEYS - 1) / 2
+for i = 1, tags do
+    if (tonumber(redis.call('GET', KEYS[1 + i])) or 0) ~= tonumber(ARGV[3 + i]) then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+for i = 1, tags do
+    redis.call('SADD', KEYS[1 + tags + i], ARGV[3])
+    redis.call('PEXPIRE', KEYS[1 + tags + i], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisResponseCache:
+    """Уровень кэша ответов в Redis, общий для всех воркеров.
+
+    Ответ хранится одной строкой: JSON co статусом и заголовками, перевод строки
+    и тело как есть. Ключи тега лежат в множестве тега, инвалидация удаляет их
+    вместе c множеством и увеличивает версию тега. Версии читаются вместе c
+    ответом и сверяются при записи, поэтому воркер не положит ответ, собранный
+    до инвалидации в другом воркере. Ошибки Redis не роняют запрос: чтение
+    считается промахом, запись пропускается.
+    """
+
+    name = 'redis_response'
+
+    def __init__(
+        self,
+        client: 'Redis',
+        *,
+        ttl: float,
+        prefix: str = 'response:',
+    ) -> None:
+        self.client = client
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+        self.stats = CacheStats()
+        self._set_script = client.register_script(_SET_SCRIPT)
+
+    async def get(
+        self, key: str, tags: Sequence[str]
+    ) -> tuple[CachedResponse | None, tuple[int, ...] | None]:
+        """Получаем ответ по ключу и версии тегов одним MGET.
+
+        Args:
+            key: str - ключ запроса
+            tags: Sequence[str] - теги ручки
+
+        Returns:
+            tuple[CachedResponse | None, tuple[int, ...] | None] - ответ (None при
+            промахе) и версии тегов (None при недоступном Redis)
+        """
+        try:
+            # Клиент создается без decode_responses, поэтому значения в bytes
+            raw, *versions = cast(
+                list[bytes | None],
+                await self.client.mget(
+                    self.prefix + key, *map(self._get_version_key, tags)
+                ),
+            )
+        except Exception as e:
+            logger.warning('Redis кэш ответов недоступен: {}', e)
+            self.stats.misses += 1
+            return None, None
+
+        tag_versions = tuple(int(version or 0) for version in versions)
+        if raw is None:
+            self.stats.misses += 1
+            return None, tag_versions
+
+        self.stats.hits += 1
+        meta, _, body = raw.partition(b'\n')
+        status, headers = orjson.loads(meta)
+        response = CachedResponse(
+            status=status,
+            headers=[
+                (name.encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ],
+            body=body,
+        )
+        return response, tag_versions
+
+    async def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Sequence[str],
+        versions: tuple[int, ...],
+    ) -> None:
+        """Кладем ответ c TTL, если версии тегов не изменились c чтения."""
+        meta = orjson.dumps(
+            [
+                response.status,
+                [
+                    (name.decode('latin-1'), value.decode('latin-1'))
+                    for name, value in response.headers
+                ],
+            ]
+        )
+        try:
+            await self._set_script(
+                keys=[
+                    self.prefix + key,
+                    *map(self._get_version_key, tags),
+                    *map(self._get_tag_key, tags),
+                ],
+                args=[meta + b'\n' + response.body, self.ttl_ms, key, *versions],
+            )
+        except Exception as e:
+            logger.warning('Redis кэш ответов недоступен: {}', e)
+
+    async def invalidate(self, *tags: str) -> None:
+        """Удаляем ответы c тегами и увеличиваем версии тегов."""
+        try:
+            for tag in tags:
+                # Множество читаем и удаляем атомарно, чтобы не потерять ключ,
+                # добавленный между чтением и удалением. Версия без TTL: ее
+                # сброс мог бы совпасть c версией, прочитанной до инвалидации
+                async with self.client.pipeline(transaction=True) as pipe:
+                    pipe.incr(self._get_version_key(tag))
+                    pipe.smembers(self._get_tag_key(tag))
+                    pipe.delete(self._get_tag_key(tag))
+                    _, keys, _ = await pipe.execute()
+                if keys:
+                    await self.client.delete(
+                        *(self.prefix + key.decode() for key in keys)
+                    )
+        except Exception as e:
+            # Запись в БД уже прошла, поэтому запрос не роняем. Протухший ответ
+            # проживет в Redis не дольше ttl
+            logger.error('Не удалось инвалидировать Redis кэш ответов {}: {}', tags, e)
+
+    def _get_tag_key(self, tag: str) -> str:
+        return f'{self.prefix}tag:{tag}'
+
+    def _get_version_key(self, tag: str) -> str:
+        return f'{self.prefix}version:{tag}'
@@ -12,8 +12,17 @@ from app.api.di import DI_CONTAINER
 from app.api.router import ROUTER as FASTAPI_ROUTER
 from app.api.utils.enums.env_enum import EnvEnum
 from app.api.utils.exception_handlers import setup_exception_handlers
+from app.api.utils.loggers import close_logger
 from app.api.utils.loggers import init_logger
+from app.api.utils.middlewares.compression_middleware import CompressionMiddleware
+from app.api.utils.middlewares.response_cache_middleware import ResponseCacheMiddleware
 from app.api.utils.middlewares.router_logging_middleware import RouterLoggingMiddleware
+from app.api.utils.single_flight import register_single_flight_metrics
+from app.api.utils.sqlalchemy.queries import register_query_metrics
+from app.api.utils.swagger.openapi import get_openapi_document
+from app.api.utils.swagger.static import STATIC_DIR
+from app.api.utils.swagger.static import STATIC_URL
+from app.api.utils.swagger.static import SwaggerStaticFiles
 from app.api.utils.swagger.tags_metadata import get_tags_metadata
 from app.config import config
 
@@ -35,11 +44,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
         await init_logger()
 
     await _warmup_dependencies()
+    # Схема собирается и сжимается до первого запроса, a не на нем
+    get_openapi_document(app)
 
     yield
 
     await app.state.dishka_container.close()
 
+    if config.common.struct_log:
+        await close_logger()
+
 
 async def _warmup_dependencies() -> None:
     """Принудительная инициализация критичных зависимостей при старте."""
@@ -62,14 +76,31 @@ def get_fastapi_app(logging_middleware: bool = True) -> FastAPI:
         description='Описание супер крутого микросервиса',
         openapi_tags=get_tags_metadata(),
         version='0.0.1',
+        # /openapi.json отдается готовыми байтами, см. app.api.utils.swagger.docs
+        openapi_url=None,
         docs_url=None,
         redoc_url=None,
         debug=config.common.environment in (EnvEnum.LOCAL, EnvEnum.DEV),
         lifespan=lifespan,
     )
     setup_exception_handlers(fast_api_app)
+    if config.response_cache.enabled:
+        # Самая внутренняя мидла: в кэше несжатый ответ, a попадания видны в
+        # логах и метриках
+        fast_api_app.add_middleware(
+            ResponseCacheMiddleware,
+            routes=fast_api_app.routes,
+        )
     if logging_middleware:
-        fast_api_app.add_middleware(RouterLoggingMiddleware, current_logger=logger)
+        fast_api_app.add_middleware(
+            RouterLoggingMiddleware,
+            current_logger=logger,
+            routes=fast_api_app.routes,
+        )
+    if config.compression.enabled:
+        # Добавленная позже мидла внешняя: логи видят несжатый ответ, a
+        # метрики prometheus - размер, ушедший клиенту
+        fast_api_app.add_middleware(CompressionMiddleware)
 
     # TODO: Раскомментить при необходимости
     # Set all CORS enabled origins
@@ -118,8 +149,17 @@ def get_fastapi_app(logging_middleware: bool = True) -> FastAPI:
             ],  # можно вырубить
         )
         fast_api_app.add_route('/metrics', handle_metrics)
+        register_single_flight_metrics()
+        register_query_metrics()
 
     fast_api_app.include_router(FASTAPI_ROUTER)
+    # Ассеты скачиваются при сборке образа, без них /docs ссылается на CDN
+    if STATIC_DIR.is_dir():
+        fast_api_app.mount(
+            STATIC_URL,
+            SwaggerStaticFiles(directory=STATIC_DIR),
+            name='swagger_static',
+        )
 
     return fast_api_app
 
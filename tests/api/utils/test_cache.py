@@ -0,0 +1,115 @@
+import asyncio
+
+from typing import Any
+
+import pytest
+
+from app.api.utils.cache.memory import MemoryCache
+from app.api.utils.cache.tiered import TieredCache
+from app.infra.redis.cache import RedisCache
+
+
+class FakeRedis:
+    """Минимальная замена redis.asyncio.Redis для get/set/delete."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.fail = False
+
+    async def get(self, key: str) -> bytes | None:
+        if self.fail:
+            raise ConnectionError('redis is down')
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, px: int | None = None) -> None:
+        if self.fail:
+            raise ConnectionError('redis is down')
+        self.data[key] = value
+
+    async def delete(self, *keys: str) -> None:
+        if self.fail:
+            raise ConnectionError('redis is down')
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture(scope='function')
+def redis_client() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture(scope='function')
+def redis_cache(redis_client: FakeRedis) -> RedisCache:
+    return RedisCache(redis_client, ttl=60)  # type: ignore[arg-type]
+
+
+class TestMemoryCache:
+    async def test_hit_and_miss(self):
+        cache = MemoryCache(max_size=10, ttl=60)
+
+        assert await cache.get('key') is None
+        await cache.set('key', {'id': 1})
+        assert await cache.get('key') == {'id': 1}
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    async def test_ttl(self):
+        cache = MemoryCache(max_size=10, ttl=0.01)
+
+        await cache.set('key', 1)
+        await asyncio.sleep(0.02)
+        assert await cache.get('key') is None
+        assert len(cache) == 0
+
+    async def test_lru_eviction(self):
+        cache = MemoryCache(max_size=2, ttl=60)
+
+        await cache.set('a', 1)
+        await cache.set('b', 2)
+        # Читаем a, поэтому вытеснится b
+        await cache.get('a')
+        await cache.set('c', 3)
+
+        assert await cache.get('b') is None
+        assert await cache.get('a') == 1
+        assert await cache.get('c') == 3
+        assert cache.stats.evictions == 1
+
+    async def test_delete(self):
+        cache = MemoryCache(max_size=10, ttl=60)
+
+        await cache.set('a', 1)
+        await cache.delete('a', 'missing')
+        assert await cache.get('a') is None
+
+
+class TestTieredCache:
+    async def test_lower_tier_hit_fills_upper_tier(self, redis_cache: RedisCache):
+        memory = MemoryCache(max_size=10, ttl=60)
+        cache = TieredCache(memory, redis_cache)
+        value: dict[str, Any] = {'id': 1, 'role_name': 'admin'}
+
+        await redis_cache.set('role:1', value)
+        assert await cache.get('role:1') == value
+        assert await memory.get('role:1') == value
+
+    async def test_delete_from_all_tiers(self, redis_cache: RedisCache):
+        memory = MemoryCache(max_size=10, ttl=60)
+        cache = TieredCache(memory, redis_cache)
+
+        await cache.set('role:1', {'id': 1})
+        await cache.delete('role:1')
+
+        assert await memory.get('role:1') is None
+        assert await redis_cache.get('role:1') is None
+        assert await cache.get('role:1') is None
+
+    async def test_redis_failure_is_a_miss(
+        self, redis_client: FakeRedis, redis_cache: RedisCache
+    ):
+        cache = TieredCache(MemoryCache(max_size=10, ttl=60), redis_cache)
+        redis_client.fail = True
+
+        await cache.set('role:1', {'id': 1})
+        await cache.delete('role:1')
+        assert await cache.get('role:1') is None
+        assert redis_cache.stats.misses == 1
@@ -0,0 +1,120 @@
+import gzip
+import sys
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
+
+from app.api.utils.enums.content_encoding_enum import ContentEncodingEnum
+from app.api.utils.middlewares.compression_middleware import CompressionMiddleware
+from app.config import CompressionSettings
+from tests.utils.asgi import asgi_request
+
+ITEMS = [{'id': i, 'user_name': f'user_{i}'} for i in range(200)]
+GZIP_HEADERS = [(b'accept-encoding', b'gzip, deflate')]
+
+
+def _get_app(**kwargs) -> CompressionMiddleware:
+    app = FastAPI()
+
+    @app.get('/items/')
+    async def get_items() -> ORJSONResponse:
+        return ORJSONResponse(ITEMS, headers={'ETag': '"items"'})
+
+    @app.get('/small/')
+    async def get_small() -> ORJSONResponse:
+        return ORJSONResponse({'id': 1})
+
+    @app.get('/image/')
+    async def get_image() -> Response:
+        return Response(b'0' * 4096, media_type='image/png')
+
+    @app.get('/gzipped/')
+    async def get_gzipped() -> Response:
+        return Response(
+            gzip.compress(b'0' * 4096),
+            media_type='application/json',
+            headers={'Content-Encoding': 'gzip'},
+        )
+
+    @app.get('/stream/')
+    async def get_stream() -> StreamingResponse:
+        async def iter_lines():
+            for item in ITEMS:
+                yield f'{item}\n'.encode()
+
+        return StreamingResponse(iter_lines(), media_type='application/x-ndjson')
+
+    return CompressionMiddleware(app, settings=CompressionSettings(**kwargs))
+
+
+def _headers(messages: list[dict]) -> dict[bytes, bytes]:
+    return dict(messages[0]['headers'])
+
+
+def _body(messages: list[dict]) -> bytes:
+    return b''.join(message.get('body', b'') for message in messages[1:])
+
+
+@pytest.mark.asyncio
+class TestCompressionMiddleware:
+    async def test_compresses_json(self):
+        messages = await asgi_request(
+            _get_app(), 'GET', '/items/', headers=GZIP_HEADERS
+        )
+
+        headers = _headers(messages)
+        body = _body(messages)
+        assert headers[b'content-encoding'] == b'gzip'
+        assert headers[b'vary'] == b'Accept-Encoding'
+        assert headers[b'content-length'] == str(len(body)).encode()
+        assert headers[b'etag'] == b'W/"items"'
+        plain = await asgi_request(_get_app(), 'GET', '/items/')
+        assert gzip.decompress(body) == _body(plain)
+        assert len(body) < len(_body(plain)) / 3
+
+    @pytest.mark.parametrize(
+        ('path', 'headers'),
+        [
+            ('/items/', []),
+            ('/items/', [(b'accept-encoding', b'gzip;q=0, br')]),
+            ('/small/', GZIP_HEADERS),
+            ('/image/', GZIP_HEADERS),
+            ('/gzipped/', GZIP_HEADERS),
+        ],
+    )
+    async def test_passthrough(self, path, headers):
+        compressed = await asgi_request(_get_app(), 'GET', path, headers=headers)
+        plain = await asgi_request(_get_app(), 'GET', path)
+
+        assert _headers(compressed) == _headers(plain)
+        assert _body(compressed) == _body(plain)
+
+    async def test_streaming_chunks_are_flushed(self):
+        messages = await asgi_request(
+            _get_app(), 'GET', '/stream/', headers=GZIP_HEADERS
+        )
+
+        assert _headers(messages)[b'content-encoding'] == b'gzip'
+        assert b'content-length' not in _headers(messages)
+        # Каждый кусок уходит клиенту сразу, a не в конце ответа
+        assert len(messages) == len(ITEMS) + 2
+        assert all(message['body'] for message in messages[1:-1])
+        plain = await asgi_request(_get_app(), 'GET', '/stream/')
+        assert gzip.decompress(_body(messages)) == _body(plain)
+
+    async def test_server_preference_wins(self):
+        app = _get_app()
+
+        assert app._negotiate(b'br;q=1.0, gzip;q=0.5') == 'gzip'
+        assert app._negotiate(b'*') == 'gzip'
+        assert app._negotiate(b'identity') is None
+
+    async def test_missing_package_fails_on_start(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'brotli', None)
+
+        with pytest.raises(ImportError):
+            _get_app(encodings=[ContentEncodingEnum.BROTLI])
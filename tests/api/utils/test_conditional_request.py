@@ -0,0 +1,97 @@
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from httpx import AsyncClient
+from starlette.datastructures import Headers
+
+from app.api.utils.conditional_request import EntityValidators
+from app.api.utils.conditional_request import is_conditional_request
+
+LAST_MODIFIED = datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=UTC)
+
+
+class TestEntityValidators:
+    def test_headers(self):
+        validators = EntityValidators.create(1, LAST_MODIFIED)
+
+        assert validators.etag.startswith('W/"1-')
+        assert validators.headers['Last-Modified'] == 'Fri, 02 Jan 2026 03:04:05 GMT'
+        assert EntityValidators.create(
+            1, LAST_MODIFIED + timedelta(microseconds=1)
+        ) != (validators)
+
+    def test_if_none_match(self):
+        validators = EntityValidators.create(1, LAST_MODIFIED)
+        strong_etag = validators.etag.removeprefix('W/')
+
+        for if_none_match in (validators.etag, f'"other", {strong_etag}', '*'):
+            assert validators.is_not_modified(Headers({'if-none-match': if_none_match}))
+        # If-None-Match перекрывает If-Modified-Since
+        assert not validators.is_not_modified(
+            Headers(
+                {
+                    'if-none-match': '"other"',
+                    'if-modified-since': validators.headers['Last-Modified'],
+                }
+            )
+        )
+
+    def test_if_modified_since(self):
+        validators = EntityValidators.create(1, LAST_MODIFIED)
+
+        for if_modified_since, expected in (
+            ('Fri, 02 Jan 2026 03:04:05 GMT', True),
+            ('Fri, 02 Jan 2026 04:00:00 GMT', True),
+            ('Fri, 02 Jan 2026 03:04:04 GMT', False),
+            ('not a date', False),
+        ):
+            headers = Headers({'if-modified-since': if_modified_since})
+            assert validators.is_not_modified(headers) is expected
+
+    def test_is_conditional_request(self):
+        assert not is_conditional_request(Headers({'accept': '*/*'}))
+        assert is_conditional_request(Headers({'if-none-match': '*'}))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestConditionalGet:
+    async def test_user_not_modified_until_update(self, test_client: AsyncClient):
+        role = await test_client.post('/api/v1/roles/', json={'role_name': 'admin'})
+        user = await test_client.post(
+            '/api/v1/users/',
+            json={'user_name': 'user_one', 'role_id': role.json()['id']},
+        )
+        url = f'/api/v1/users/{user.json()["id"]}'
+
+        response = await test_client.get(url)
+        etag = response.headers['etag']
+        not_modified = await test_client.get(url, headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b''
+        assert not_modified.headers['etag'] == etag
+
+        await test_client.patch(url, json={'user_name': 'user_two'})
+        modified = await test_client.get(url, headers={'If-None-Match': etag})
+        assert modified.status_code == 200
+        assert modified.headers['etag'] != etag
+        assert modified.json()['user_name'] == 'user_two'
+
+    async def test_role_if_modified_since(self, test_client: AsyncClient):
+        role = await test_client.post('/api/v1/roles/', json={'role_name': 'admin'})
+        url = f'/api/v1/roles/{role.json()["id"]}'
+
+        response = await test_client.get(url)
+        not_modified = await test_client.get(
+            url, headers={'If-Modified-Since': response.headers['last-modified']}
+        )
+        assert not_modified.status_code == 304
+
+    async def test_missing_entity(self, test_client: AsyncClient):
+        response = await test_client.get(
+            '/api/v1/users/999999', headers={'If-None-Match': '*'}
+        )
+        assert response.status_code == 404
@@ -0,0 +1,138 @@
+import time
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi import Request
+
+from app.api.utils.middlewares.csrf_middleware import CSRFMiddleware
+from tests.utils.asgi import asgi_request
+
+JSON_HEADERS = [(b'content-type', b'application/json')]
+FORM_HEADERS = [(b'content-type', b'application/x-www-form-urlencoded')]
+
+
+def _get_app(**kwargs) -> CSRFMiddleware:
+    app = FastAPI()
+
+    @app.get('/items/')
+    async def get_items(request: Request) -> dict:
+        return {'token': request.scope['csrftoken']}
+
+    @app.post('/items/')
+    async def create_item(request: Request) -> dict:
+        return {'body': (await request.body()).decode()}
+
+    kwargs.setdefault('secret', 'secret')
+    return CSRFMiddleware(app, allowed_hosts=['localhost'], **kwargs)
+
+
+def _status(messages: list[dict]) -> int:
+    return messages[0]['status']
+
+
+def _body(messages: list[dict]) -> bytes:
+    return b''.join(message.get('body', b'') for message in messages[1:])
+
+
+@pytest.mark.asyncio
+class TestCSRFMiddleware:
+    async def test_safe_method_sets_signed_cookie(self):
+        app = _get_app()
+
+        messages = await asgi_request(app, 'GET', '/items/')
+
+        cookie = dict(messages[0]['headers'])[b'set-cookie'].decode()
+        token = cookie.partition('csrftoken=')[2].partition(';')[0]
+        assert app.is_valid_token(token)
+        assert token.encode() in _body(messages)
+
+        # C действующим токеном в куке новый не выдается
+        messages = await asgi_request(
+            app, 'GET', '/items/', headers=[(b'cookie', f'csrftoken={token}'.encode())]
+        )
+        assert b'set-cookie' not in dict(messages[0]['headers'])
+
+    async def test_header_token_needs_no_cookie(self):
+        app = _get_app()
+        token = app.get_new_token()
+
+        messages = await asgi_request(
+            app,
+            'POST',
+            '/items/',
+            body=b'{"name": "item"}',
+            headers=[*JSON_HEADERS, (b'x-csrftoken', token.encode())],
+        )
+
+        assert _status(messages) == 200
+        assert b'{\\"name\\": \\"item\\"}' in _body(messages)
+
+    @pytest.mark.parametrize(
+        'token',
+        [
+            'forged',
+            _get_app().get_new_token(),
+            _get_app(secret='other').get_new_token(),
+            'a.\xb2.sig',
+            f'a.{int(time.time())}.\xe9',
+        ],
+    )
+    async def test_invalid_header_token(self, token):
+        app = _get_app(secret='another')
+
+        messages = await asgi_request(
+            app, 'POST', '/items/', headers=[(b'x-csrftoken', token.encode('latin-1'))]
+        )
+        assert _status(messages) == 403
+
+    async def test_expired_token(self, monkeypatch):
+        app = _get_app(max_age=10)
+        token = app.get_new_token()
+        monkeypatch.setattr(time, 'time', lambda: 10**12)
+
+        messages = await asgi_request(
+            app, 'POST', '/items/', headers=[(b'x-csrftoken', token.encode())]
+        )
+        assert _status(messages) == 403
+
+    async def test_missing_token(self):
+        messages = await asgi_request(_get_app(), 'POST', '/items/', body=b'{}')
+        assert _status(messages) == 403
+
+    async def test_form_token_is_replayed_to_app(self):
+        app = _get_app(allow_form_param=True)
+        token = app.get_new_token()
+        body = f'name=item&csrftoken={token}'.encode()
+
+        messages = await asgi_request(
+            app,
+            'POST',
+            '/items/',
+            body=body,
+            headers=[*FORM_HEADERS, (b'cookie', f'csrftoken={token}'.encode())],
+        )
+        assert _status(messages) == 200
+        assert body in _body(messages)
+
+        messages = await asgi_request(
+            app,
+            'POST',
+            '/items/',
+            body=body,
+            headers=[*FORM_HEADERS, (b'cookie', b'csrftoken=other')],
+        )
+        assert _status(messages) == 403
+
+    async def test_non_ascii_cookie_token(self):
+        app = _get_app(allow_form_param=True)
+        token = app.get_new_token()
+
+        messages = await asgi_request(
+            app,
+            'POST',
+            '/items/',
+            body=f'csrftoken={token}'.encode(),
+            headers=[*FORM_HEADERS, (b'cookie', b'csrftoken=\xe9')],
+        )
+        assert _status(messages) == 403
@@ -0,0 +1,67 @@
+import io
+import threading
+
+import orjson
+import pytest
+
+from loguru import logger
+
+from app.api.utils.enums.log_overflow_policy_enum import LogOverflowPolicyEnum
+from app.api.utils.loggers import BatchedLogSink
+
+
+class SlowStream(io.StringIO):
+    """Stream, запись в который висит, пока не откроют gate."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+        self.writes = 0
+
+    def write(self, data: str) -> int:
+        self.gate.wait()
+        self.writes += 1
+        return super().write(data)
+
+
+@pytest.fixture(scope='function')
+def stream() -> SlowStream:
+    return SlowStream()
+
+
+def _add_sink(sink: BatchedLogSink) -> int:
+    return logger.add(sink, format='{message}', level='INFO')
+
+
+class TestBatchedLogSink:
+    def test_records_are_batched_and_flushed_on_stop(self, stream: SlowStream):
+        sink = BatchedLogSink(stream, batch_size=100)
+        handler_id = _add_sink(sink)
+
+        for i in range(50):
+            logger.bind(i=i).info('message')
+        stream.gate.set()
+        logger.remove(handler_id)
+
+        lines = stream.getvalue().splitlines()
+        assert [orjson.loads(line)['additional_data']['i'] for line in lines] == list(
+            range(50)
+        )
+        assert stream.writes < 50
+        assert sink.written == 50
+        assert sink.dropped == 0
+
+    def test_drop_policy(self, stream: SlowStream):
+        sink = BatchedLogSink(
+            stream, max_queue_size=5, overflow_policy=LogOverflowPolicyEnum.DROP
+        )
+        handler_id = _add_sink(sink)
+
+        for _ in range(50):
+            logger.info('message')
+        assert sink.dropped > 0
+        assert sink.queued <= 5
+
+        stream.gate.set()
+        logger.remove(handler_id)
+        assert sink.written + sink.dropped == 50
@@ -0,0 +1,84 @@
+import gzip
+
+import pytest
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+
+from app.api.utils.swagger import static
+from app.api.utils.swagger.openapi import OpenAPIDocument
+from app.api.utils.swagger.openapi import get_openapi_document
+from app.api.utils.swagger.static import ASSETS
+from app.api.utils.swagger.static import STATIC_URL
+from app.api.utils.swagger.static import SwaggerStaticFiles
+from app.api.utils.swagger.static import get_asset_url
+
+BODY = b'{"openapi":"3.1.0"}'
+
+
+class TestOpenAPIDocument:
+    def test_plain_response(self):
+        document = OpenAPIDocument.from_bytes(BODY)
+
+        response = document.get_response(Headers())
+
+        assert response.body == BODY
+        assert response.headers['etag'] == document.etag
+        assert response.headers['vary'] == 'Accept-Encoding'
+        assert 'content-encoding' not in response.headers
+
+    @pytest.mark.parametrize('accept_encoding', ['gzip, br', 'br;q=1, *;q=0.5'])
+    def test_gzip_response(self, accept_encoding: str):
+        document = OpenAPIDocument.from_bytes(BODY)
+
+        response = document.get_response(Headers({'accept-encoding': accept_encoding}))
+
+        assert response.headers['content-encoding'] == 'gzip'
+        assert gzip.decompress(response.body) == BODY
+
+    @pytest.mark.parametrize('accept_encoding', ['gzip;q=0', 'br', 'gzip;q=0, *'])
+    def test_gzip_not_accepted(self, accept_encoding: str):
+        document = OpenAPIDocument.from_bytes(BODY)
+
+        response = document.get_response(Headers({'accept-encoding': accept_encoding}))
+
+        assert response.body == BODY
+        assert 'content-encoding' not in response.headers
+
+    def test_not_modified(self):
+        document = OpenAPIDocument.from_bytes(BODY)
+
+        for if_none_match in (document.etag, f'"other", W/{document.etag}', '*'):
+            response = document.get_response(Headers({'if-none-match': if_none_match}))
+            assert response.status_code == 304
+            assert response.body == b''
+
+        response = document.get_response(Headers({'if-none-match': '"other"'}))
+        assert response.status_code == 200
+
+    def test_etag_is_stable(self):
+        assert OpenAPIDocument.from_bytes(BODY) == OpenAPIDocument.from_bytes(BODY)
+
+    def test_built_once_per_app(self):
+        app = FastAPI(openapi_url=None)
+
+        assert get_openapi_document(app) is get_openapi_document(app)
+
+
+class TestSwaggerStatic:
+    def test_asset_url_falls_back_to_cdn(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(static, 'STATIC_DIR', tmp_path)
+        assert get_asset_url('swagger-ui.css') == ASSETS['swagger-ui.css']
+
+        (tmp_path / 'swagger-ui.css').write_text('')
+        assert get_asset_url('swagger-ui.css').startswith(
+            f'{STATIC_URL}/swagger-ui.css?v='
+        )
+
+    def test_only_known_assets_are_served(self, tmp_path):
+        (tmp_path / 'swagger-ui.css').write_text('')
+        (tmp_path / 'secret.txt').write_text('')
+        files = SwaggerStaticFiles(directory=tmp_path)
+
+        assert files.lookup_path('swagger-ui.css')[1] is not None
+        assert files.lookup_path('secret.txt')[1] is None
@@ -0,0 +1,56 @@
+import pytest
+
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.api.utils.sqlalchemy.pool import InstrumentedAsyncQueuePool
+from app.api.utils.sqlalchemy.pool import track_connection_wait
+
+
+class FakeConnection:
+    """DBAPI соединение, которому нечего делать."""
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _get_pool(**kwargs) -> InstrumentedAsyncQueuePool:
+    return InstrumentedAsyncQueuePool(FakeConnection, **kwargs)
+
+
+class TestInstrumentedAsyncQueuePool:
+    async def test_checkout_and_checkin_are_counted(self):
+        pool = _get_pool(pool_size=1, max_overflow=1)
+
+        with track_connection_wait() as wait:
+            first = await greenlet_spawn(pool.connect)
+            second = await greenlet_spawn(pool.connect)
+        await greenlet_spawn(first.close)
+        await greenlet_spawn(second.close)
+
+        assert (pool.stats.checkouts, pool.stats.checkins) == (2, 2)
+        assert pool.stats.overflows == 1
+        assert sum(pool.stats.wait_buckets) == 2
+        assert wait.checkouts == 2
+        assert wait.seconds == pytest.approx(pool.stats.wait_sum)
+
+    async def test_timeout_is_counted(self):
+        pool = _get_pool(pool_size=1, max_overflow=0, timeout=0.01)
+        connection = await greenlet_spawn(pool.connect)
+
+        with pytest.raises(exc.TimeoutError):
+            await greenlet_spawn(pool.connect)
+        await greenlet_spawn(connection.close)
+
+        assert pool.stats.timeouts == 1
+        assert pool.stats.wait_sum >= 0.01
+
+    async def test_recreate_keeps_stats(self):
+        pool = _get_pool(pool_size=1)
+        connection = await greenlet_spawn(pool.connect)
+        await greenlet_spawn(connection.close)
+
+        assert pool.recreate().stats is pool.stats
@@ -0,0 +1,70 @@
+import pytest
+
+from loguru import logger
+
+from app.api.utils.sqlalchemy.queries import QueryStats
+from app.api.utils.sqlalchemy.queries import finish_request_queries
+from app.api.utils.sqlalchemy.queries import normalize_sql
+from app.config import config
+
+
+@pytest.fixture
+def messages():
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record))
+    yield records
+    logger.remove(handler_id)
+
+
+class TestNormalizeSql:
+    @pytest.mark.parametrize(
+        ('statement', 'expected'),
+        [
+            (
+                'SELECT id\n  FROM users\n WHERE id = $1',
+                'SELECT id FROM users WHERE id = ?',
+            ),
+            (
+                'DELETE FROM users WHERE id IN ($1, $2, $3)',
+                'DELETE FROM users WHERE id IN (?)',
+            ),
+            (
+                'INSERT INTO users (name) VALUES ($1), ($2), ($3)',
+                'INSERT INTO users (name) VALUES (?), ...',
+            ),
+        ],
+    )
+    def test_normalize(self, statement, expected):
+        assert normalize_sql(statement) == expected
+
+    def test_same_shape_for_different_param_count(self):
+        assert normalize_sql('SELECT * FROM t WHERE id IN ($1, $2)') == normalize_sql(
+            'SELECT * FROM t WHERE id IN ($1, $2, $3, $4)'
+        )
+
+
+class TestFinishRequestQueries:
+    def test_repeated_shape_is_reported(self, messages, monkeypatch):
+        monkeypatch.setattr(config.postgres, 'n_plus_one_threshold', 3)
+        stats = QueryStats()
+        for _ in range(3):
+            stats.shapes['SELECT * FROM roles WHERE id = ?'] += 1
+            stats.count += 1
+        stats.shapes['SELECT * FROM users'] += 1
+        stats.count += 1
+
+        finish_request_queries(stats, '/users/')
+
+        assert [record['message'] for record in messages] == ['Possible N+1 log']
+        assert messages[0]['extra']['queries'] == {
+            'SELECT * FROM roles WHERE id = ?': 3
+        }
+
+    def test_distinct_queries_are_not_reported(self, messages, monkeypatch):
+        monkeypatch.setattr(config.postgres, 'n_plus_one_threshold', 3)
+        stats = QueryStats(count=3)
+        stats.shapes.update(['SELECT 1', 'SELECT 2', 'SELECT 3'])
+
+        finish_request_queries(stats, '/users/')
+
+        assert messages == []
@@ -0,0 +1,59 @@
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.utils.enums.replica_balancing_enum import ReplicaBalancingEnum
+from app.api.utils.sqlalchemy.replicas import ReplicaRouter
+from app.config import PostgresSettings
+
+
+@pytest.fixture
+def engines() -> list[AsyncEngine]:
+    return [
+        create_async_engine(f'postgresql+asyncpg://postgres@replica-{i}/db')
+        for i in range(3)
+    ]
+
+
+class TestReplicaRouter:
+    def test_single_engine(self, engines):
+        router = ReplicaRouter(engines[:1])
+
+        assert {router.get_engine() for _ in range(5)} == {engines[0]}
+
+    def test_round_robin(self, engines):
+        router = ReplicaRouter(engines)
+
+        assert [router.get_engine() for _ in range(6)] == engines * 2
+
+    def test_least_latency_prefers_fastest_and_probes(self, engines):
+        router = ReplicaRouter(
+            engines, ReplicaBalancingEnum.LEAST_LATENCY, probe_every=5
+        )
+        router.latencies = [0.3, 0.1, 0.2]
+
+        picked = [router.get_engine() for _ in range(10)]
+
+        # Каждый 5-й выбор идет по очереди, остальные - в самую быструю реплику
+        assert picked[0] is engines[0]
+        assert picked[5] is engines[2]
+        assert all(picked[i] is engines[1] for i in range(10) if i % 5)
+
+
+class TestReplicaSettings:
+    def test_replica_database_uris(self):
+        settings = PostgresSettings(
+            user='postgres',
+            password='example',
+            host='primary',
+            port=5432,
+            db='db',
+            replica_hosts=['replica-1', 'replica-2:6432'],
+        )
+
+        assert [(uri.host, uri.port) for uri in settings.replica_database_uris] == [
+            ('replica-1', 5432),
+            ('replica-2', 6432),
+        ]
+        assert settings.replica_database_uris[0].database == 'db'
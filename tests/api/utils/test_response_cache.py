@@ -0,0 +1,326 @@
+import asyncio
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi import Header
+from fastapi.responses import ORJSONResponse
+
+from app.api.utils.cache.memory import MemoryCache
+from app.api.utils.cache.response import CachedResponse
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.cache.response import cache_response
+from app.api.utils.middlewares.response_cache_middleware import ResponseCacheMiddleware
+from app.infra.redis.response_cache import RedisResponseCache
+from tests.utils.asgi import asgi_request
+
+ETAG = 'W/"1-abc"'
+LAST_MODIFIED = 'Sat, 17 Oct 2026 10:00:00 GMT'
+
+
+class Handlers:
+    """Ручки тестового приложения co счетчиком вызовов."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.status_code = 200
+
+
+def _get_app(
+    cache: ResponseCache, handlers: Handlers, max_body_size: int = 1024
+) -> ResponseCacheMiddleware:
+    app = FastAPI()
+
+    @app.get('/roles/')
+    @cache_response('roles')
+    async def get_roles(limit: int = 10) -> ORJSONResponse:
+        handlers.calls += 1
+        return ORJSONResponse(
+            {'calls': handlers.calls, 'limit': limit},
+            status_code=handlers.status_code,
+            headers={'ETag': ETAG, 'Last-Modified': LAST_MODIFIED},
+        )
+
+    @app.post('/roles/')
+    async def create_role() -> ORJSONResponse:
+        handlers.calls += 1
+        return ORJSONResponse({'calls': handlers.calls})
+
+    @app.get('/roles/export')
+    async def export_roles() -> ORJSONResponse:
+        handlers.calls += 1
+        return ORJSONResponse({'calls': handlers.calls})
+
+    @app.get('/roles/{role_id}')
+    @cache_response('roles', vary=['Accept-Language'])
+    async def get_role(
+        role_id: int, accept_language: str = Header('ru')
+    ) -> ORJSONResponse:
+        handlers.calls += 1
+        return ORJSONResponse(
+            {'id': role_id, 'language': accept_language, 'calls': handlers.calls}
+        )
+
+    @app.get('/big/')
+    @cache_response('big')
+    async def get_big() -> ORJSONResponse:
+        handlers.calls += 1
+        return ORJSONResponse({'data': 'x' * 512})
+
+    return ResponseCacheMiddleware(
+        app, routes=app.routes, cache=cache, max_body_size=max_body_size
+    )
+
+
+def _status(messages: list[dict]) -> int:
+    return messages[0]['status']
+
+
+def _body(messages: list[dict]) -> bytes:
+    return b''.join(message.get('body', b'') for message in messages[1:])
+
+
+@pytest.fixture(scope='function')
+def response_cache() -> ResponseCache:
+    return ResponseCache(MemoryCache(max_size=100, ttl=60))
+
+
+@pytest.fixture(scope='function')
+def handlers() -> Handlers:
+    return Handlers()
+
+
+@pytest.mark.asyncio
+class TestResponseCacheMiddleware:
+    async def test_hit_skips_endpoint(
+        self, response_cache: ResponseCache, handlers: Handlers
+    ):
+        app = _get_app(response_cache, handlers)
+
+        first = await asgi_request(app, 'GET', '/roles/?limit=5')
+        second = await asgi_request(app, 'GET', '/roles/?limit=5')
+
+        assert handlers.calls == 1
+        assert _body(first) == _body(second) == b'{"calls":1,"limit":5}'
+        assert first[0]['headers'] == second[0]['headers']
+        await asgi_request(app, 'GET', '/roles/?limit=6')
+        assert handlers.calls == 2
+
+    async def test_invalidation_by_tag(
+        self, response_cache: ResponseCache, handlers: Handlers
+    ):
+        app = _get_app(response_cache, handlers)
+
+        await asgi_request(app, 'GET', '/roles/')
+        await asgi_request(app, 'GET', '/roles/1')
+        await asgi_request(app, 'GET', '/big/')
+        await response_cache.invalidate('roles')
+        await asgi_request(app, 'GET', '/roles/')
+        await asgi_request(app, 'GET', '/roles/1')
+        await asgi_request(app, 'GET', '/big/')
+
+        assert handlers.calls == 5
+
+    async def test_vary_header_is_part_of_key(
+        self, response_cache: ResponseCache, handlers: Handlers
+    ):
+        app = _get_app(response_cache, handlers)
+        english = [(b'accept-language', b'en')]
+
+        await asgi_request(app, 'GET', '/roles/1')
+        response = await asgi_request(app, 'GET', '/roles/1', headers=english)
+        await asgi_request(app, 'GET', '/roles/1', headers=english)
+
+        assert handlers.calls == 2
+        assert b'"language":"en"' in _body(response)
+
+    async def test_not_modified_from_cache(
+        self, response_cache: ResponseCache, handlers: Handlers
+    ):
+        app = _get_app(response_cache, handlers)
+
+        await asgi_request(app, 'GET', '/roles/')
+        by_etag = await asgi_request(
+            app, 'GET', '/roles/', headers=[(b'if-none-match', ETAG.encode())]
+        )
+        by_date = await asgi_request(
+            app,
+            'GET',
+            '/roles/',
+            headers=[(b'if-modified-since', LAST_MODIFIED.encode())],
+        )
+        stale = await asgi_request(
+            app, 'GET', '/roles/', headers=[(b'if-none-match', b'W/"1-old"')]
+        )
+
+        assert handlers.calls == 1
+        assert _status(by_etag) == _status(by_date) == 304
+        assert _body(by_etag) == b''
+        assert dict(by_etag[0]['headers'])[b'etag'] == ETAG.encode()
+        assert _status(stale) == 200
+
+    @pytest.mark.parametrize(
+        ('path', 'method'),
+        [('/roles/', 'POST'), ('/roles/export', 'GET'), ('/big/', 'GET')],
+    )
+    async def test_not_cached(
+        self, response_cache: ResponseCache, handlers: Handlers, path, method
+    ):
+        app = _get_app(response_cache, handlers, max_body_size=256)
+
+        await asgi_request(app, method, path)
+        await asgi_request(app, method, path)
+
+        assert handlers.calls == 2
+
+    async def test_error_response_not_cached(
+        self, response_cache: ResponseCache, handlers: Handlers
+    ):
+        app = _get_app(response_cache, handlers)
+        handlers.status_code = 503
+
+        await asgi_request(app, 'GET', '/roles/')
+        handlers.status_code = 200
+        response = await asgi_request(app, 'GET', '/roles/')
+        await asgi_request(app, 'GET', '/roles/')
+
+        assert _status(response) == 200
+        assert handlers.calls == 2
+
+    async def test_response_built_before_invalidation_not_stored(
+        self, response_cache: ResponseCache, handlers: Handlers
+    ):
+        app = _get_app(response_cache, handlers)
+        write_done = asyncio.Event()
+        original_send = app.app
+
+        async def slow_app(scope, receive, send):
+            # Ответ собран из старых данных, запись успевает сбросить теги
+            await write_done.wait()
+            await original_send(scope, receive, send)
+
+        app.app = slow_app
+        read = asyncio.create_task(asgi_request(app, 'GET', '/roles/'))
+        await asyncio.sleep(0)
+        await response_cache.invalidate('roles')
+        write_done.set()
+        await read
+        app.app = original_send
+        await asgi_request(app, 'GET', '/roles/')
+
+        assert handlers.calls == 2
+
+
+class FakeRedis:
+    """Минимальная замена redis.asyncio.Redis для кэша ответов."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.sets: dict[str, set[bytes]] = {}
+
+    async def mget(self, *keys: str) -> list[bytes | None]:
+        return [self.data.get(key) for key in keys]
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+            self.sets.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> 'FakePipeline':
+        return FakePipeline(self)
+
+    def register_script(self, script: str) -> 'FakeSetScript':
+        return FakeSetScript(self)
+
+
+class FakeSetScript:
+    """Повторяет скрипт записи ответа co сверкой версий тегов."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+
+    async def __call__(self, keys: list[str], args: list) -> int:
+        tags = (len(keys) - 1) // 2
+        version_keys, tag_keys = keys[1 : 1 + tags], keys[1 + tags :]
+        for version_key, version in zip(version_keys, args[3:], strict=True):
+            if int(self.redis.data.get(version_key, 0)) != version:
+                return 0
+        self.redis.data[keys[0]] = args[0]
+        for tag_key in tag_keys:
+            self.redis.sets.setdefault(tag_key, set()).add(args[2].encode())
+        return 1
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.commands: list = []
+
+    async def __aenter__(self) -> 'FakePipeline':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    def incr(self, key: str) -> None:
+        def incr() -> int:
+            value = int(self.redis.data.get(key, 0)) + 1
+            self.redis.data[key] = str(value).encode()
+            return value
+
+        self.commands.append(incr)
+
+    def smembers(self, key: str) -> None:
+        self.commands.append(lambda: set(self.redis.sets.get(key, ())))
+
+    def delete(self, key: str) -> None:
+        self.commands.append(lambda: self.redis.sets.pop(key, None))
+
+    async def execute(self) -> list:
+        return [command() for command in self.commands]
+
+
+RESPONSE = CachedResponse(
+    status=200,
+    headers=[(b'content-type', b'application/json')],
+    body=b'{"id":1}\n{"id":2}',
+)
+
+
+@pytest.mark.asyncio
+class TestRedisResponseCache:
+    async def test_shared_tier_fills_memory_and_invalidates_by_tag(self):
+        redis = FakeRedis()
+        shared = RedisResponseCache(redis, ttl=60)
+        writer = ResponseCache(MemoryCache(max_size=10, ttl=60), shared)
+        # Другой воркер: своя память, общий Redis
+        reader = ResponseCache(MemoryCache(max_size=10, ttl=60), shared)
+
+        await writer.set(await writer.get('/roles/', ['roles']), RESPONSE)
+        lookup = await reader.get('/roles/', ['roles'])
+        assert lookup.response == RESPONSE
+        assert await reader.memory.get(lookup.memory_key) == RESPONSE
+
+        await writer.invalidate('roles')
+        assert 'response:/roles/' not in redis.data
+        assert (await writer.get('/roles/', ['roles'])).response is None
+
+    async def test_response_built_before_other_worker_invalidation_not_stored(
+        self,
+    ):
+        redis = FakeRedis()
+        shared = RedisResponseCache(redis, ttl=60)
+        reader = ResponseCache(MemoryCache(max_size=10, ttl=60), shared)
+        writer = ResponseCache(MemoryCache(max_size=10, ttl=60), shared)
+
+        # Читающий воркер промахнулся и собирает ответ из старых данных, в это
+        # время другой воркер записывает и сбрасывает теги
+        lookup = await reader.get('/roles/', ['roles'])
+        await writer.invalidate('roles')
+        await reader.set(lookup, RESPONSE)
+
+        assert 'response:/roles/' not in redis.data
+        assert (await writer.get('/roles/', ['roles'])).response is None
+        # Ответ, собранный после инвалидации, кладется
+        await writer.set(await writer.get('/roles/', ['roles']), RESPONSE)
+        assert redis.data['response:/roles/'].endswith(RESPONSE.body)
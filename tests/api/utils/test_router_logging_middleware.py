@@ -0,0 +1,185 @@
+import asyncio
+
+from collections.abc import Generator
+
+import orjson
+import pytest
+
+from fastapi import FastAPI
+from fastapi import Request
+from loguru import logger
+
+from app.api.utils.middlewares.router_logging_middleware import RouterLoggingMiddleware
+from app.config import AccessLogSettings
+from app.config import config
+from tests.utils.asgi import asgi_request
+
+JSON_HEADERS = [(b'content-type', b'application/json')]
+
+
+def _get_app(settings: AccessLogSettings | None = None) -> FastAPI:
+    app = FastAPI()
+
+    @app.post('/items/')
+    async def create_item(request: Request) -> dict:
+        return {'id': 1, **(await request.json())}
+
+    @app.get('/health/')
+    async def health() -> dict:
+        return {}
+
+    @app.get('/metrics-like/{item_id}', name='metrics', tags=['internal'])
+    async def metrics(item_id: int) -> dict:
+        return {}
+
+    @app.get('/error/')
+    async def error() -> dict:
+        raise RuntimeError('boom')
+
+    @app.get('/slow/')
+    async def slow() -> dict:
+        await asyncio.sleep(0.05)
+        return {}
+
+    app.add_middleware(
+        RouterLoggingMiddleware,
+        current_logger=logger,
+        settings=settings or AccessLogSettings(),
+        routes=app.routes,
+    )
+    return app
+
+
+@pytest.fixture(scope='function')
+def app() -> FastAPI:
+    return _get_app()
+
+
+@pytest.fixture(scope='function')
+def records() -> Generator[list[dict]]:
+    records: list[dict] = []
+    handler_id = logger.add(lambda message: records.append(dict(message.record)))
+    yield records
+    logger.remove(handler_id)
+
+
+@pytest.mark.asyncio
+class TestRouterLoggingMiddleware:
+    async def test_access_log(self, app: FastAPI, records: list[dict]):
+        sent = await asgi_request(
+            app,
+            'POST',
+            '/items/?q=1',
+            body=b'{"name": "item", "password": "secret"}',
+            headers=[*JSON_HEADERS, (b'authorization', b'Basic 123')],
+        )
+
+        headers = dict(sent[0]['headers'])
+        assert sent[0]['status'] == 200
+        assert b'x-api-request-id' in headers
+
+        [record] = records
+        request, response = record['extra']['request'], record['extra']['response']
+        assert record['message'] == 'Access log'
+        assert record['extra']['x_request_id'] == headers[b'x-api-request-id'].decode()
+        assert request['method'] == 'POST'
+        assert request['path'] == '/items/?q=1'
+        assert request['ip'] == '127.0.0.1'
+        assert request['headers']['authorization'] == '********'
+        assert request['body'] == {'name': 'item', 'password': '********'}
+        assert response['status_code'] == 200
+        assert response['body'] == {'id': 1, 'name': 'item', 'password': 'secret'}
+        assert response['time_taken'].endswith('s')
+
+    async def test_big_body_is_not_logged(
+        self, app: FastAPI, records: list[dict], monkeypatch
+    ):
+        size = config.common.logger_body_content_max_size
+        body = orjson.dumps({'name': 'x' * size})
+
+        sent = await asgi_request(
+            app, 'POST', '/items/', body=body, headers=JSON_HEADERS
+        )
+
+        assert orjson.loads(sent[1]['body'])['name'] == 'x' * size
+        [record] = records
+        assert 'Слишком большое тело' in record['extra']['request']['body']['detail']
+        assert 'Слишком большое тело' in record['extra']['response']['body']['detail']
+
+    async def test_disabled_endpoint(self, app: FastAPI, records: list[dict]):
+        sent = await asgi_request(app, 'GET', '/health/')
+
+        assert sent[0]['status'] == 200
+        assert b'x-api-request-id' not in dict(sent[0]['headers'])
+        assert records == []
+
+    async def test_disabled_route_tag(self, records: list[dict], monkeypatch):
+        monkeypatch.setattr(config.common, 'disabled_log_route_tags', ['internal'])
+        app = _get_app()
+
+        sent = await asgi_request(app, 'GET', '/metrics-like/1')
+
+        assert sent[0]['status'] == 200
+        assert records == []
+
+    async def test_error_log(self, app: FastAPI, records: list[dict]):
+        sent = await asgi_request(app, 'GET', '/error/')
+
+        assert sent[0]['status'] == 500
+        assert records[-1]['message'] == 'Error log'
+        assert records[-1]['extra']['response']['status_code'] == 500
+
+
+@pytest.mark.asyncio
+class TestRouterLoggingMiddlewareSampling:
+    async def test_not_sampled_request_is_skipped(self, records: list[dict]):
+        app = _get_app(AccessLogSettings(sample_rate=0))
+
+        sent = await asgi_request(
+            app, 'POST', '/items/', body=b'{"name": "item"}', headers=JSON_HEADERS
+        )
+
+        assert sent[0]['status'] == 200
+        assert b'x-api-request-id' in dict(sent[0]['headers'])
+        assert records == []
+
+    async def test_route_sample_rate(self, records: list[dict]):
+        app = _get_app(
+            AccessLogSettings(sample_rate=0, route_sample_rates={'/items': 1})
+        )
+
+        await asgi_request(
+            app, 'POST', '/items/', body=b'{"name": "item"}', headers=JSON_HEADERS
+        )
+        await asgi_request(app, 'GET', '/slow/')
+
+        assert [record['extra']['request']['path'] for record in records] == ['/items/']
+
+    async def test_errors_and_slow_requests_are_always_logged(
+        self, records: list[dict]
+    ):
+        app = _get_app(AccessLogSettings(sample_rate=0, slow_request_threshold=0.01))
+
+        await asgi_request(app, 'GET', '/error/')
+        await asgi_request(app, 'GET', '/slow/')
+
+        assert [record['message'] for record in records] == [
+            'Error log',
+            'Slow request log',
+        ]
+        assert 'body' not in records[1]['extra']['response']
+
+    async def test_bodies_only_on_error(self, records: list[dict]):
+        app = _get_app(AccessLogSettings(log_bodies_on_error_only=True))
+
+        await asgi_request(
+            app, 'POST', '/items/', body=b'{"name": "item"}', headers=JSON_HEADERS
+        )
+        await asgi_request(
+            app, 'POST', '/items/', body=b'not json', headers=JSON_HEADERS
+        )
+
+        assert 'body' not in records[0]['extra']['request']
+        assert 'body' not in records[0]['extra']['response']
+        assert records[1]['extra']['response']['status_code'] == 500
+        assert records[1]['extra']['request']['body'] == 'not json'
@@ -0,0 +1,64 @@
+from datetime import UTC
+from datetime import datetime
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import Field
+
+from app.api.utils.row_response import RowPageResponse
+from app.api.utils.row_response import get_row_encoder
+from app.api.utils.sqlalchemy.pagination import CursorPage
+from app.api.v1.schemas.base_schema import BaseSchema
+from app.api.v1.schemas.base_schema import CursorPageSchema
+from app.api.v1.schemas.user_schema import UserSchema
+from app.api.v1.schemas.user_schema import UserWithRoleSchema
+
+
+class PriceSchema(BaseSchema):
+    id: int
+    price: Decimal = Field(serialization_alias='amount')
+
+
+class TestRowEncoder:
+    def test_matches_pydantic_output(self):
+        created_at = datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=UTC)
+        # Строка c лишней колонкой ключа сортировки в конце
+        rows = [
+            (1, created_at, None, 'user_one', 'extra'),
+            (2, created_at, created_at, 'user_two', 'extra'),
+        ]
+        page = CursorPage(items=rows, next_cursor='cursor')
+
+        expected = CursorPageSchema[UserSchema](
+            items=[
+                UserSchema(
+                    id=row[0], created_at=row[1], updated_at=row[2], user_name=row[3]
+                )
+                for row in rows
+            ],
+            next_cursor='cursor',
+        )
+        assert get_row_encoder(UserSchema).encode_page(page) == orjson.dumps(
+            jsonable_encoder(expected)
+        )
+
+    def test_columns_follow_schema_fields(self):
+        encoder = get_row_encoder(PriceSchema)
+
+        assert encoder.columns == ('id', 'price')
+        assert orjson.loads(
+            encoder.encode_page(CursorPage(items=[(1, Decimal('9.99'))]))
+        ) == {'items': [{'id': 1, 'amount': '9.99'}], 'next_cursor': None}
+
+    def test_nested_schema_is_rejected(self):
+        with pytest.raises(ValueError):
+            get_row_encoder(UserWithRoleSchema)
+
+    def test_response(self):
+        response = RowPageResponse(CursorPage(items=[(1, Decimal('1'))]), PriceSchema)
+
+        assert response.media_type == 'application/json'
+        assert orjson.loads(response.body)['items'] == [{'id': 1, 'amount': '1'}]
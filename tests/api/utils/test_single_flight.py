@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from pydantic import BaseModel
+
+from app.api.utils.single_flight import SingleFlight
+from app.api.utils.usecase import SingleFlightMixin
+from app.api.utils.usecase import Usecase
+
+
+class Counter:
+    """Медленный вызов, считающий, сколько раз его реально выполнили."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.calls
+
+
+class GetByIdSchema(BaseModel):
+    id: int
+
+
+class GetByIdUsecase(SingleFlightMixin, Usecase[GetByIdSchema, int]):
+    calls = 0
+
+    async def __call__(self, data: GetByIdSchema) -> int:
+        """Get by id."""
+        type(self).calls += 1
+        await asyncio.sleep(0.01)
+        return data.id
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_are_coalesced(self):
+        group = SingleFlight('test_coalesce', timeout=1)
+        func = Counter()
+
+        results = await asyncio.gather(*(group.do('key', func) for _ in range(100)))
+
+        assert results == [1] * 100
+        assert func.calls == 1
+        assert (group.calls, group.coalesced) == (100, 99)
+
+    async def test_exception_is_shared(self):
+        group = SingleFlight('test_exception', timeout=1)
+
+        async def fail() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+
+        results = await asyncio.gather(
+            *(group.do('key', fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        # Каждый ожидающий получает свой экземпляр c собственным traceback
+        assert len({id(result) for result in results}) == 3
+
+    async def test_timeout_falls_back_to_own_call(self):
+        group = SingleFlight('test_timeout', timeout=0.01)
+        slow = Counter(delay=0.1)
+        fast = Counter(delay=0)
+
+        leader = asyncio.create_task(group.do('key', slow))
+        await asyncio.sleep(0)
+        assert await group.do('key', fast) == 1
+        assert group.timeouts == 1
+        await leader
+
+    async def test_leader_cancel_does_not_cancel_followers(self):
+        group = SingleFlight('test_cancel', timeout=1)
+        func = Counter()
+
+        leader = asyncio.create_task(group.do('key', func))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(group.do('key', func))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == 2
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+
+class InheritedGetByIdUsecase(GetByIdUsecase):
+    pass
+
+
+class TestSingleFlightMixin:
+    async def test_same_dto_is_coalesced(self):
+        results = await asyncio.gather(
+            *(GetByIdUsecase()(data=GetByIdSchema(id=i % 2)) for i in range(10))
+        )
+
+        assert results == [i % 2 for i in range(10)]
+        assert GetByIdUsecase.calls == 2
+
+    async def test_inherited_call_is_wrapped_once(self):
+        calls = 0
+        group = InheritedGetByIdUsecase._single_flight
+        original_do = group.do
+
+        async def do(key, func):
+            nonlocal calls
+            calls += 1
+            return await original_do(key, func)
+
+        group.do = do  # type: ignore[method-assign]
+        assert await InheritedGetByIdUsecase()(data=GetByIdSchema(id=1)) == 1
+        assert calls == 1
@@ -0,0 +1,119 @@
+from dataclasses import asdict
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy
+
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.util import LRUCache
+
+from app.api.utils.sqlalchemy.statements import StatementCacheStats
+from app.api.utils.sqlalchemy.statements import _CountingPreparedStatementCache
+from app.api.utils.sqlalchemy.statements import _engines
+from app.api.utils.sqlalchemy.statements import _install_counting_cache
+from app.api.utils.sqlalchemy.statements import instrument_statement_cache
+from app.config import PostgresSettings
+
+
+def _prepare(cache: _CountingPreparedStatementCache, operation: str) -> None:
+    """Повторяем работу c кэшем адаптера asyncpg при подготовке запроса."""
+    if operation in cache:
+        return
+    cache[operation] = object()
+
+
+class TestCountingPreparedStatementCache:
+    def test_hits_and_misses(self):
+        stats = StatementCacheStats()
+        cache = _CountingPreparedStatementCache(stats, capacity=10)
+
+        for operation in ('select 1', 'select 1', 'select 2', 'select 1'):
+            _prepare(cache, operation)
+
+        assert (stats.prepared_hits, stats.prepared_misses) == (2, 2)
+
+
+class TestInstrumentStatementCache:
+    async def test_repeated_query_hits_caches(self, pg_container_url: str):
+        engine = create_async_engine(pg_container_url)
+        instrument_statement_cache(engine, 'test')
+        stats = _engines['test'][1]
+        try:
+            async with engine.connect() as conn:
+                assert await conn.scalar(select(literal(1))) == 1
+                before = StatementCacheStats(**asdict(stats))
+                assert await conn.scalar(select(literal(1))) == 1
+        finally:
+            await engine.dispose()
+            _engines.pop('test')
+
+        assert before.compiled_misses >= 1
+        assert stats.compiled_hits == before.compiled_hits + 1
+        assert stats.prepared_hits == before.prepared_hits + 1
+        assert stats.prepared_misses == before.prepared_misses
+
+    async def test_counting_cache_installed(self, pg_container_url: str):
+        # Кэш подменяется через приватный атрибут адаптера asyncpg. Проверяем его
+        # на версии алхимии, закрепленной в pyproject.toml
+        assert sqlalchemy.__version__ == '2.0.44'
+
+        engine = create_async_engine(pg_container_url)
+        instrument_statement_cache(engine, 'test')
+        try:
+            async with engine.connect() as conn:
+                raw_connection = await conn.get_raw_connection()
+                cache = raw_connection.dbapi_connection._prepared_statement_cache
+        finally:
+            await engine.dispose()
+            _engines.pop('test')
+
+        assert isinstance(cache, _CountingPreparedStatementCache)
+
+
+class TestInstallCountingCache:
+    def test_replaces_adapter_cache(self):
+        stats = StatementCacheStats()
+        connection = SimpleNamespace(_prepared_statement_cache=LRUCache(10))
+
+        assert _install_counting_cache(connection, stats)
+        assert isinstance(
+            connection._prepared_statement_cache, _CountingPreparedStatementCache
+        )
+        assert connection._prepared_statement_cache.capacity == 10
+
+    def test_disabled_adapter_cache(self):
+        connection = SimpleNamespace(_prepared_statement_cache=None)
+
+        assert _install_counting_cache(connection, StatementCacheStats())
+
+    @pytest.mark.parametrize(
+        'connection',
+        [SimpleNamespace(), SimpleNamespace(_prepared_statement_cache={})],
+    )
+    def test_unknown_adapter_cache(self, connection: SimpleNamespace):
+        assert not _install_counting_cache(connection, StatementCacheStats())
+
+
+class TestConnectArgs:
+    def test_default(self):
+        assert PostgresSettings().connect_args == {'prepared_statement_cache_size': 100}
+
+    def test_pgbouncer_disables_statement_caches(self):
+        connect_args = PostgresSettings(pgbouncer=True).connect_args
+        name_func = connect_args.pop('prepared_statement_name_func')
+
+        assert connect_args == {
+            'prepared_statement_cache_size': 0,
+            'statement_cache_size': 0,
+        }
+        assert name_func() != name_func()
+
+    def test_pgbouncer_prepared_statements(self):
+        connect_args = PostgresSettings(
+            pgbouncer=True, pgbouncer_prepared_statements=True
+        ).connect_args
+
+        assert connect_args['prepared_statement_cache_size'] == 100
+        assert connect_args['statement_cache_size'] == 0
@@ -0,0 +1,39 @@
+from datetime import UTC
+from datetime import datetime
+
+import orjson
+import pytest
+
+from app.api.utils.streaming import iter_json_array
+from app.api.utils.streaming import iter_ndjson
+from app.api.v1.schemas.role_schema import RoleSchema
+
+
+async def _batches(count: int, size: int = 2):
+    for batch in range(count):
+        yield [
+            {
+                'id': batch * size + i,
+                'role_name': f'role_{batch * size + i}',
+                'created_at': datetime.now(UTC),
+            }
+            for i in range(size)
+        ]
+
+
+@pytest.mark.asyncio
+class TestStreaming:
+    @pytest.mark.parametrize('count', [0, 1, 3])
+    async def test_ndjson(self, count: int):
+        chunks = [chunk async for chunk in iter_ndjson(_batches(count), RoleSchema)]
+
+        assert len(chunks) == count
+        lines = b''.join(chunks).splitlines()
+        assert [orjson.loads(line)['id'] for line in lines] == list(range(count * 2))
+
+    @pytest.mark.parametrize('count', [0, 1, 3])
+    async def test_json_array(self, count: int):
+        chunks = [chunk async for chunk in iter_json_array(_batches(count), RoleSchema)]
+
+        payload = orjson.loads(b''.join(chunks))
+        assert [row['id'] for row in payload] == list(range(count * 2))
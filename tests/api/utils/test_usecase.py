@@ -0,0 +1,220 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.usecase import InvalidatesResponseCacheMixin
+from app.api.utils.usecase import Usecase
+
+
+class FakeSession:
+    """Сессия, записывающая управление транзакцией вместо запросов в БД."""
+
+    def __init__(self, *, autocommit: bool = True) -> None:
+        self.info: dict = {}
+        self.calls: list[str] = []
+        self.autocommit = autocommit
+        self.active = False
+        self.connections = 0
+
+    def in_transaction(self) -> bool:
+        return self.active
+
+    async def execute(self) -> None:
+        self.active = True
+
+    async def commit(self) -> None:
+        self.calls.append('commit')
+        self.active = False
+
+    async def rollback(self) -> None:
+        self.calls.append('rollback')
+        self.active = False
+
+    async def connection(self) -> SimpleNamespace:
+        self.connections += 1
+        driver_connection = SimpleNamespace(
+            is_in_transaction=lambda: self.active and not self.autocommit
+        )
+
+        async def get_raw_connection() -> SimpleNamespace:
+            return SimpleNamespace(driver_connection=driver_connection)
+
+        return SimpleNamespace(get_raw_connection=get_raw_connection)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        self.calls.append('savepoint')
+        yield
+
+
+def make_usecase(mode: PropagationEnum, *, fail: bool = False) -> type:
+    class QueryUsecase(Usecase[None, str]):
+        propagation = mode
+
+        def __init__(self, session: FakeSession) -> None:
+            self.session = session
+
+        async def __call__(self, data: None = None) -> str:
+            """Query."""
+            await self.session.execute()
+            if fail:
+                raise ValueError('boom')
+            return 'ok'
+
+    return QueryUsecase
+
+
+def make_outer_usecase(
+    inner: type, mode: PropagationEnum, *, query_first: bool = True
+) -> type:
+    class OuterUsecase(Usecase[None, str]):
+        propagation = mode
+
+        def __init__(self, session: FakeSession) -> None:
+            self.session = session
+
+        async def __call__(self, data: None = None) -> str:
+            """Outer."""
+            if query_first:
+                await self.session.execute()
+            return await inner(self.session)()
+
+    return OuterUsecase
+
+
+@pytest.mark.asyncio
+class TestPropagation:
+    async def test_required_commits_once_at_outermost(self):
+        inner = make_usecase(PropagationEnum.REQUIRED)
+        outer = make_outer_usecase(inner, PropagationEnum.REQUIRED)
+        session = FakeSession()
+
+        assert await outer(session)() == 'ok'
+        assert session.calls == ['commit']
+        assert session.info['usecase_depth'] == 0
+
+    async def test_required_rolls_back_on_error(self):
+        session = FakeSession()
+
+        with pytest.raises(ValueError):
+            await make_usecase(PropagationEnum.REQUIRED, fail=True)(session)()
+        assert session.calls == ['rollback']
+
+    async def test_requires_new_in_outer_session_raises(self):
+        inner = make_usecase(PropagationEnum.REQUIRES_NEW)
+        outer = make_outer_usecase(inner, PropagationEnum.REQUIRED)
+        session = FakeSession()
+
+        with pytest.raises(RuntimeError):
+            await outer(session)()
+        assert session.calls == ['rollback']
+
+    @pytest.mark.parametrize(
+        ('autocommit', 'calls'),
+        [(True, ['commit']), (False, ['savepoint', 'commit'])],
+    )
+    async def test_nested_uses_savepoint_only_in_transaction(self, autocommit, calls):
+        inner = make_usecase(PropagationEnum.NESTED)
+        outer = make_outer_usecase(inner, PropagationEnum.REQUIRED)
+        session = FakeSession(autocommit=autocommit)
+
+        assert await outer(session)() == 'ok'
+        assert session.calls == calls
+
+    async def test_nested_before_outer_query_takes_no_connection(self):
+        inner = make_usecase(PropagationEnum.NESTED)
+        outer = make_outer_usecase(inner, PropagationEnum.REQUIRED, query_first=False)
+        session = FakeSession(autocommit=False)
+
+        assert await outer(session)() == 'ok'
+        assert session.calls == ['commit']
+        assert session.connections == 0
+
+    async def test_nested_rolls_back_transaction_it_opened(self):
+        inner = make_usecase(PropagationEnum.NESTED, fail=True)
+        outer = make_outer_usecase(inner, PropagationEnum.REQUIRED, query_first=False)
+        session = FakeSession(autocommit=False)
+
+        with pytest.raises(ValueError):
+            await outer(session)()
+        assert session.calls == ['rollback']
+
+    async def test_read_only_releases_connection_without_rollback(self):
+        session = FakeSession()
+
+        with pytest.raises(ValueError):
+            await make_usecase(PropagationEnum.READ_ONLY, fail=True)(session)()
+        assert session.calls == ['commit']
+        assert 'usecase_depth' not in session.info
+
+    async def test_read_only_joined_leaves_transaction_to_outer(self):
+        inner = make_usecase(PropagationEnum.READ_ONLY)
+        outer = make_outer_usecase(inner, PropagationEnum.REQUIRED)
+        session = FakeSession()
+
+        assert await outer(session)() == 'ok'
+        assert session.calls == ['commit']
+
+    async def test_none_leaves_call_unwrapped(self):
+        class RawUsecase(Usecase[None, None]):
+            propagation = PropagationEnum.NONE
+
+            async def __call__(self, data: None = None) -> None:
+                """Raw."""
+
+        assert RawUsecase.__call__.__qualname__.startswith('TestPropagation')
+
+
+class FakeResponseCache(ResponseCache):
+    """Кэш ответов, записывающий сброшенные теги."""
+
+    def __init__(self, session: FakeSession) -> None:
+        self.session = session
+        self.invalidated: list[tuple[str, ...]] = []
+
+    async def invalidate(self, *tags: str) -> None:
+        # Сброс должен идти после коммита, иначе кэш успеет заполниться
+        # данными до записи
+        assert self.session.calls == ['commit']
+        self.invalidated.append(tags)
+
+
+def make_write_usecase(*, fail: bool = False) -> type:
+    class WriteUsecase(InvalidatesResponseCacheMixin, Usecase[None, str]):
+        invalidates_tags = ('roles', 'users')
+
+        def __init__(
+            self, session: FakeSession, response_cache: FakeResponseCache
+        ) -> None:
+            self.session = session
+            self.response_cache = response_cache
+
+        async def __call__(self, data: None = None) -> str:
+            """Write."""
+            await self.session.execute()
+            if fail:
+                raise ValueError('boom')
+            return 'ok'
+
+    return WriteUsecase
+
+
+@pytest.mark.asyncio
+class TestInvalidatesResponseCache:
+    async def test_invalidates_tags_after_commit(self):
+        session = FakeSession()
+        response_cache = FakeResponseCache(session)
+
+        assert await make_write_usecase()(session, response_cache)() == 'ok'
+        assert response_cache.invalidated == [('roles', 'users')]
+
+    async def test_failed_write_keeps_cache(self):
+        session = FakeSession()
+        response_cache = FakeResponseCache(session)
+
+        with pytest.raises(ValueError):
+            await make_write_usecase(fail=True)(session, response_cache)()
+        assert response_cache.invalidated == []
@@ -1,5 +1,16 @@
+import orjson
+import pytest
 import schemathesis
 
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.sqlalchemy.pagination import encode_cursor
+from app.api.v1.models import UserModel
+from app.api.v1.models import UserRoleModel
+from app.api.v1.schemas.user_schema import UserSchema
+
 
 def get_schema():
     return schemathesis.pytest.from_fixture('schema_fixture')
@@ -12,3 +23,141 @@ schema = get_schema()
 @schema.parametrize()
 async def test_api(case):
     case.call_and_validate()
+
+
+async def create_users(test_client: AsyncClient, count: int) -> list[dict]:
+    """Создаем роль и count пользователей c ней через API."""
+    role = await test_client.post('/api/v1/roles/', json={'role_name': 'admin'})
+    assert role.status_code == 200
+    users = []
+    for number in range(count):
+        user = await test_client.post(
+            '/api/v1/users/',
+            json={'user_name': f'user_{number:03}', 'role_id': role.json()['id']},
+        )
+        assert user.status_code == 200
+        users.append(user.json())
+    return users
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestCursorPagination:
+    async def test_pages_cover_all_rows_in_order(self, test_client: AsyncClient):
+        users = await create_users(test_client, 5)
+
+        first = await test_client.get('/api/v1/users/', params={'limit': 2})
+        assert first.status_code == 200
+        assert [item['id'] for item in first.json()['items']] == [
+            user['id'] for user in users[:2]
+        ]
+        assert first.json()['next_cursor'] is not None
+
+        ids = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {'limit': 2} | ({'cursor': cursor} if cursor else {})
+            page = (await test_client.get('/api/v1/users/', params=params)).json()
+            ids += [item['id'] for item in page['items']]
+            pages += 1
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert ids == [user['id'] for user in users]
+        # Последняя страница неполная и без курсора
+        assert len(page['items']) == 1
+
+    async def test_exact_last_page_has_no_cursor(self, test_client: AsyncClient):
+        await create_users(test_client, 2)
+
+        page = await test_client.get('/api/v1/users/', params={'limit': 2})
+
+        assert len(page.json()['items']) == 2
+        assert page.json()['next_cursor'] is None
+
+    @pytest.mark.parametrize(
+        'cursor',
+        [
+            'not-a-cursor!',
+            encode_cursor('user_name', ['user_001']),
+            encode_cursor('id', ['1']),
+            encode_cursor('id', [1, 2]),
+        ],
+        ids=['malformed', 'other_order', 'wrong_type', 'wrong_length'],
+    )
+    async def test_bad_cursor_is_422(self, test_client: AsyncClient, cursor: str):
+        await create_users(test_client, 1)
+
+        response = await test_client.get('/api/v1/users/', params={'cursor': cursor})
+
+        assert response.status_code == 422
+
+
+# Больше одного батча stream_multi (batch_size=1000)
+EXPORT_SIZE = 2500
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestExport:
+    @pytest.fixture(scope='function')
+    async def user_ids(self, session: AsyncSession) -> list[int]:
+        role_id = (
+            await session.execute(
+                insert(UserRoleModel).returning(UserRoleModel.id),
+                [{'role_name': 'admin'}],
+            )
+        ).scalar_one()
+        ids = (
+            await session.execute(
+                insert(UserModel).returning(UserModel.id),
+                [
+                    {'user_name': f'user_{number:05}', 'role_id': role_id}
+                    for number in range(EXPORT_SIZE)
+                ],
+            )
+        ).scalars()
+        await session.commit()
+        return sorted(ids)
+
+    async def test_ndjson_has_every_row(
+        self, test_client: AsyncClient, user_ids: list[int]
+    ):
+        response = await test_client.get('/api/v1/users/export')
+
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/x-ndjson'
+        lines = response.content.splitlines()
+        users = [UserSchema.model_validate_json(line) for line in lines]
+        assert response.content.endswith(b'\n')
+        assert sorted(user.id for user in users) == user_ids
+
+    async def test_json_array_has_every_row(
+        self, test_client: AsyncClient, user_ids: list[int]
+    ):
+        response = await test_client.get(
+            '/api/v1/users/export', params={'format': 'json'}
+        )
+
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/json'
+        users = [
+            UserSchema.model_validate(item) for item in orjson.loads(response.content)
+        ]
+        assert sorted(user.id for user in users) == user_ids
+
+    @pytest.mark.parametrize(
+        ('stream_format', 'body'), [('ndjson', b''), ('json', b'[]')]
+    )
+    async def test_empty_export(
+        self, test_client: AsyncClient, stream_format: str, body: bytes
+    ):
+        response = await test_client.get(
+            '/api/v1/users/export', params={'format': stream_format}
+        )
+
+        assert response.status_code == 200
+        assert response.content == body
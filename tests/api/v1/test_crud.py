@@ -0,0 +1,45 @@
+import pytest
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.exceptions import HTTPException
+
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.models import UserModel
+from app.api.v1.schemas.user_schema import CreateUserSchema
+from app.api.v1.schemas.user_schema import UpdateUserSchema
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestCopyMany:
+    @pytest.mark.parametrize(
+        ('obj_in', 'status_code'),
+        [
+            # Роли 999 нет
+            (CreateUserSchema(user_name='copy_user', role_id=999), 409),
+            (CreateUserSchema.model_construct(user_name=None, role_id=999), 422),
+        ],
+    )
+    async def test_errors_are_mapped_and_rolled_back(
+        self, session: AsyncSession, obj_in: CreateUserSchema, status_code: int
+    ):
+        with pytest.raises(HTTPException) as e:
+            await UserCRUD(session).copy_many(objs_in=[obj_in])
+
+        assert e.value.status_code == status_code
+        assert not session.in_transaction()
+        assert await session.scalar(select(func.count()).select_from(UserModel)) == 0
+
+
+class TestUpsertMany:
+    async def test_rows_with_different_fields(self):
+        with pytest.raises(ValueError):
+            await UserCRUD(db=None).upsert_many(  # type: ignore[arg-type]
+                objs_in=[
+                    CreateUserSchema(user_name='user_1', role_id=1),
+                    UpdateUserSchema(id=1, user_name='user_2'),
+                ],
+                index_elements=['user_name'],
+            )
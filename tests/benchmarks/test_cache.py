@@ -0,0 +1,81 @@
+import pytest
+
+from fastapi import FastAPI
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.cache.memory import MemoryCache
+from app.api.utils.cache.response import ResponseCache
+from app.api.v1.crud.role_crud import RoleCRUD
+from app.api.v1.schemas.role_schema import CreateRoleSchema
+from tests.benchmarks.test_session import PoolUsage
+from tests.utils.asgi import asgi_request
+from tests.utils.benchmark import measure
+from tests.utils.benchmark import percentile
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestCacheBenchmark:
+    async def test_cached_role_lookup_is_sub_millisecond(self, session: AsyncSession):
+        role = await RoleCRUD(db=session).create(
+            obj_in=CreateRoleSchema(role_name='admin')
+        )
+        await session.commit()
+
+        uncached_crud = RoleCRUD(db=session)
+        cached_crud = RoleCRUD(db=session, cache=MemoryCache(max_size=10, ttl=60))
+
+        uncached = await measure(lambda: uncached_crud.get(_id=role.id))
+        cached = await measure(lambda: cached_crud.get(_id=role.id))
+
+        logger.info(
+            'p99 role lookup: db {:.5f}s, cache {:.5f}s',
+            percentile(uncached, 99),
+            percentile(cached, 99),
+        )
+        assert percentile(cached, 99) < 0.001
+        assert percentile(cached, 99) < percentile(uncached, 99)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestResponseCacheBenchmark:
+    async def test_cached_response_skips_pool(
+        self, test_app: FastAPI, pg_engine: AsyncEngine
+    ):
+        await asgi_request(
+            test_app,
+            'POST',
+            '/api/v1/roles/',
+            b'{"role_name": "admin"}',
+            [(b'content-type', b'application/json')],
+        )
+        response_cache = await test_app.state.dishka_container.get(ResponseCache)
+
+        async def get_roles() -> None:
+            messages = await asgi_request(test_app, 'GET', '/api/v1/roles/')
+            assert messages[0]['status'] == 200
+
+        async def get_roles_after_write() -> None:
+            await response_cache.invalidate('roles')
+            await get_roles()
+
+        missed = await measure(get_roles_after_write)
+        await get_roles()
+        with PoolUsage(pg_engine) as usage:
+            cached = await measure(get_roles)
+
+        logger.info(
+            'p99 GET roles: after write {:.5f}s, cache {:.5f}s, checkouts {}',
+            percentile(missed, 99),
+            percentile(cached, 99),
+            usage.checkouts,
+        )
+        # Попадание не доходит до роутинга и DI, соединение не берется
+        assert usage.checkouts == 0
+        assert percentile(cached, 99) < 0.001
+        assert percentile(cached, 99) < percentile(missed, 99)
@@ -0,0 +1,444 @@
+import asyncio
+import gc
+import sys
+import time
+import timeit
+
+from functools import partial
+
+import orjson
+import pytest
+
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.exceptions import HTTPException
+
+from app.api.utils.row_response import get_row_encoder
+from app.api.utils.sqlalchemy.pagination import encode_cursor
+from app.api.v1.crud.role_crud import RoleCRUD
+from app.api.v1.crud.user_crud import UserCRUD
+from app.api.v1.models import UserModel
+from app.api.v1.models import UserRoleModel
+from app.api.v1.schemas.base_schema import CursorPageSchema
+from app.api.v1.schemas.role_schema import CreateRoleSchema
+from app.api.v1.schemas.user_schema import CreateUserSchema
+from app.api.v1.schemas.user_schema import PatchUserSchema
+from app.api.v1.schemas.user_schema import UserSchema
+from app.api.v1.usecases.user.get_by_id import GetUserByIdUsecase
+from tests.utils.benchmark import measure
+from tests.utils.benchmark import percentile
+
+PAGE_SIZE = 10
+PAGES = 10_000
+BULK_SIZE = 10_000
+USERS_PAGE_SIZE = 50
+READ_PAGE_SIZE = 1000
+
+
+@pytest.fixture(scope='function')
+async def roles(session: AsyncSession, clear_db) -> None:
+    await session.execute(
+        text(
+            'insert into template_schema.template_user_role (role_name) '
+            "select 'role_' || g from generate_series(1, :total) g"
+        ),
+        {'total': PAGE_SIZE * PAGES},
+    )
+    await session.commit()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('roles')
+class TestCursorPaginationBenchmark:
+    async def test_deep_page_latency_is_flat(self, session: AsyncSession):
+        crud = RoleCRUD(db=session)
+        deep_cursor = encode_cursor('id', [PAGE_SIZE * (PAGES - 1)])
+
+        first = await measure(lambda: crud.get_multi_by_cursor(limit=PAGE_SIZE))
+        deep = await measure(
+            lambda: crud.get_multi_by_cursor(cursor=deep_cursor, limit=PAGE_SIZE)
+        )
+        offset = await measure(
+            lambda: crud.get_multi(offset=PAGE_SIZE * (PAGES - 1), limit=PAGE_SIZE)
+        )
+
+        logger.info(
+            'p99 keyset page 1: {:.5f}s, keyset page {}: {:.5f}s, offset page {}: '
+            '{:.5f}s',
+            percentile(first, 99),
+            PAGES,
+            percentile(deep, 99),
+            PAGES,
+            percentile(offset, 99),
+        )
+        assert percentile(deep, 99) < percentile(first, 99) * 3
+        assert percentile(deep, 99) < percentile(offset, 99)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestBulkBenchmark:
+    async def test_bulk_insert_round_trips(self, session: AsyncSession):
+        await RoleCRUD(db=session).create(obj_in=CreateRoleSchema(role_name='user'))
+        await session.commit()
+        crud = UserCRUD(db=session)
+        statements = 0
+
+        def count_statements(*_) -> None:
+            nonlocal statements
+            statements += 1
+
+        sync_engine = session.bind.sync_engine
+        event.listen(sync_engine, 'before_cursor_execute', count_statements)
+        try:
+            start = time.perf_counter()
+            for i in range(BULK_SIZE // 10):
+                await crud.create(
+                    obj_in=CreateUserSchema(user_name=f'single_{i}', role_id=1)
+                )
+            single = (time.perf_counter() - start) * 10
+            single_statements, statements = statements, 0
+
+            start = time.perf_counter()
+            await crud.create_many(
+                objs_in=[
+                    CreateUserSchema(user_name=f'bulk_{i}', role_id=1)
+                    for i in range(BULK_SIZE)
+                ]
+            )
+            bulk = time.perf_counter() - start
+            bulk_statements = statements
+
+            start = time.perf_counter()
+            await crud.copy_many(
+                objs_in=[
+                    CreateUserSchema(user_name=f'copy_{i}', role_id=1)
+                    for i in range(BULK_SIZE)
+                ]
+            )
+            copy = time.perf_counter() - start
+        finally:
+            event.remove(sync_engine, 'before_cursor_execute', count_statements)
+
+        logger.info(
+            '{} users: create ~{:.3f}s ({} statements per 1/10), create_many '
+            '{:.3f}s ({} statements), copy_many {:.3f}s',
+            BULK_SIZE,
+            single,
+            single_statements,
+            bulk,
+            bulk_statements,
+            copy,
+        )
+        assert bulk_statements <= BULK_SIZE // 1000 + 1
+        assert bulk < single / 10
+        assert copy < bulk
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestUpdateBenchmark:
+    async def test_optimistic_update(
+        self, session: AsyncSession, pg_engine: AsyncEngine
+    ):
+        await RoleCRUD(db=session).create(obj_in=CreateRoleSchema(role_name='user'))
+        user = await UserCRUD(db=session).create(
+            obj_in=CreateUserSchema(user_name='useruser', role_id=1)
+        )
+        await session.commit()
+        statements = 0
+
+        def count_statements(*_) -> None:
+            nonlocal statements
+            statements += 1
+
+        event.listen(pg_engine.sync_engine, 'before_cursor_execute', count_statements)
+        try:
+            latency = await measure(
+                lambda: UserCRUD(db=session).update(
+                    _id=user.id, obj_in=PatchUserSchema(role_id=1)
+                )
+            )
+        finally:
+            event.remove(
+                pg_engine.sync_engine, 'before_cursor_execute', count_statements
+            )
+        await session.commit()
+        logger.info('p99 update: {:.5f}s', percentile(latency, 99))
+        # Один UPDATE ... RETURNING на вызов, без предварительного SELECT
+        assert statements == len(latency) + 10
+
+        async def update_with(version: object) -> int:
+            async with AsyncSession(pg_engine) as concurrent_session:
+                try:
+                    await UserCRUD(db=concurrent_session).update(
+                        _id=user.id,
+                        obj_in=PatchUserSchema(role_id=1),
+                        version=version,
+                    )
+                except HTTPException as e:
+                    return e.status_code
+                await concurrent_session.commit()
+                return 200
+
+        await session.refresh(user)
+        statuses = await asyncio.gather(
+            *(update_with(user.updated_at) for _ in range(10))
+        )
+        assert sorted(statuses) == [200] + [409] * 9
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestStatementCacheBenchmark:
+    async def test_get_throughput_with_statement_cache(
+        self, session: AsyncSession, pg_container_url: str
+    ):
+        role = await RoleCRUD(db=session).create(
+            obj_in=CreateRoleSchema(role_name='admin')
+        )
+        await session.commit()
+
+        rps = {}
+        for cache_size in (0, 100):
+            engine = create_async_engine(
+                pg_container_url,
+                connect_args={'prepared_statement_cache_size': cache_size},
+            )
+            try:
+                async with AsyncSession(engine) as cache_session:
+                    crud = RoleCRUD(db=cache_session)
+                    timings = await measure(partial(crud.get, _id=role.id))
+            finally:
+                await engine.dispose()
+            rps[cache_size] = len(timings) / sum(timings)
+
+        logger.info(
+            'RoleCRUD.get: {:.0f} rps without statement cache, {:.0f} rps with it',
+            rps[0],
+            rps[100],
+        )
+        # Без кэша каждый запрос тратит лишний round trip на prepare
+        assert rps[100] > rps[0]
+
+
+async def _cpu_time(func, rounds: int = 2000) -> float:
+    """Процессорное время на вызов в секундах."""
+    start = time.process_time()
+    for _ in range(rounds):
+        await func()
+    return (time.process_time() - start) / rounds
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestStatementTemplateBenchmark:
+    async def test_get_cpu_per_call(self, session: AsyncSession):
+        role = await RoleCRUD(db=session).create(
+            obj_in=CreateRoleSchema(role_name='admin')
+        )
+        await session.commit()
+        crud = RoleCRUD(db=session)
+
+        async def get_with_new_statement() -> None:
+            # Как было до шаблонов: запрос собирается на каждый вызов
+            result = await session.execute(
+                select(UserRoleModel).where(UserRoleModel.id == role.id)
+            )
+            result.scalars().first()
+
+        before = await _cpu_time(get_with_new_statement)
+        after = await _cpu_time(lambda: crud.get(_id=role.id))
+
+        logger.info(
+            'CPU per get: {:.1f}us building the statement, {:.1f}us from template',
+            before * 1e6,
+            after * 1e6,
+        )
+        assert after < before
+
+
+def _allocated_blocks(func, rounds: int = 10_000) -> float:
+    """Сколько блоков памяти остается занятым на вызов, пока результаты живы."""
+    results = [None] * rounds
+    gc.collect()
+    gc.disable()
+    try:
+        before = sys.getallocatedblocks()
+        for i in range(rounds):
+            results[i] = func()
+        return (sys.getallocatedblocks() - before) / rounds
+    finally:
+        gc.enable()
+
+
+@pytest.mark.slow
+class TestCRUDConstructionBenchmark:
+    def test_per_request_allocations(self):
+        session = AsyncSession()
+
+        crud_blocks = _allocated_blocks(lambda: UserCRUD(db=session))
+        usecase_blocks = _allocated_blocks(lambda: GetUserByIdUsecase(session=session))
+        crud_time = min(
+            timeit.repeat(lambda: UserCRUD(db=session), number=10_000, repeat=5)
+        )
+
+        logger.info(
+            'Allocated blocks: {:.2f} per CRUD, {:.2f} per usecase; CRUD init {:.2f}us',
+            crud_blocks,
+            usecase_blocks,
+            crud_time / 10_000 * 1e6,
+        )
+        # Модель достается при объявлении класса, у CRUD нет __dict__
+        assert not hasattr(UserCRUD(db=session), '__dict__')
+        assert crud_blocks < 1.1
+        assert usecase_blocks < 2.1
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestUsersWithRolesBenchmark:
+    async def test_embedded_roles_vs_client_side_n_plus_one(
+        self, session: AsyncSession, test_client: AsyncClient
+    ):
+        await session.execute(
+            text(
+                'insert into template_schema.template_user_role (role_name) '
+                "select 'role_' || g from generate_series(1, :total) g"
+            ),
+            {'total': PAGE_SIZE},
+        )
+        await session.execute(
+            text(
+                'insert into template_schema.template_user (user_name, role_id) '
+                "select 'user_' || g, (select min(id) from "
+                'template_schema.template_user_role) + g % :roles '
+                'from generate_series(1, :total) g'
+            ),
+            {'roles': PAGE_SIZE, 'total': USERS_PAGE_SIZE},
+        )
+        await session.commit()
+        role_ids = (
+            (await session.execute(select(UserModel.role_id).order_by(UserModel.id)))
+            .scalars()
+            .all()
+        )
+
+        async def client_side_n_plus_one() -> None:
+            page = await test_client.get(
+                '/api/v1/users/', params={'limit': USERS_PAGE_SIZE}
+            )
+            assert page.status_code == 200
+            for role_id in role_ids:
+                assert (await test_client.get(f'/api/v1/roles/{role_id}')).is_success
+
+        async def embedded_roles() -> None:
+            page = await test_client.get(
+                '/api/v1/users/with-roles', params={'limit': USERS_PAGE_SIZE}
+            )
+            assert all(item['role'] for item in page.json()['items'])
+
+        n_plus_one = await measure(client_side_n_plus_one, rounds=20, warmup=2)
+        embedded = await measure(embedded_roles, rounds=20, warmup=2)
+
+        logger.info(
+            'p99 {} users with roles: {:.5f}s client-side N+1, {:.5f}s embedded',
+            USERS_PAGE_SIZE,
+            percentile(n_plus_one, 99),
+            percentile(embedded, 99),
+        )
+        assert percentile(embedded, 99) < percentile(n_plus_one, 99)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestRowReadPathBenchmark:
+    async def test_rows_per_second(self, session: AsyncSession):
+        await session.execute(
+            text(
+                'insert into template_schema.template_user (user_name, role_id) '
+                "select 'user_' || g, null from generate_series(1, :total) g"
+            ),
+            {'total': READ_PAGE_SIZE},
+        )
+        await session.commit()
+        crud = UserCRUD(db=session)
+        encoder = get_row_encoder(UserSchema)
+        page_schema = CursorPageSchema[UserSchema]
+
+        async def orm_read() -> bytes:
+            # Как было: ORM объекты -> response_model -> jsonable_encoder -> orjson
+            page = await crud.get_multi_by_cursor(limit=READ_PAGE_SIZE)
+            session.expunge_all()
+            return orjson.dumps(
+                jsonable_encoder(
+                    page_schema.model_validate(
+                        {'items': page.items, 'next_cursor': page.next_cursor}
+                    )
+                )
+            )
+
+        async def row_read() -> bytes:
+            page = await crud.get_multi_rows_by_cursor(
+                columns=encoder.columns, limit=READ_PAGE_SIZE
+            )
+            return encoder.encode_page(page)
+
+        assert await orm_read() == await row_read()
+        orm = await measure(orm_read, rounds=50, warmup=5)
+        rows = await measure(row_read, rounds=50, warmup=5)
+        orm_rps = READ_PAGE_SIZE * len(orm) / sum(orm)
+        rows_rps = READ_PAGE_SIZE * len(rows) / sum(rows)
+
+        logger.info(
+            'GET /users/ page of {}: {:.0f} rows/s via ORM, {:.0f} rows/s via rows',
+            READ_PAGE_SIZE,
+            orm_rps,
+            rows_rps,
+        )
+        assert rows_rps > orm_rps * 3
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestConditionalGetBenchmark:
+    async def test_not_modified_vs_full_response(self, test_client: AsyncClient):
+        role = await test_client.post('/api/v1/roles/', json={'role_name': 'admin'})
+        user = await test_client.post(
+            '/api/v1/users/',
+            json={'user_name': 'user_one', 'role_id': role.json()['id']},
+        )
+        url = f'/api/v1/users/{user.json()["id"]}'
+        etag = (await test_client.get(url)).headers['etag']
+
+        async def full_get() -> None:
+            assert (await test_client.get(url)).status_code == 200
+
+        async def conditional_get() -> None:
+            response = await test_client.get(url, headers={'If-None-Match': etag})
+            assert response.status_code == 304
+
+        full = await measure(full_get, rounds=500, warmup=20)
+        conditional = await measure(conditional_get, rounds=500, warmup=20)
+
+        logger.info(
+            'GET /users/{{id}} p50: {:.5f}s full body, {:.5f}s 304 Not Modified',
+            percentile(full, 50),
+            percentile(conditional, 50),
+        )
+        assert percentile(conditional, 50) < percentile(full, 50)
@@ -0,0 +1,58 @@
+import io
+import sys
+import time
+
+import pytest
+
+from loguru import logger
+
+from app.api.utils.loggers import BatchedLogSink
+from app.api.utils.loggers import serialize_record
+from tests.utils.benchmark import percentile
+
+ROUNDS = 2000
+
+
+class SlowStdout(io.StringIO):
+    """Stdout c backpressure: каждая запись занимает 1мс."""
+
+    def write(self, data: str) -> int:
+        time.sleep(0.001)
+        return super().write(data)
+
+
+def _log_call_timings() -> list[float]:
+    timings = []
+    for i in range(ROUNDS):
+        start = time.perf_counter()
+        logger.bind(request={'path': '/api/v1/users/', 'i': i}).info('Access log')
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+@pytest.mark.slow
+class TestBatchedLogSinkBenchmark:
+    def test_p99_does_not_depend_on_stdout(self):
+        logger.remove()
+
+        stream = SlowStdout()
+        handler_id = logger.add(
+            lambda message: stream.write(serialize_record(message.record)),
+            format='{message}',
+        )
+        sync_timings = _log_call_timings()
+        logger.remove(handler_id)
+
+        sink = BatchedLogSink(SlowStdout(), max_queue_size=ROUNDS)
+        handler_id = logger.add(sink, format='{message}')
+        batched_timings = _log_call_timings()
+        logger.remove(handler_id)
+
+        logger.add(sys.stderr)
+        logger.info(
+            'p99 logger call: sync sink {:.6f}s, batched sink {:.6f}s',
+            percentile(sync_timings, 99),
+            percentile(batched_timings, 99),
+        )
+        assert percentile(batched_timings, 99) < percentile(sync_timings, 99) / 5
+        assert sink.written == ROUNDS
@@ -0,0 +1,250 @@
+import sys
+
+from collections.abc import Callable
+from functools import partial
+from importlib.util import find_spec
+from itertools import count
+
+import orjson
+import pytest
+
+from fastapi import FastAPI
+from fastapi import Request
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.enums.content_encoding_enum import ContentEncodingEnum
+from app.api.utils.middlewares.compression_middleware import CompressionMiddleware
+from app.api.utils.middlewares.csrf_middleware import CSRFMiddleware
+from app.api.utils.middlewares.router_logging_middleware import RouterLoggingMiddleware
+from app.config import AccessLogSettings
+from app.config import CompressionSettings
+from app.config import config
+from tests.utils.asgi import asgi_request
+from tests.utils.benchmark import measure
+from tests.utils.legacy_router_logging_middleware import LegacyRouterLoggingMiddleware
+
+ROUNDS = 3000
+JSON_HEADERS = [(b'content-type', b'application/json')]
+LIST_PAGE_SIZE = 1000
+LIST_PATHS = ('/api/v1/users/', '/api/v1/users/with-roles', '/api/v1/roles/')
+
+
+def _get_app(
+    *,
+    logging_middleware: bool,
+    settings: AccessLogSettings | None = None,
+    legacy: bool = False,
+) -> FastAPI:
+    app = FastAPI()
+
+    @app.post('/items/')
+    async def create_item(request: Request) -> dict:
+        return {'id': 1, **(await request.json())}
+
+    if legacy:
+        app.add_middleware(LegacyRouterLoggingMiddleware, current_logger=logger)
+    elif logging_middleware:
+        app.add_middleware(
+            RouterLoggingMiddleware,
+            current_logger=logger,
+            settings=settings or AccessLogSettings(),
+        )
+    return app
+
+
+@pytest.fixture(scope='function')
+def silent_logger():
+    logger.remove()
+    logger.add(lambda _: None, level='INFO')
+    yield
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+@pytest.fixture(scope='function')
+def no_compression(monkeypatch):
+    # test_app собирается без своей мидлы сжатия, уровни подключаем в тесте
+    monkeypatch.setattr(config.compression, 'enabled', False)
+
+
+def _rps(timings: list[float]) -> float:
+    return len(timings) / sum(timings)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('silent_logger')
+class TestRouterLoggingMiddlewareBenchmark:
+    async def test_requests_per_second(self):
+        body = b'{"name": "item", "password": "secret"}'
+        apps = {
+            'bare': _get_app(logging_middleware=False),
+            'legacy': _get_app(logging_middleware=True, legacy=True),
+            'asgi': _get_app(logging_middleware=True),
+        }
+        rps = {}
+        for name, app in apps.items():
+            timings = await measure(
+                lambda app=app: asgi_request(
+                    app, 'POST', '/items/', body=body, headers=JSON_HEADERS
+                ),
+                rounds=ROUNDS,
+            )
+            rps[name] = _rps(timings)
+
+        logger.remove()
+        logger.add(sys.stderr)
+        logger.info(
+            'req/s without middleware: {:.0f}, BaseHTTPMiddleware: {:.0f},'
+            ' pure ASGI: {:.0f}',
+            rps['bare'],
+            rps['legacy'],
+            rps['asgi'],
+        )
+        assert rps['asgi'] > rps['legacy'] * 1.5
+        assert rps['asgi'] > rps['bare'] * 0.3
+
+    async def test_sampling_cpu_per_request(self):
+        body = b'{"name": "item", "password": "secret"}'
+        per_request = {}
+        for sample_rate in (1.0, 0.01):
+            app = _get_app(
+                logging_middleware=True,
+                settings=AccessLogSettings(sample_rate=sample_rate),
+            )
+            timings = await measure(
+                lambda app=app: asgi_request(
+                    app, 'POST', '/items/', body=body, headers=JSON_HEADERS
+                ),
+                rounds=ROUNDS,
+            )
+            per_request[sample_rate] = sum(timings) / len(timings)
+
+        logger.remove()
+        logger.add(sys.stderr)
+        logger.info(
+            'time per request: 100% sampling {:.1f}us, 1% sampling {:.1f}us',
+            per_request[1.0] * 1e6,
+            per_request[0.01] * 1e6,
+        )
+        assert per_request[0.01] < per_request[1.0]
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('silent_logger', 'clear_db')
+class TestCSRFMiddlewareBenchmark:
+    async def test_create_user_requests_per_second(self, test_app: FastAPI):
+        role = await asgi_request(
+            test_app, 'POST', '/api/v1/roles/', b'{"role_name": "admin"}', JSON_HEADERS
+        )
+        role_id = orjson.loads(role[1]['body'])['id']
+        csrf_app = CSRFMiddleware(test_app, allowed_hosts=['localhost'])
+        headers = [*JSON_HEADERS, (b'x-csrftoken', csrf_app.get_new_token().encode())]
+        names = count()
+
+        async def create_user(app: Callable) -> None:
+            body = orjson.dumps(
+                {'user_name': f'user_{next(names)}', 'role_id': role_id}
+            )
+            messages = await asgi_request(app, 'POST', '/api/v1/users/', body, headers)
+            assert messages[0]['status'] == 200
+
+        rps = {}
+        for name, app in (('without', test_app), ('with', csrf_app)):
+            timings = await measure(partial(create_user, app), rounds=500)
+            rps[name] = _rps(timings)
+
+        logger.remove()
+        logger.add(sys.stderr)
+        logger.info(
+            'POST /api/v1/users/ req/s without CSRF: {:.0f}, with CSRFMiddleware: {:.0f}',
+            rps['without'],
+            rps['with'],
+        )
+        # Токен в заголовке проверяется без чтения тела, мидла почти бесплатна
+        assert rps['with'] > rps['without'] * 0.8
+
+
+def _compression_settings() -> dict[str, CompressionSettings | None]:
+    settings: dict[str, CompressionSettings | None] = {'identity': None}
+    for level in (1, 5, 9):
+        settings[f'gzip-{level}'] = CompressionSettings(gzip_level=level)
+    if find_spec('brotli'):
+        for quality in (1, 4, 11):
+            settings[f'br-{quality}'] = CompressionSettings(
+                encodings=[ContentEncodingEnum.BROTLI], brotli_quality=quality
+            )
+    if find_spec('zstandard'):
+        for level in (1, 3, 19):
+            settings[f'zstd-{level}'] = CompressionSettings(
+                encodings=[ContentEncodingEnum.ZSTD], zstd_level=level
+            )
+    return settings
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('silent_logger', 'no_compression', 'clear_db')
+class TestCompressionMiddlewareBenchmark:
+    async def test_bytes_on_wire_and_cpu_per_level(
+        self, session: AsyncSession, test_app: FastAPI
+    ):
+        await session.execute(
+            text(
+                'insert into template_schema.template_user_role (role_name) '
+                "select 'role_' || g from generate_series(1, :total) g"
+            ),
+            {'total': LIST_PAGE_SIZE},
+        )
+        await session.execute(
+            text(
+                'insert into template_schema.template_user (user_name, role_id) '
+                "select 'user_' || g, (select min(id) from "
+                'template_schema.template_user_role) + (g - 1) % :total '
+                'from generate_series(1, :total) g'
+            ),
+            {'total': LIST_PAGE_SIZE},
+        )
+        await session.commit()
+
+        results = []
+        for path in LIST_PATHS:
+            url = f'{path}?limit={LIST_PAGE_SIZE}'
+            identity_time = None
+            for name, settings in _compression_settings().items():
+                app = (
+                    test_app
+                    if settings is None
+                    else CompressionMiddleware(test_app, settings=settings)
+                )
+                encoding = name.partition('-')[0].encode()
+                headers = [(b'accept-encoding', encoding)]
+                messages = await asgi_request(app, 'GET', url, headers=headers)
+                size = sum(len(message.get('body', b'')) for message in messages[1:])
+                timings = await measure(
+                    partial(asgi_request, app, 'GET', url, headers=headers),
+                    rounds=100,
+                )
+                per_request = sum(timings) / len(timings)
+                identity_time = identity_time or per_request
+                results.append((path, name, size, per_request - identity_time))
+
+        logger.remove()
+        logger.add(sys.stderr)
+        for path, name, size, extra_time in results:
+            logger.info(
+                'GET {} page of {}: {:<9} {:>8} bytes, {:+.0f}us per request',
+                path,
+                LIST_PAGE_SIZE,
+                name,
+                size,
+                extra_time * 1e6,
+            )
+
+        sizes = {(path, name): size for path, name, size, _ in results}
+        for path in LIST_PATHS:
+            assert sizes[path, 'gzip-1'] < sizes[path, 'identity'] * 0.3
+            assert sizes[path, 'gzip-9'] <= sizes[path, 'gzip-1']
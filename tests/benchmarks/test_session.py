@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+from typing import ClassVar
+
+import pytest
+
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import QueuePool
+
+from app.api.utils.cache.base import NullCache
+from app.api.utils.cache.memory import MemoryCache
+from app.api.utils.cache.response import ResponseCache
+from app.api.utils.enums.propagation_enum import PropagationEnum
+from app.api.utils.usecase import Usecase
+from app.api.v1.models import UserModel
+from app.api.v1.schemas.role_schema import CreateRoleSchema
+from app.api.v1.schemas.user_schema import CreateUserSchema
+from app.api.v1.schemas.user_schema import GetUserByIdSchema
+from app.api.v1.usecases.role.create import CreateRoleUsecase
+from app.api.v1.usecases.user.create import CreateUserUsecase
+from app.api.v1.usecases.user.get_by_id import GetUserByIdUsecase
+
+CONCURRENCY = 50
+REQUESTS = 1000
+
+
+class PoolUsage:
+    """Считаем занятые соединения пула по событиям checkout/checkin."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.in_use = 0
+        self.peak = 0
+        self.checkouts = 0
+
+    def __enter__(self) -> 'PoolUsage':
+        event.listen(self.engine.sync_engine, 'checkout', self._checkout)
+        event.listen(self.engine.sync_engine, 'checkin', self._checkin)
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        event.remove(self.engine.sync_engine, 'checkout', self._checkout)
+        event.remove(self.engine.sync_engine, 'checkin', self._checkin)
+
+    def _checkout(self, *_: object) -> None:
+        self.in_use += 1
+        self.checkouts += 1
+        self.peak = max(self.peak, self.in_use)
+
+    def _checkin(self, *_: object) -> None:
+        self.in_use -= 1
+
+
+class RoundTrips:
+    """Считаем обращения к БД: запросы и управление транзакцией.
+
+    SAVEPOINT и RELEASE выполняются как обычные запросы и попадают в
+    after_cursor_execute, a BEGIN, COMMIT и ROLLBACK - нет.
+    """
+
+    EVENTS = ('begin', 'commit', 'rollback', 'after_cursor_execute')
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.count = 0
+
+    def __enter__(self) -> 'RoundTrips':
+        for name in self.EVENTS:
+            event.listen(self.engine.sync_engine, name, self._count)
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        for name in self.EVENTS:
+            event.remove(self.engine.sync_engine, name, self._count)
+
+    def _count(self, *_: object) -> None:
+        self.count += 1
+
+
+def _with_propagation[T: Usecase](usecase: type[T], mode: PropagationEnum) -> type[T]:
+    """Тот же юзкейс c другим режимом транзакции."""
+
+    class PropagatedUsecase(usecase):  # type: ignore[valid-type,misc]
+        propagation = mode
+
+        async def __call__(self, data: object) -> object:
+            """Call with propagation."""
+            return await usecase.__call__(self, data=data)
+
+    return PropagatedUsecase
+
+
+class SignupUsecase(Usecase[str, UserModel]):
+    """Составной юзкейс: роль и пользователь вложенными юзкейсами."""
+
+    create_role: ClassVar[type[CreateRoleUsecase]] = CreateRoleUsecase
+    create_user: ClassVar[type[CreateUserUsecase]] = CreateUserUsecase
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def __call__(self, data: str) -> UserModel:
+        """Create role and user, read user back."""
+        role = await self.create_role(
+            self.session,
+            cache=NullCache(),
+            response_cache=ResponseCache(MemoryCache(max_size=1, ttl=1)),
+        )(data=CreateRoleSchema(role_name=data))
+        user = await self.create_user(self.session)(
+            data=CreateUserSchema(user_name=data, role_id=role.id)
+        )
+        return await GetUserByIdUsecase(self.session)(
+            data=GetUserByIdSchema(id=user.id)
+        )
+
+
+def _make_signup_usecase(mode: PropagationEnum) -> type[SignupUsecase]:
+    """SignupUsecase, вложенные юзкейсы которого работают в режиме mode."""
+
+    class PropagatedSignupUsecase(SignupUsecase):
+        create_role = _with_propagation(CreateRoleUsecase, mode)
+        create_user = _with_propagation(CreateUserUsecase, mode)
+
+    return PropagatedSignupUsecase
+
+
+async def _load(client: AsyncClient, url: str) -> float:
+    """Гоняем REQUESTS запросов c CONCURRENCY одновременными, возвращаем RPS."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def request() -> None:
+        async with semaphore:
+            response = await client.get(url)
+            assert response.status_code == 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestSessionBenchmark:
+    async def test_in_use_connections_vs_rps(
+        self, test_client: AsyncClient, pg_engine: AsyncEngine
+    ):
+        role = (
+            await test_client.post('/api/v1/roles/', json={'role_name': 'admin'})
+        ).json()
+        user = (
+            await test_client.post(
+                '/api/v1/users/', json={'user_name': 'benchmark', 'role_id': role['id']}
+            )
+        ).json()
+        pool = pg_engine.pool
+        assert isinstance(pool, QueuePool)
+        pool_size = pool.size() + pool._max_overflow
+
+        with PoolUsage(pg_engine) as usage:
+            rps = await _load(test_client, f'/api/v1/users/{user["id"]}')
+        logger.info(
+            'GET user: {:.0f} rps, peak in-use connections {}/{} at concurrency {}',
+            rps,
+            usage.peak,
+            pool_size,
+            CONCURRENCY,
+        )
+        # Соединение возвращается в пул на выходе из юзкейса, a не в конце запроса
+        assert usage.in_use == 0
+        assert usage.peak <= pool_size
+
+        await test_client.get(f'/api/v1/roles/{role["id"]}')
+        with PoolUsage(pg_engine) as usage:
+            rps = await _load(test_client, f'/api/v1/roles/{role["id"]}')
+        logger.info('GET cached role: {:.0f} rps, checkouts {}', rps, usage.checkouts)
+        # Ответ из кэша не берет соединение вовсе
+        assert usage.checkouts == 0
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('clear_db')
+class TestPropagationBenchmark:
+    async def test_round_trips_of_composed_usecase(self, pg_engine: AsyncEngine):
+        round_trips = {}
+        for mode in (PropagationEnum.REQUIRED, PropagationEnum.NESTED):
+            usecase = _make_signup_usecase(mode)
+            async with AsyncSession(pg_engine, expire_on_commit=False) as session:
+                with RoundTrips(pg_engine) as counter:
+                    user = await usecase(session)(data=f'signup_{mode}')
+            assert user.user_name == f'signup_{mode}'
+            round_trips[mode] = counter.count
+
+        logger.info(
+            'Composed usecase round trips: {}',
+            {str(mode): count for mode, count in round_trips.items()},
+        )
+        # Вложенные REQUIRED не добавляют обращений к БД: BEGIN на первом
+        # запросе, 3 запроса и один COMMIT. NESTED добавляет SAVEPOINT и
+        # RELEASE только второму вложенному юзкейсу: до первого транзакции в БД
+        # еще нет
+        assert round_trips[PropagationEnum.REQUIRED] == 5
+        assert round_trips[PropagationEnum.NESTED] == 5 + 2
@@ -24,10 +24,12 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from testcontainers.postgres import PostgresContainer
 
+from app.api.di.cache import CacheProvider
 from app.api.di.request import RequestProvider
 from app.api.di.usecase import UsecaseProvider
 from app.api.utils.enums.env_enum import EnvEnum
 from app.api.utils.sqlalchemy.base_db_model import BaseDBModel
+from app.api.utils.sqlalchemy.replicas import ReplicaRouter
 from app.main import get_fastapi_app
 from tests.consts import BASE_URL
 
@@ -118,8 +120,14 @@ async def test_app(pg_engine: AsyncEngine) -> AsyncGenerator[FastAPI]:
             """Override DI scope to use test engine from fixture."""
             yield pg_engine
 
+        @provide
+        async def pg_replica_router_scope(self, engine: AsyncEngine) -> ReplicaRouter:
+            """Override DI scope to read from the test engine."""
+            return ReplicaRouter([engine])
+
     test_container = make_async_container(
         TestApplicationProvider(),
+        CacheProvider(),
         RequestProvider(),
         UsecaseProvider(),
     )
@@ -0,0 +1,43 @@
+"""Хелперы для прогона запросов напрямую через ASGI приложение."""
+
+from collections.abc import Callable
+
+
+async def asgi_request(
+    app: Callable,
+    method: str = 'GET',
+    path: str = '/',
+    body: bytes = b'',
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> list[dict]:
+    """Прогоняем один запрос напрямую через ASGI приложение без транспорта.
+
+    Returns:
+        list[dict] - отправленные приложением ASGI сообщения
+    """
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost'), *(headers or [])],
+        'client': ('127.0.0.1', 12345),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        return messages.pop() if messages else {'type': 'http.disconnect'}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
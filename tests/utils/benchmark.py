@@ -0,0 +1,30 @@
+"""Хелперы для бенчмарков. Бенчмарки помечены маркером slow."""
+
+import time
+
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+
+async def measure(
+    func: Callable[[], Awaitable[object]],
+    rounds: int = 200,
+    warmup: int = 10,
+) -> list[float]:
+    """Замеряем время выполнения корутины в секундах."""
+    for _ in range(warmup):
+        await func()
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def percentile(timings: list[float], value: float) -> float:
+    """Перцентиль по методу nearest-rank."""
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * value / 100))]